@@ -0,0 +1,51 @@
+"""Generate synthetic member data in the example-data.json layout.
+
+    $ python3 -m benchmarks.generate 100 2 1000 > data.json
+
+i.e. 100 members with 2 accounts each, each with 1000 half-hourly readings of
+electricity and of gas.
+"""
+
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+
+_START = datetime(2017, 1, 1)
+_INTERVAL = timedelta(minutes=30)
+
+
+def generate_data(members: int, accounts: int, readings: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    return {
+        f"member-{member}": {
+            f"account-{account}": {
+                "electricity": _generate_readings(rng, readings, "kwh"),
+                "gas": _generate_readings(rng, readings, "m³"),
+            }
+            for account in range(accounts)
+        }
+        for member in range(members)
+    }
+
+
+def _generate_readings(rng: random.Random, count: int, units: str):
+    cumulative = rng.randrange(100000)
+    readings = []
+    for index in range(count):
+        readings.append(
+            {
+                "cumulative": cumulative,
+                "timestamp": (_START + index * _INTERVAL).isoformat(
+                    timespec="milliseconds"
+                ),
+                "units": units,
+            }
+        )
+        cumulative += rng.randrange(5)
+    return readings
+
+
+if __name__ == "__main__":
+    members, accounts, readings = (int(arg) for arg in sys.argv[1:4])
+    json.dump(generate_data(members, accounts, readings), sys.stdout)
@@ -0,0 +1,259 @@
+"""Time the main stages of estimating bills on synthetic data.
+
+    $ python3 -m benchmarks.run
+    $ python3 -m benchmarks.run --members 1000 --readings 17520 --repeat 1
+
+Each stage reports its throughput, latency percentiles (per call) and peak memory
+(traced separately, so that tracing doesn't slow the timings down). Results are
+compared against benchmarks/baseline.json when it was recorded at the same scale,
+and --check exits with 1 if any stage's throughput has dropped by more than the
+tolerance.
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.generate import generate_data
+from billing.billing import get_bill_estimate
+from billing.models import DataRoot, DualTariff
+from billing.shortcuts import get_dual_bill_estimate_for_member_account
+from billing.usage import LinearExtrapolationUsageEstimator
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+_TARIFF = {
+    "electricity": {"standing_charge": "23.23", "unit_charge": "12.123"},
+    "gas": {"standing_charge": "21.21", "unit_charge": "4.915"},
+}
+_BILLING_DATE = datetime(2020, 1, 1)
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    unit: str  # What the throughput counts
+    throughput: float  # Units per second
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    peak_memory_kib: float
+
+
+@dataclass
+class _Benchmark:
+    name: str
+    unit: str
+    calls: List[Callable[[], object]]
+    units_per_call: int
+
+
+def run_benchmarks(
+    members: int, accounts: int, readings: int, repeat: int = 3
+) -> List[BenchmarkResult]:
+    return [
+        _measure(benchmark, repeat)
+        for benchmark in _get_benchmarks(members, accounts, readings)
+    ]
+
+
+def _get_benchmarks(members: int, accounts: int, readings: int) -> List[_Benchmark]:
+    json_str = json.dumps(generate_data(members, accounts, readings))
+    data_root = DataRoot.from_json(json_str)
+    dual_tariff = DualTariff.from_dict(_TARIFF)
+    estimator = LinearExtrapolationUsageEstimator()
+    all_accounts = [
+        (member, account)
+        for member in data_root.members
+        for account in member.accounts
+    ]
+    usage_estimates = [
+        estimator.estimate_usage(account.electricity_readings, _BILLING_DATE)
+        for _, account in all_accounts
+    ]
+
+    return [
+        _Benchmark(
+            name="DataRoot.from_json",
+            unit="readings",
+            calls=[partial(DataRoot.from_json, json_str)],
+            units_per_call=members * accounts * readings * 2,
+        ),
+        _Benchmark(
+            name="Account.validate",
+            unit="accounts",
+            calls=[account.validate for _, account in all_accounts],
+            units_per_call=1,
+        ),
+        _Benchmark(
+            name="LinearExtrapolationUsageEstimator.estimate_usage",
+            unit="estimates",
+            calls=[
+                partial(
+                    estimator.estimate_usage,
+                    account.electricity_readings,
+                    _BILLING_DATE,
+                )
+                for _, account in all_accounts
+            ],
+            units_per_call=1,
+        ),
+        _Benchmark(
+            name="get_bill_estimate",
+            unit="bills",
+            calls=[
+                partial(
+                    get_bill_estimate, usage_estimate, dual_tariff.electricity_tariff
+                )
+                for usage_estimate in usage_estimates
+            ],
+            units_per_call=1,
+        ),
+        _Benchmark(
+            name="get_dual_bill_estimate_for_member_account",
+            unit="accounts",
+            calls=[
+                partial(
+                    get_dual_bill_estimate_for_member_account,
+                    data_root=data_root,
+                    member_name=member.name,
+                    account_name=account.name,
+                    dual_tariff=dual_tariff,
+                    estimator=estimator,
+                    billing_date=_BILLING_DATE,
+                )
+                for member, account in all_accounts
+            ],
+            units_per_call=1,
+        ),
+    ]
+
+
+def _measure(benchmark: _Benchmark, repeat: int) -> BenchmarkResult:
+    latencies = []
+    for _ in range(repeat):
+        for call in benchmark.calls:
+            start = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        for call in benchmark.calls:
+            call()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return BenchmarkResult(
+        name=benchmark.name,
+        unit=benchmark.unit,
+        throughput=len(latencies) * benchmark.units_per_call / sum(latencies),
+        p50_ms=_percentile(latencies, 50) * 1000,
+        p95_ms=_percentile(latencies, 95) * 1000,
+        p99_ms=_percentile(latencies, 99) * 1000,
+        peak_memory_kib=peak_memory / 1024,
+    )
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest rank percentile."""
+    rank = -(-len(sorted_values) * percent // 100)
+    return sorted_values[max(int(rank), 1) - 1]
+
+
+def compare_to_baseline(
+    results: List[BenchmarkResult], baseline: Dict[str, dict], tolerance: float
+) -> List[str]:
+    """Return the names of the benchmarks whose throughput has regressed."""
+    return [
+        result.name
+        for result in results
+        if result.name in baseline
+        and result.throughput < baseline[result.name]["throughput"] * (1 - tolerance)
+    ]
+
+
+def _format_results(
+    results: List[BenchmarkResult], baseline: Optional[Dict[str, dict]]
+) -> str:
+    lines = [
+        f"{'benchmark':<50} {'throughput':>18} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'peak KiB':>10} {'vs baseline':>12}"
+    ]
+    for result in results:
+        change = ""
+        if baseline and result.name in baseline:
+            ratio = result.throughput / baseline[result.name]["throughput"]
+            change = f"{ratio - 1:+.1%}"
+        lines.append(
+            f"{result.name:<50} {result.throughput:>10.0f} {result.unit + '/s':<7} "
+            f"{result.p50_ms:>9.3f} {result.p95_ms:>9.3f} {result.p99_ms:>9.3f} "
+            f"{result.peak_memory_kib:>10.0f} {change:>12}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--members", type=int, default=50)
+    parser.add_argument("--accounts", type=int, default=2, help="per member")
+    parser.add_argument("--readings", type=int, default=500, help="per fuel")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="record these results"
+    )
+    parser.add_argument("--check", action="store_true", help="fail on regressions")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="allowed throughput drop"
+    )
+    args = parser.parse_args(argv)
+
+    scale = {
+        "members": args.members,
+        "accounts": args.accounts,
+        "readings": args.readings,
+    }
+    results = run_benchmarks(repeat=args.repeat, **scale)
+
+    baseline = None
+    if args.baseline.exists():
+        stored = json.loads(args.baseline.read_text())
+        if stored["scale"] == scale:
+            baseline = stored["results"]
+        else:
+            print(f"Baseline is for a different scale: {stored['scale']}")
+
+    print(_format_results(results, baseline))
+
+    if args.save_baseline:
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "scale": scale,
+                    "results": {result.name: asdict(result) for result in results},
+                },
+                indent=4,
+            )
+            + "\n"
+        )
+
+    if args.check and baseline:
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"Regressed: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
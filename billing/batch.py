@@ -0,0 +1,231 @@
+"""Estimate bills for many accounts at once.
+
+This is the bulk equivalent of get_dual_bill_estimate_for_member_account with the
+LinearExtrapolationUsageEstimator. Rather than building a UsageEstimate and
+BillEstimate per account, the latest two readings of each account are gathered
+into columns (one member at a time, so only the columns are kept), and the
+estimates are worked out a column at a time and kept as integers:
+
+* usage is kept in thousandths of a unit
+* prices are kept in pence
+
+Each estimate is worked out with the same Decimal steps as the single account path
+(so rounded the same way, to the current context's precision), and then rounded
+half-even - i.e. the same as formatting the Decimal estimates from the single
+account path to 3 and 2 decimal places.
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from billing.models import (Account, BillEstimate, DataRoot, DualBillEstimate,
+                            DualTariff, ReadingSeries, Tariff,
+                            from_epoch_seconds, to_epoch_seconds)
+from billing.usage.base import UsageEstimatorError
+from billing.usage.linear import LinearExtrapolationUsageEstimator
+
+AccountId = Tuple[str, str]  # (member name, account name)
+
+_SECONDS_IN_DAY = 60 * 60 * 24
+_USAGE_PLACES = 3
+_PRICE_PLACES = 2
+
+
+@dataclass
+class BatchBillEstimates:
+    """Estimates for one fuel, one row per account.
+
+    Rows without an estimate (no readings, or an error) have estimated set to 0,
+    and the rest of their columns are meaningless.
+    """
+
+    estimated: bytearray = field(default_factory=bytearray)
+    usage_units: List[Optional[str]] = field(default_factory=list)
+    period_start: array = field(default_factory=lambda: array("q"))
+    usage_estimate_milli: array = field(default_factory=lambda: array("q"))
+    price_estimate_pence: array = field(default_factory=lambda: array("q"))
+    # Row index to UsageEstimatorError message
+    errors: Dict[int, str] = field(default_factory=dict)
+    # The latest two readings of each row, until the estimates are worked out
+    _usage_difference: array = field(
+        default_factory=lambda: array("q"), repr=False, compare=False
+    )
+    _time_difference: array = field(
+        default_factory=lambda: array("q"), repr=False, compare=False
+    )
+
+    def get_bill_estimate(
+        self, index: int, billing_date: datetime
+    ) -> Optional[BillEstimate]:
+        if not self.estimated[index]:
+            return None
+
+        tzinfo = None if billing_date.tzinfo is None else timezone.utc
+        return BillEstimate(
+            billing_date=billing_date,
+            billing_period=billing_date
+            - from_epoch_seconds(self.period_start[index], tzinfo),
+            usage_estimate=Decimal(self.usage_estimate_milli[index]).scaleb(
+                -_USAGE_PLACES
+            ),
+            usage_units=self.usage_units[index],
+            price_estimate=Decimal(self.price_estimate_pence[index]).scaleb(
+                -_PRICE_PLACES
+            ),
+        )
+
+
+@dataclass
+class BatchDualBillEstimate:
+    billing_date: datetime
+    account_ids: List[AccountId]
+    electricity: BatchBillEstimates
+    gas: BatchBillEstimates
+
+    def __len__(self) -> int:
+        return len(self.account_ids)
+
+    def get_dual_bill_estimate(self, index: int) -> DualBillEstimate:
+        return DualBillEstimate(
+            billing_date=self.billing_date,
+            electricity_bill_estimate=self.electricity.get_bill_estimate(
+                index, self.billing_date
+            ),
+            gas_bill_estimate=self.gas.get_bill_estimate(index, self.billing_date),
+        )
+
+    def dual_bill_estimates(self) -> Iterator[Tuple[AccountId, DualBillEstimate]]:
+        for index, account_id in enumerate(self.account_ids):
+            yield account_id, self.get_dual_bill_estimate(index)
+
+
+def get_dual_bill_estimates(
+    data_root: DataRoot,
+    dual_tariff: DualTariff,
+    billing_date: datetime,
+    account_ids: Optional[Iterable[AccountId]] = None,
+) -> BatchDualBillEstimate:
+    """Estimate the bills of the given accounts (default: every account).
+
+    Accounts are only used while their readings are gathered, so e.g. a
+    billing.sharding.ShardedDataRoot is read a shard at a time.
+    """
+    for tariff in (dual_tariff.electricity_tariff, dual_tariff.gas_tariff):
+        if tariff is not None and not tariff.is_flat:
+            raise ValueError("Only flat tariffs can be estimated in batches")
+
+    if account_ids is None:
+        accounts = (
+            ((member.name, account.name), account)
+            for member in data_root.members
+            for account in member.accounts
+        )
+    else:
+        accounts = (
+            (account_id, _get_account(data_root, account_id))
+            for account_id in account_ids
+        )
+
+    result = BatchDualBillEstimate(
+        billing_date=billing_date,
+        account_ids=[],
+        electricity=BatchBillEstimates(),
+        gas=BatchBillEstimates(),
+    )
+    billing_timestamp = to_epoch_seconds(billing_date)
+    for account_id, account in accounts:
+        result.account_ids.append(account_id)
+        _add_readings(
+            result.electricity,
+            account.electricity_readings,
+            billing_date,
+            billing_timestamp,
+        )
+        _add_readings(result.gas, account.gas_readings, billing_date, billing_timestamp)
+
+    _estimate_bills(result.electricity, dual_tariff.electricity_tariff, billing_date)
+    _estimate_bills(result.gas, dual_tariff.gas_tariff, billing_date)
+    return result
+
+
+def _get_account(data_root: DataRoot, account_id: AccountId) -> Account:
+    member_name, account_name = account_id
+    return data_root.get_member(member_name).get_account(account_name)
+
+
+def _add_readings(
+    result: BatchBillEstimates,
+    readings: ReadingSeries,
+    billing_date: datetime,
+    billing_timestamp: int,
+):
+    """Add a row with the latest two readings (or the error, if any)."""
+    index = len(result.estimated)
+    start = end = usage_difference = 0
+    usage_units = None
+    if len(readings) >= 2 and len(readings.units) == 1:
+        start, end = readings.timestamps[-2:]
+        usage_difference = readings.cumulatives[-1] - readings.cumulatives[-2]
+        (usage_units,) = readings.units
+    # Like LinearExtrapolationUsageEstimator, which otherwise raises
+    estimated = (
+        usage_units is not None
+        and billing_timestamp >= start
+        and usage_difference >= 0
+        and end != start
+    )
+    if readings and not estimated:
+        result.errors[index] = _get_error_message(readings, billing_date)
+
+    result.estimated.append(estimated)
+    result.usage_units.append(usage_units)
+    result.period_start.append(start)
+    result._time_difference.append(end - start)
+    result._usage_difference.append(usage_difference)
+
+
+def _estimate_bills(
+    result: BatchBillEstimates, tariff: Optional[Tariff], billing_date: datetime
+):
+    """Fill in the usage and price columns from the readings' columns."""
+    count = len(result.estimated)
+    result.usage_estimate_milli = array("q", bytes(8 * count))
+    result.price_estimate_pence = array("q", bytes(8 * count))
+    if not any(result.estimated):
+        return
+
+    billing_timestamp = to_epoch_seconds(billing_date)
+    for index, (estimated, start, usage_difference, time_difference) in enumerate(
+        zip(
+            result.estimated,
+            result.period_start,
+            result._usage_difference,
+            result._time_difference,
+        )
+    ):
+        if not estimated:
+            continue
+        # Whole seconds, like LinearExtrapolationUsageEstimator
+        period = billing_timestamp - start
+        # The same steps as ConstantRateUsageModel and DecimalPricingEngine
+        usage = Decimal(usage_difference) / time_difference * period
+        price = period // _SECONDS_IN_DAY * tariff.standing_charge
+        price += usage * tariff.unit_charge
+        result.usage_estimate_milli[index] = _to_minor_units(usage, _USAGE_PLACES)
+        result.price_estimate_pence[index] = _to_minor_units(price, _PRICE_PLACES)
+
+
+def _to_minor_units(value: Decimal, places: int) -> int:
+    return int(value.scaleb(places).to_integral_value(ROUND_HALF_EVEN))
+
+
+def _get_error_message(readings: ReadingSeries, billing_date: datetime) -> str:
+    """Use the single account estimator so that the errors are identical."""
+    try:
+        LinearExtrapolationUsageEstimator().estimate_usage(readings, billing_date)
+    except UsageEstimatorError as e:
+        return str(e)
+    raise AssertionError("Batch and single account estimates disagree")
@@ -1,26 +1,132 @@
 """Calculate the bill (i.e £££)."""
 
+from dataclasses import dataclass
 from datetime import timedelta
 from decimal import Decimal
+from typing import Iterable, List, Optional, Tuple, Union
 
+from billing.instrumentation import instrumented
 from billing.models import BillEstimate, Tariff, UsageEstimate
+from billing.registry import TARIFF_REGISTRY, TariffRegistry
+from billing.tariffs import compile_tariff
 
 
-def get_bill_estimate(usage_estimate: UsageEstimate, tariff: Tariff) -> BillEstimate:
+class BasePricingEngine:
+    """Do not use directly."""
+
+    def calculate_price(
+        self,
+        time_period: timedelta,
+        usage: Decimal,
+        standing_charge: Decimal,
+        unit_charge: Decimal,
+    ) -> Decimal:
+        raise NotImplementedError()
+
+
+@dataclass(frozen=True)
+class DecimalPricingEngine(BasePricingEngine):
+    """Decimal arithmetic (to 28 significant figures) - the default.
+
+    To estimate many accounts' bills quickly (to the penny), see billing.batch.
+    """
+
+    def calculate_price(
+        self,
+        time_period: timedelta,
+        usage: Decimal,
+        standing_charge: Decimal,
+        unit_charge: Decimal,
+    ) -> Decimal:
+        return _calculate_price(time_period, usage, standing_charge, unit_charge)
+
+
+DECIMAL_PRICING_ENGINE = DecimalPricingEngine()
+
+
+@instrumented("bill_estimate")
+def get_bill_estimate(
+    usage_estimate: UsageEstimate,
+    tariff: Union[Tariff, str],
+    pricing_engine: Optional[BasePricingEngine] = None,
+    registry: Optional[TariffRegistry] = None,
+) -> BillEstimate:
+    """The tariff can be given by its id in the registry (default: TARIFF_REGISTRY).
+
+    A billing period which spans a change in that tariff is priced in parts, with
+    the usage shared out by time.
+
+    Time of use tariffs need the readings - see billing.tariffs.resolve_tariff.
+    """
+    pricing_engine = pricing_engine or DECIMAL_PRICING_ENGINE
+    if isinstance(tariff, str):
+        price = _calculate_price_over_tariff_versions(
+            usage_estimate, tariff, pricing_engine, registry or TARIFF_REGISTRY
+        )
+    else:
+        usage, unit_charge = _unit_pricing(tariff, usage_estimate.usage_estimate)
+        price = pricing_engine.calculate_price(
+            usage_estimate.time_period, usage, tariff.standing_charge, unit_charge
+        )
+
     return BillEstimate(
         billing_date=usage_estimate.billing_date,
         billing_period=usage_estimate.time_period,
         usage_estimate=usage_estimate.usage_estimate,
         usage_units=usage_estimate.usage_units,
-        price_estimate=_calculate_price(
-            usage_estimate.time_period,
-            usage_estimate.usage_estimate,
-            tariff.standing_charge,
-            tariff.unit_charge,
-        ),
+        price_estimate=price,
     )
 
 
+def get_bill_estimates(
+    usage_estimates: Iterable[UsageEstimate],
+    tariff: Union[Tariff, str],
+    pricing_engine: Optional[BasePricingEngine] = None,
+    registry: Optional[TariffRegistry] = None,
+) -> List[BillEstimate]:
+    return [
+        get_bill_estimate(usage_estimate, tariff, pricing_engine, registry)
+        for usage_estimate in usage_estimates
+    ]
+
+
+def _unit_pricing(tariff: Tariff, usage: Decimal) -> Tuple[Decimal, Decimal]:
+    """Return the usage and unit charge to give the pricing engine."""
+    if tariff.time_of_use:
+        raise ValueError("Resolve time of use tariffs for the readings first")
+    if tariff.tiers:
+        # Priced exactly through the tiers here, leaving the engine to add the
+        # standing charge (and round)
+        return compile_tariff(tariff).unit_price(usage), Decimal(1)
+    return usage, tariff.unit_charge
+
+
+def _calculate_price_over_tariff_versions(
+    usage_estimate: UsageEstimate,
+    tariff_id: str,
+    pricing_engine: BasePricingEngine,
+    registry: TariffRegistry,
+) -> Decimal:
+    billing_date = usage_estimate.billing_date
+    period_start = billing_date - usage_estimate.time_period
+    periods = registry.periods(tariff_id, period_start, billing_date)
+    total_seconds = int(usage_estimate.time_period.total_seconds())
+
+    price = Decimal(0)
+    for start, end, tariff in periods:
+        usage, unit_charge = _unit_pricing(tariff, usage_estimate.usage_estimate)
+        if len(periods) > 1:
+            usage = usage * int((end - start).total_seconds()) / total_seconds
+        # Whole days since the period started, so the parts add up to the whole
+        days = _timedelta_to_floored_days(
+            end - period_start
+        ) - _timedelta_to_floored_days(start - period_start)
+        price += pricing_engine.calculate_price(
+            timedelta(days=days), usage, tariff.standing_charge, unit_charge
+        )
+    return price
+
+
 def _calculate_price(
     time_period: timedelta,
     usage: Decimal,
@@ -0,0 +1,182 @@
+"""A compact binary copy of the member data, which is read through mmap.
+
+Parsing JSON (and every timestamp in it) is slow, so convert_json_to_binary writes
+the readings as fixed width little-endian int64 columns instead:
+
+    header    magic, version, offset and length of the member index
+    columns   for each account and fuel: timestamps (epoch seconds), cumulatives
+    records   for each member: JSON {account: {fuel: [offset, count, units, tz]}}
+              (tz is the UTC offset, or one per reading if they differ)
+    index     JSON {member: [offset, length]} of the member records
+
+open_data_root only reads the header and the member index. Each member's record is
+read when the member is first used, and its readings are memoryviews straight onto
+the mapped file, so only the pages of the accounts being billed are touched.
+
+Readings are validated when converted, not when opened.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import timedelta, timezone
+from functools import partial
+from typing import IO, Dict, List, Optional, Union
+
+from billing.models import Account, DataRoot, Member, ReadingSeries
+from billing.streaming import Source, iter_members
+
+_MAGIC = b"BILLMMAP"
+_VERSION = 1
+# magic, version, (padding), index offset, index length
+_HEADER = struct.Struct("<8sIIQQ")
+_FUELS = (("electricity", "electricity_readings"), ("gas", "gas_readings"))
+_ITEM_SIZE = 8
+_NATIVE_IS_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+class BinaryFormatError(Exception):
+    pass
+
+
+def convert_json_to_binary(source: Source, path: os.PathLike):
+    """Convert JSON in the DataRoot.from_json layout, one member at a time."""
+    with open(path, "wb") as file:
+        file.write(bytes(_HEADER.size))
+        index = {}
+        for member in iter_members(source):
+            record = {
+                account.name: _write_account(file, account)
+                for account in member.accounts
+            }
+            index[member.name] = _write_json(file, record)
+
+        index_offset, index_length = _write_json(file, index)
+        file.seek(0)
+        file.write(_HEADER.pack(_MAGIC, _VERSION, 0, index_offset, index_length))
+
+
+def is_binary_file(path: os.PathLike) -> bool:
+    with open(path, "rb") as file:
+        return file.read(len(_MAGIC)) == _MAGIC
+
+
+def open_data_root(path: os.PathLike) -> DataRoot:
+    """Open a file written by convert_json_to_binary, loading members lazily."""
+    mapped_file = _MappedFile(path)
+    return DataRoot(
+        members=[
+            Member.from_loader(
+                name, partial(_load_member, mapped_file, offset, length)
+            )
+            for name, (offset, length) in mapped_file.read_index().items()
+        ]
+    )
+
+
+def _write_account(file: IO[bytes], account: Account) -> Dict[str, list]:
+    record = {}
+    for fuel, attribute in _FUELS:
+        series = getattr(account, attribute)
+        offset = file.tell()
+        file.write(_to_little_endian(series.timestamps))
+        file.write(_to_little_endian(series.cumulatives))
+        (units,) = series.units or (None,)
+        tz_offset = None
+        if series.utc_offsets is not None:
+            # Rare (the readings' UTC offsets differ), so kept in the record
+            tz_offset = list(series.utc_offsets)
+        elif series.tzinfo is not None:
+            tz_offset = int(series.tzinfo.utcoffset(None).total_seconds())
+        record[fuel] = [offset, len(series), units, tz_offset]
+    return record
+
+
+def _to_little_endian(column) -> bytes:
+    column = array("q", column)
+    if not _NATIVE_IS_LITTLE_ENDIAN:
+        column.byteswap()
+    return column.tobytes()
+
+
+def _write_json(file: IO[bytes], value) -> List[int]:
+    offset = file.tell()
+    data = json.dumps(value, separators=(",", ":")).encode("utf-8")
+    # Keep the columns which follow aligned
+    file.write(data + bytes(-len(data) % _ITEM_SIZE))
+    return [offset, len(data)]
+
+
+class _MappedFile:
+    """The mapped file, which can be pickled (it's reopened by path)."""
+
+    def __init__(self, path: os.PathLike):
+        self._path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+    def __reduce__(self):
+        return type(self), (self._path,)
+
+    def read_index(self) -> Dict[str, List[int]]:
+        if len(self._mmap) < _HEADER.size:
+            raise BinaryFormatError("File is too short")
+        magic, version, _, offset, length = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or version != _VERSION:
+            raise BinaryFormatError("Not a (supported) binary member data file")
+        return self.read_json(offset, length)
+
+    def read_json(self, offset: int, length: int):
+        return json.loads(self._mmap[offset : offset + length].decode("utf-8"))
+
+    def read_series(
+        self,
+        offset: int,
+        count: int,
+        units: Optional[str],
+        tz_offset: Union[int, List[int], None],
+    ) -> ReadingSeries:
+        size = count * _ITEM_SIZE
+        timestamps = self._column(offset, size)
+        cumulatives = self._column(offset + size, size)
+        tzinfo = utc_offsets = None
+        if isinstance(tz_offset, list):
+            utc_offsets = array("q", tz_offset)
+            tz_offset = tz_offset[0]
+        if tz_offset is not None:
+            tzinfo = timezone(timedelta(seconds=tz_offset))
+        return ReadingSeries.from_columns(
+            timestamps, cumulatives, units, tzinfo, utc_offsets
+        )
+
+    def _column(self, offset: int, size: int):
+        column = self._view[offset : offset + size].cast("q")
+        if not _NATIVE_IS_LITTLE_ENDIAN:
+            column = array("q", column)
+            column.byteswap()
+        return column
+
+
+def _load_member(mapped_file: _MappedFile, offset: int, length: int):
+    record = mapped_file.read_json(offset, length)
+    return {
+        "accounts": [
+            Account(
+                name=account_name,
+                **{
+                    attribute: mapped_file.read_series(*fuels[fuel])
+                    for fuel, attribute in _FUELS
+                },
+            )
+            for account_name, fuels in record.items()
+        ]
+    }
+
+
+if __name__ == "__main__":
+    # python3 -m billing.binary example-data.json example-data.bin
+    convert_json_to_binary(sys.argv[1], sys.argv[2])
@@ -0,0 +1,91 @@
+"""Opt-in caching of estimates.
+
+The cache keys are built from BaseUsageEstimator.fingerprint (e.g. the latest two
+readings), the tariff and the billing date, so new readings or a different tariff
+simply miss the cache - nothing has to be invalidated by hand.
+
+Cached estimates are shared, so don't modify them.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Hashable, Optional
+
+from billing.models import UsageEstimate
+from billing.usage.base import BaseUsageEstimator, BaseUsageModel, Readings
+
+
+class EstimateCache:
+    """A thread-safe LRU cache, where entries can also expire after ttl seconds."""
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value, or compute (and cache) it.
+
+        Nothing is cached if compute raises.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > self._clock()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Not under the lock, so that slow estimates don't block each other
+        value = compute()
+
+        with self._lock:
+            expires_at = None if self.ttl is None else self._clock() + self.ttl
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachedUsageEstimator(BaseUsageEstimator):
+    """Wrap another estimator, caching its usage estimates."""
+
+    def __init__(self, estimator: BaseUsageEstimator, cache: EstimateCache):
+        self.estimator = estimator
+        self.cache = cache
+
+    def estimate_usage(
+        self, readings: Readings, billing_date: datetime
+    ) -> UsageEstimate:
+        return self.cache.get_or_compute(
+            (self.fingerprint(readings), billing_date),
+            lambda: self.estimator.estimate_usage(readings, billing_date),
+        )
+
+    def fit(self, readings: Readings) -> BaseUsageModel:
+        return self.cache.get_or_compute(
+            ("usage_model", self.fingerprint(readings)),
+            lambda: self.estimator.fit(readings),
+        )
+
+    def fingerprint(self, readings: Readings) -> Hashable:
+        return self.estimator.fingerprint(readings)
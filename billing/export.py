@@ -0,0 +1,177 @@
+"""Write estimates out as they're made, without keeping them all in memory.
+
+    with open("bills.csv", "w", newline="") as file:
+        write_csv(iter_dual_bill_estimates(...), file)
+
+Each result is written straight to the (buffered) file, rounded to the nearest unit
+and penny like example.py. The formats are:
+
+    csv       one row per account, with a header row
+    ndjson    one JSON object per account and line (missing values are null)
+    columnar  batches of rows, stored column by column (see write_columnar)
+"""
+
+import csv
+import json
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import islice
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from billing.models import BillEstimate
+from billing.runner import AccountBillResult
+
+COLUMNS = (
+    "member",
+    "account",
+    "electricity_usage",
+    "electricity_units",
+    "electricity_price",
+    "gas_usage",
+    "gas_units",
+    "gas_price",
+    "error",
+)
+
+
+@dataclass
+class ExportSummary:
+    rows: int = 0
+    errors: int = 0  # Rows for accounts which couldn't be estimated
+
+
+def write_csv(results: Iterable[AccountBillResult], file: IO[str]) -> ExportSummary:
+    """The file should be opened with newline="" (see the csv module)."""
+    summary = ExportSummary()
+    writer = csv.writer(file)
+    writer.writerow(COLUMNS)
+    writer.writerows(_format_row(result, summary) for result in results)
+    return summary
+
+
+def write_ndjson(results: Iterable[AccountBillResult], file: IO[str]) -> ExportSummary:
+    summary = ExportSummary()
+    encoder = json.JSONEncoder(ensure_ascii=False)
+    for result in results:
+        file.write(encoder.encode(dict(zip(COLUMNS, _format_row(result, summary)))))
+        file.write("\n")
+    return summary
+
+
+def _format_row(result: AccountBillResult, summary: ExportSummary) -> tuple:
+    summary.rows += 1
+    dual_bill = result.dual_bill_estimate
+    if dual_bill is None:
+        summary.errors += 1
+        return (result.member_name, result.account_name) + (None,) * 6 + (
+            result.error,
+        )
+    return (
+        (result.member_name, result.account_name)
+        + _format_bill(dual_bill.electricity_bill_estimate)
+        + _format_bill(dual_bill.gas_bill_estimate)
+        + (None,)
+    )
+
+
+def _format_bill(bill: Optional[BillEstimate]) -> Tuple[Optional[str], ...]:
+    if bill is None:
+        return None, None, None
+    return f"{bill.usage_estimate:.0f}", bill.usage_units, f"{bill.price_estimate:.2f}"
+
+
+# Columnar files are the magic, then batches of:
+#
+#     header    uint32 length, then JSON {"rows": n, and the string columns}
+#     columns   little-endian int64 columns of the numbers (see _NUMBER_COLUMNS)
+#
+# Usage is in whole units and prices are in pence, with _MISSING for no value.
+_MAGIC = b"BILLCOL1"
+_BATCH_HEADER = struct.Struct("<I")
+_STRING_COLUMNS = ("member", "account", "electricity_units", "gas_units", "error")
+_NUMBER_COLUMNS = (
+    "electricity_usage",
+    "electricity_price_pence",
+    "gas_usage",
+    "gas_price_pence",
+)
+_MISSING = -(2 ** 63)
+_NATIVE_IS_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def write_columnar(
+    results: Iterable[AccountBillResult], file: IO[bytes], batch_size: int = 4096
+) -> ExportSummary:
+    """Write batches of batch_size rows, which read_columnar reads back."""
+    summary = ExportSummary()
+    file.write(_MAGIC)
+    results = iter(results)
+    while True:
+        batch = list(islice(results, batch_size))
+        if not batch:
+            return summary
+        _write_batch(file, batch, summary)
+
+
+def _write_batch(
+    file: IO[bytes], batch: List[AccountBillResult], summary: ExportSummary
+):
+    strings = {name: [] for name in _STRING_COLUMNS}
+    numbers = {name: array("q") for name in _NUMBER_COLUMNS}
+    for result in batch:
+        summary.rows += 1
+        strings["member"].append(result.member_name)
+        strings["account"].append(result.account_name)
+        strings["error"].append(result.error)
+        dual_bill = result.dual_bill_estimate
+        if dual_bill is None:
+            summary.errors += 1
+        for fuel in ("electricity", "gas"):
+            bill = dual_bill and getattr(dual_bill, f"{fuel}_bill_estimate")
+            strings[f"{fuel}_units"].append(bill and bill.usage_units)
+            numbers[f"{fuel}_usage"].append(
+                _MISSING if bill is None else _to_int(bill.usage_estimate)
+            )
+            numbers[f"{fuel}_price_pence"].append(
+                _MISSING if bill is None else _to_int(bill.price_estimate * 100)
+            )
+
+    header = json.dumps(dict(rows=len(batch), **strings)).encode()
+    file.write(_BATCH_HEADER.pack(len(header)))
+    file.write(header)
+    for name in _NUMBER_COLUMNS:
+        column = numbers[name]
+        if not _NATIVE_IS_LITTLE_ENDIAN:
+            column.byteswap()
+        column.tofile(file)
+
+
+def read_columnar(file: IO[bytes]) -> Iterator[Dict[str, list]]:
+    """Yield each batch as {column: values}, with None for missing values."""
+    if file.read(len(_MAGIC)) != _MAGIC:
+        raise ValueError("Not a columnar estimates file")
+    while True:
+        length = file.read(_BATCH_HEADER.size)
+        if not length:
+            return
+        (length,) = _BATCH_HEADER.unpack(length)
+        batch = json.loads(file.read(length))
+        rows = batch.pop("rows")
+        for name in _NUMBER_COLUMNS:
+            column = array("q")
+            column.frombytes(file.read(rows * column.itemsize))
+            if not _NATIVE_IS_LITTLE_ENDIAN:
+                column.byteswap()
+            batch[name] = [None if value == _MISSING else value for value in column]
+        yield batch
+
+
+def _to_int(value: Decimal) -> int:
+    """Round half-even, like formatting with :.0f."""
+    return int(value.to_integral_value())
+
+
+WRITERS = {"csv": write_csv, "ndjson": write_ndjson, "columnar": write_columnar}
@@ -0,0 +1,160 @@
+"""Optional timings and counts of each stage of estimating bills.
+
+    with instrument() as recorder:
+        get_dual_bill_estimate_for_member_account(...)
+    print(recorder.snapshot())
+
+Stages are recorded by a sink (by default a MetricsRecorder), which can be swapped
+for one which forwards them elsewhere, e.g. to a metrics server. Stages nest (e.g.
+dual_bill_estimate includes estimate_usage), so their times overlap.
+
+Nothing is recorded until a sink is enabled, and until then each stage only costs
+one extra function call. The sink is global to the process - worker processes
+(see billing.runner) don't record into the parent's sink.
+"""
+
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Dict, Iterator, Optional
+
+
+class BaseInstrumentationSink:
+    """Do not use directly."""
+
+    def record(
+        self,
+        stage: str,
+        seconds: float,
+        readings: int,
+        error: Optional[BaseException],
+    ):
+        """Called after every stage, with the exception it raised (if any)."""
+        raise NotImplementedError()
+
+
+class MetricsRecorder(BaseInstrumentationSink):
+    """Total up the calls, time, readings and errors of each stage (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._errors: Dict[str, int] = {}
+
+    def record(
+        self,
+        stage: str,
+        seconds: float,
+        readings: int,
+        error: Optional[BaseException],
+    ):
+        with self._lock:
+            totals = self._stages.get(stage)
+            if totals is None:
+                totals = self._stages[stage] = {
+                    "calls": 0,
+                    "errors": 0,
+                    "readings": 0,
+                    "seconds": 0.0,
+                }
+            totals["calls"] += 1
+            totals["readings"] += readings
+            totals["seconds"] += seconds
+            if error is not None:
+                totals["errors"] += 1
+                if self._is_first_record(error):
+                    message = f"{type(error).__name__}: {error}"
+                    self._errors[message] = self._errors.get(message, 0) + 1
+
+    def _is_first_record(self, error: BaseException) -> bool:
+        """Nested stages all see the same exception, but it's one error."""
+        if getattr(error, "_recorded_by", None) is self:
+            return False
+        try:
+            error._recorded_by = self
+        except AttributeError:
+            pass
+        return True
+
+    def snapshot(self) -> dict:
+        """Return a copy of the totals so far, as plain (JSON-able) data.
+
+        Errors are counted by their message, e.g.
+        {"UsageEstimatorError: Reading decreased": 3}.
+        """
+        with self._lock:
+            return {
+                "stages": {
+                    stage: dict(totals) for stage, totals in self._stages.items()
+                },
+                "errors": dict(self._errors),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._errors.clear()
+
+
+_sink: Optional[BaseInstrumentationSink] = None
+
+
+def enable(sink: BaseInstrumentationSink):
+    global _sink
+    _sink = sink
+
+
+def disable():
+    global _sink
+    _sink = None
+
+
+def get_sink() -> Optional[BaseInstrumentationSink]:
+    return _sink
+
+
+@contextmanager
+def instrument(
+    sink: Optional[BaseInstrumentationSink] = None,
+) -> Iterator[BaseInstrumentationSink]:
+    """Record into sink (default: a new MetricsRecorder) within the block."""
+    sink = sink or MetricsRecorder()
+    previous = _sink
+    enable(sink)
+    try:
+        yield sink
+    finally:
+        if previous is None:
+            disable()
+        else:
+            enable(previous)
+
+
+def instrumented(stage: str, count_readings: Optional[Callable[..., int]] = None):
+    """Decorate a function to be recorded as the given stage.
+
+    count_readings is called with the same arguments, and returns how many readings
+    the call processes.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            sink = _sink
+            if sink is None:
+                return func(*args, **kwargs)
+
+            readings = count_readings(*args, **kwargs) if count_readings else 0
+            start = perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                sink.record(stage, perf_counter() - start, readings, e)
+                raise
+            sink.record(stage, perf_counter() - start, readings, None)
+            return result
+
+        return wrapper
+
+    return decorator
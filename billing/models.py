@@ -1,8 +1,18 @@
 import json
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta, timezone
+from datetime import tzinfo as tzinfo_
 from decimal import Decimal
-from typing import List, Optional
+from fractions import Fraction
+from functools import partial
+from itertools import compress, count, islice, repeat
+from operator import eq, gt, itemgetter
+from typing import (Any, Callable, Dict, FrozenSet, Iterable, Iterator, List,
+                    Optional, Sequence, Tuple, Union)
+
+from billing.instrumentation import instrumented
 
 ###
 # As the data would be loaded from external storage, the from_dict methods
@@ -11,6 +21,11 @@ from typing import List, Optional
 # I don't like them.
 ###
 
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_SECOND = timedelta(seconds=1)
+_SECONDS_IN_DAY = 24 * 60 * 60
+
 
 @dataclass
 class Reading:
@@ -27,55 +42,600 @@ class Reading:
         )
 
 
+def to_epoch_seconds(timestamp: datetime) -> int:
+    """Return whole seconds since the epoch (naive timestamps are taken as-is)."""
+    epoch = _EPOCH if timestamp.tzinfo is None else _EPOCH_UTC
+    return (timestamp - epoch) // _SECOND
+
+
+def from_epoch_seconds(seconds: int, tzinfo: Optional[tzinfo_] = None) -> datetime:
+    if tzinfo is None:
+        return _EPOCH + timedelta(seconds=seconds)
+    return (_EPOCH_UTC + timedelta(seconds=seconds)).astimezone(tzinfo)
+
+
+def fraction_to_decimal(fraction: Fraction) -> Decimal:
+    """Return the fraction rounded to the Decimal context's precision."""
+    return Decimal(fraction.numerator) / fraction.denominator
+
+
+def _ceil_epoch_seconds(timestamp: datetime) -> int:
+    return to_epoch_seconds(timestamp) + (1 if timestamp.microsecond else 0)
+
+
+class ReadingSeries:
+    """Readings kept sorted by timestamp, stored column by column.
+
+    Built once (e.g. by Account) so that estimators don't have to re-sort the whole
+    history on every lookup.
+
+    Timestamps are held as int64 epoch seconds (i.e. to the nearest second, rounded
+    down) and cumulative values as int64, with the units stored once for the series.
+    Indexing and iterating give Reading objects, which are created on demand.
+
+    Timestamps must be all timezone aware or all naive (otherwise ValidationError is
+    raised), and are given back in the timezone of the first reading. If the
+    readings' UTC offsets differ (e.g. "+00:00" in winter and "+01:00" in summer),
+    each reading's offset is kept too, so that its time of day isn't lost.
+    """
+
+    def __init__(self, readings: Iterable[Reading] = ()):
+        readings = list(readings)
+        if len({reading.timestamp.tzinfo is None for reading in readings}) > 1:
+            raise _mixed_timezones_error()
+        tzinfo = readings[0].timestamp.tzinfo if readings else None
+        self._set_rows(
+            (
+                (
+                    to_epoch_seconds(reading.timestamp),
+                    reading.cumulative,
+                    reading.units,
+                    _utc_offset(reading.timestamp),
+                )
+                for reading in readings
+            ),
+            tzinfo,
+        )
+
+    @classmethod
+    def from_dicts(cls, dicts: Iterable[dict]) -> "ReadingSeries":
+        """Build straight from Reading.from_dict style dicts, skipping Reading."""
+        series = cls.__new__(cls)
+        rows = []
+        tzinfo = None
+        for dict_ in dicts:
+            timestamp = datetime.fromisoformat(dict_["timestamp"])
+            if not rows:
+                tzinfo = timestamp.tzinfo
+            elif (timestamp.tzinfo is None) != (tzinfo is None):
+                raise _mixed_timezones_error()
+            rows.append(
+                (
+                    to_epoch_seconds(timestamp),
+                    dict_["cumulative"],
+                    dict_["units"],
+                    _utc_offset(timestamp),
+                )
+            )
+        series._set_rows(rows, tzinfo)
+        return series
+
+    @classmethod
+    def from_columns(
+        cls,
+        timestamps: Sequence[int],
+        cumulatives: Sequence[int],
+        units: Optional[str],
+        tzinfo: Optional[tzinfo_] = None,
+        utc_offsets: Optional[Sequence[int]] = None,
+    ) -> "ReadingSeries":
+        """Wrap columns that are already sorted by timestamp, without copying.
+
+        utc_offsets is each reading's UTC offset in seconds, if they aren't all in
+        tzinfo (see the utc_offsets property).
+        """
+        if len(timestamps) != len(cumulatives) or (
+            utc_offsets is not None and len(utc_offsets) != len(timestamps)
+        ):
+            raise ValueError("Columns must be the same length")
+        series = cls.__new__(cls)
+        series._timestamps = timestamps
+        series._cumulatives = cumulatives
+        series._units = units if timestamps else None
+        series._row_units = None
+        series._tzinfo = tzinfo
+        series._row_offsets = utc_offsets
+        series._usage_by_slot = {}
+        return series
+
+    def _set_rows(self, rows: Iterable[Tuple[int, int, str, Optional[int]]], tzinfo):
+        rows = sorted(rows, key=itemgetter(0))
+        self._timestamps = array("q", (row[0] for row in rows))
+        self._cumulatives = array("q", (row[1] for row in rows))
+        self._tzinfo = tzinfo
+        units = set(row[2] for row in rows)
+        self._units = next(iter(units)) if len(units) == 1 else None
+        # Only an invalid series (see Account.validate) keeps a per-reading column
+        self._row_units = [row[2] for row in rows] if len(units) > 1 else None
+        offsets = set(row[3] for row in rows)
+        self._row_offsets = (
+            array("q", (row[3] for row in rows)) if len(offsets) > 1 else None
+        )
+        self._usage_by_slot = {}  # slot seconds -> usage_by_slot
+
+    @classmethod
+    def coerce(cls, readings: Union["ReadingSeries", Iterable[Reading]]):
+        """Return readings as a ReadingSeries, without copying if it already is one."""
+        if isinstance(readings, cls):
+            return readings
+        return cls(readings)
+
+    @property
+    def timestamps(self) -> Sequence[int]:
+        """Epoch seconds column - do not modify."""
+        return self._timestamps
+
+    @property
+    def cumulatives(self) -> Sequence[int]:
+        """Cumulative value column - do not modify."""
+        return self._cumulatives
+
+    @property
+    def tzinfo(self) -> Optional[tzinfo_]:
+        return self._tzinfo
+
+    @property
+    def utc_offsets(self) -> Optional[Sequence[int]]:
+        """Each reading's UTC offset in seconds, or None if they're all in tzinfo -
+        do not modify."""
+        return self._row_offsets
+
+    @property
+    def units(self) -> FrozenSet[str]:
+        if self._row_units is not None:
+            return frozenset(self._row_units)
+        return frozenset() if self._units is None else frozenset((self._units,))
+
+    def add(self, reading: Reading):
+        """Insert a reading, keeping the series sorted and valid.
+
+        Checking for a duplicate timestamp is a binary search, the units are checked
+        against the series, and adding the latest reading is an append.
+        """
+        if self and (reading.timestamp.tzinfo is None) != (self._tzinfo is None):
+            raise _mixed_timezones_error()
+        if self and self._row_units is None and reading.units != self._units:
+            raise ValueError(
+                f"Reading is in {reading.units!r} but the series is in {self._units!r}"
+            )
+
+        timestamp = to_epoch_seconds(reading.timestamp)
+        index = bisect_left(self._timestamps, timestamp)
+        if index < len(self) and self._timestamps[index] == timestamp:
+            raise ValueError(f"There is already a reading at {reading.timestamp}")
+
+        if not isinstance(self._timestamps, array):
+            # e.g. memoryviews onto a (read only) mapped file
+            self._timestamps = array("q", self._timestamps)
+            self._cumulatives = array("q", self._cumulatives)
+        if not self:
+            self._units = reading.units
+            self._tzinfo = reading.timestamp.tzinfo
+            self._row_offsets = None
+        offset = _utc_offset(reading.timestamp)
+        if self._row_offsets is None and offset != _utc_offset(
+            from_epoch_seconds(timestamp, self._tzinfo)
+        ):
+            self._row_offsets = array(
+                "q",
+                (
+                    _utc_offset(from_epoch_seconds(seconds, self._tzinfo))
+                    for seconds in self._timestamps
+                ),
+            )
+        self._timestamps.insert(index, timestamp)
+        self._cumulatives.insert(index, reading.cumulative)
+        if self._row_units is not None:
+            self._row_units.insert(index, reading.units)
+        if self._row_offsets is not None:
+            self._row_offsets.insert(index, offset)
+        self._usage_by_slot = {}
+
+    def first_duplicated_timestamp(self) -> Optional[datetime]:
+        """Return the earliest timestamp with more than one reading, if any."""
+        timestamps = self._timestamps
+        index = _first_true(map(eq, timestamps, islice(timestamps, 1, None)))
+        if index is None:
+            return None
+        return from_epoch_seconds(timestamps[index], self._tzinfo)
+
+    def first_decrease(self) -> Optional[Reading]:
+        """Return the earliest reading lower than the one before it, if any."""
+        cumulatives = self._cumulatives
+        index = _first_true(map(gt, cumulatives, islice(cumulatives, 1, None)))
+        if index is None:
+            return None
+        return self._reading(index + 1)
+
+    def interpolate(self, seconds: int, extrapolate: bool = False) -> Fraction:
+        """Return the exact cumulative value at the epoch seconds.
+
+        Between readings, usage is taken to be evenly spread. Outside of the readings
+        raises ValueError, unless extrapolate is true - then the line through the
+        nearest two readings is carried on.
+
+        This is a binary search, so cumulative values are like a prefix sum of the
+        usage: the usage between any two times takes O(log n).
+        """
+        timestamps = self._timestamps
+        index = bisect_left(timestamps, seconds)
+        if index < len(timestamps) and timestamps[index] == seconds:
+            return Fraction(self._cumulatives[index])
+        if not 0 < index < len(timestamps):
+            if not extrapolate:
+                raise ValueError(
+                    f"{from_epoch_seconds(seconds, self._tzinfo)} is outside of the "
+                    "readings"
+                )
+            if len(timestamps) < 2:
+                raise ValueError("Need at least two readings to extrapolate")
+            index = min(max(index, 1), len(timestamps) - 1)
+        before, after = index - 1, index
+        cumulatives = self._cumulatives
+        return cumulatives[before] + Fraction(
+            (cumulatives[after] - cumulatives[before])
+            * (seconds - timestamps[before]),
+            timestamps[after] - timestamps[before],
+        )
+
+    def cumulative_at(self, timestamp: datetime, extrapolate: bool = False) -> Decimal:
+        """Return the cumulative value at the timestamp (see interpolate)."""
+        return fraction_to_decimal(
+            self.interpolate(to_epoch_seconds(timestamp), extrapolate)
+        )
+
+    def usage_between(
+        self, start: datetime, end: datetime, extrapolate: bool = False
+    ) -> Decimal:
+        """Return the usage from start to end (see interpolate)."""
+        return fraction_to_decimal(
+            self.interpolate(to_epoch_seconds(end), extrapolate)
+            - self.interpolate(to_epoch_seconds(start), extrapolate)
+        )
+
+    def usage_by_slot(self, slot_seconds: int) -> Tuple[int, ...]:
+        """Return the usage after each reading, added up by the slot of the day it was
+        taken in (e.g. for time of use rates, see billing.tariffs).
+
+        The day is split into slots of slot_seconds, in each reading's timezone. This
+        loops over every reading, so it's kept for each slot size until a reading is
+        added.
+        """
+        usage_by_slot = self._usage_by_slot.get(slot_seconds)
+        if usage_by_slot is None:
+            usage_by_slot = self._add_up_usage_by_slot(slot_seconds)
+            self._usage_by_slot[slot_seconds] = usage_by_slot
+        return usage_by_slot
+
+    def _add_up_usage_by_slot(self, slot_seconds: int) -> Tuple[int, ...]:
+        usage_by_slot = [0] * (_SECONDS_IN_DAY // slot_seconds)
+        tzinfo = self._tzinfo
+        fixed_offset = _fixed_utc_offset(tzinfo)
+        if self._row_offsets is not None:
+            offsets = self._row_offsets
+        elif fixed_offset is not None:
+            offsets = repeat(fixed_offset)
+        else:
+            offsets = (
+                _utc_offset(from_epoch_seconds(timestamp, tzinfo))
+                for timestamp in self._timestamps
+            )
+        cumulatives = self._cumulatives
+        for timestamp, offset, before, after in zip(
+            self._timestamps, offsets, cumulatives, islice(cumulatives, 1, None)
+        ):
+            usage_by_slot[
+                (timestamp + offset) % _SECONDS_IN_DAY // slot_seconds
+            ] += after - before
+        return tuple(usage_by_slot)
+
+    def latest_two(self) -> Tuple[Reading, Reading]:
+        """Return the two most recent readings (there must be at least two)."""
+        return self[-2], self[-1]
+
+    def between(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> "ReadingSeries":
+        """Return the readings taken from start (inclusive) to end (exclusive)."""
+        return self[self._index_range(start, end)]
+
+    def _index_range(self, start: Optional[datetime], end: Optional[datetime]):
+        low = 0
+        if start is not None:
+            low = bisect_left(self._timestamps, _ceil_epoch_seconds(start))
+        high = len(self)
+        if end is not None:
+            high = bisect_left(self._timestamps, _ceil_epoch_seconds(end))
+        return slice(low, high)
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def __iter__(self) -> Iterator[Reading]:
+        return (self._reading(index) for index in range(len(self)))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            series = ReadingSeries.from_columns(
+                self._timestamps[index],
+                self._cumulatives[index],
+                None,
+                self._tzinfo,
+                None if self._row_offsets is None else self._row_offsets[index],
+            )
+            if self._row_units is not None:
+                series._row_units = self._row_units[index]
+            elif series:
+                series._units = self._units
+            return series
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ReadingSeries index out of range")
+        return self._reading(index)
+
+    def _reading(self, index: int) -> Reading:
+        return Reading(
+            cumulative=self._cumulatives[index],
+            timestamp=from_epoch_seconds(self._timestamps[index], self._tzinfo),
+            units=self._units if self._row_units is None else self._row_units[index],
+        )
+
+    def __eq__(self, other):
+        if isinstance(other, ReadingSeries):
+            return (
+                self._timestamps == other._timestamps
+                and self._cumulatives == other._cumulatives
+                and self._units == other._units
+                and self._row_units == other._row_units
+                and (self._tzinfo is None) == (other._tzinfo is None)
+            )
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self)!r})"
+
+    def __getstate__(self):
+        # Columns can be memoryviews (e.g. onto a mapped file), which can't be pickled
+        state = self.__dict__.copy()
+        state["_timestamps"] = array("q", self._timestamps)
+        state["_cumulatives"] = array("q", self._cumulatives)
+        return state
+
+
+def _utc_offset(timestamp: datetime) -> Optional[int]:
+    """Return the offset in seconds (None if naive)."""
+    offset = timestamp.utcoffset()
+    return None if offset is None else offset // _SECOND
+
+
+def _fixed_utc_offset(tzinfo: Optional[tzinfo_]) -> Optional[int]:
+    """Return the offset in seconds, or None if it changes (e.g. summer time)."""
+    if tzinfo is None:
+        return 0
+    if isinstance(tzinfo, timezone):
+        return tzinfo.utcoffset(None) // _SECOND
+    return None
+
+
+def _mixed_timezones_error() -> "ValidationError":
+    return ValidationError(
+        "Can't mix timezone aware and naive timestamps", "mixed_timezones"
+    )
+
+
+def _first_true(values: Iterable[bool]) -> Optional[int]:
+    # Kept to map/compress so that checking a column doesn't loop in Python
+    return next(compress(count(), values), None)
+
+
+class ValidationError(ValueError):
+    """Readings which the rest of the system can't handle.
+
+    check is which check failed (see Account.validate), for reporting.
+    """
+
+    def __init__(self, message: str, check: str, timestamp: Optional[datetime] = None):
+        super().__init__(message)
+        self.check = check
+        self.timestamp = timestamp
+
+
+class _Lazy:
+    """Lets a dataclass put off creating its _LAZY_FIELDS until one is accessed.
+
+    The loader returns the values of those fields. It should be picklable (e.g. a
+    partial of a module level function) so that unloaded objects can be sent to
+    other processes.
+    """
+
+    _LAZY_FIELDS: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_loader(cls, name: str, loader: Callable[[], Dict[str, Any]]):
+        self = cls.__new__(cls)
+        self.name = name
+        self._loader = loader
+        return self
+
+    @property
+    def is_loaded(self) -> bool:
+        return "_loader" not in self.__dict__
+
+    def _ensure_loaded(self):
+        if "_loader" in self.__dict__:
+            # Only forget the loader once it succeeds, so errors happen every time
+            self.__dict__.update(self.__dict__["_loader"]())
+            del self.__dict__["_loader"]
+            self._after_load()
+
+    def _after_load(self):
+        pass
+
+    def __getattr__(self, name):
+        # Only called when the attribute is missing, i.e. not loaded yet
+        if name in self._LAZY_FIELDS and "_loader" in self.__dict__:
+            self._ensure_loaded()
+            return getattr(self, name)
+        raise AttributeError(
+            f"{type(self).__name__!r} object has no attribute {name!r}"
+        )
+
+
+def _count_account_readings(account: "Account") -> int:
+    return len(account.electricity_readings) + len(account.gas_readings)
+
+
 @dataclass
-class Account:
+class Account(_Lazy):
     name: str
-    electricity_readings: List[Reading]
-    gas_readings: List[Reading]
+    electricity_readings: ReadingSeries
+    gas_readings: ReadingSeries
 
-    # TODO: Better validation design (ValidationError, Factory/Builder method, separate ValidAccount?)
-    def validate(self):
-        self._validate_readings(self.electricity_readings)
-        self._validate_readings(self.gas_readings)
+    _LAZY_FIELDS = ("electricity_readings", "gas_readings")
 
-    def _validate_readings(self, readings):
-        self._validate_no_duplicated_timestamp(readings)
-        self._validate_single_units(readings)
+    def __post_init__(self):
+        # Lists of readings are accepted, but sorted once here
+        self.electricity_readings = ReadingSeries.coerce(self.electricity_readings)
+        self.gas_readings = ReadingSeries.coerce(self.gas_readings)
 
-    @staticmethod
-    def _validate_no_duplicated_timestamp(readings):
-        # TODO: raise ValidationError Exception
-        assert len(set(reading.timestamp for reading in readings)) == len(readings)
+    def add_electricity_reading(self, reading: Reading):
+        """Add a new reading without revalidating the others (see ReadingSeries.add)."""
+        self.electricity_readings.add(reading)
+
+    def add_gas_reading(self, reading: Reading):
+        """Add a new reading without revalidating the others (see ReadingSeries.add)."""
+        self.gas_readings.add(reading)
+
+    @instrumented("validate", count_readings=_count_account_readings)
+    def validate(self):
+        """Raise ValidationError for the first problem with the readings.
+
+        Readings which decrease are allowed (estimating them raises an error
+        instead) - see billing.validation to find those up front, and every problem
+        of every account.
+        """
+        self._validate_readings(self.electricity_readings, "electricity")
+        self._validate_readings(self.gas_readings, "gas")
 
     @staticmethod
-    def _validate_single_units(readings):
-        # This is obviously not terrible, but rest of system does not handle conversions
-        assert len(set(reading.units for reading in readings)) <= 1
+    def _validate_readings(readings, fuel: str):
+        for problem in find_reading_problems(ReadingSeries.coerce(readings), fuel):
+            raise problem
 
     @classmethod
-    def from_dict(cls, key, value):
-        account = cls(
-            name=key,
-            electricity_readings=[
-                Reading.from_dict(dict_) for dict_ in value.get("electricity", [])
-            ],
-            gas_readings=[Reading.from_dict(dict_) for dict_ in value.get("gas", [])],
-        )
-        account.validate()
+    def from_dict(cls, key, value, lazy=False):
+        """If lazy, the readings are only parsed and validated when first used."""
+        account = cls.from_loader(key, partial(_load_account_dict, value))
+        if not lazy:
+            account._ensure_loaded()
         return account
 
 
+def find_reading_problems(
+    readings: ReadingSeries, fuel: str
+) -> Iterator[ValidationError]:
+    """Yield an error for each of Account.validate's checks that the readings fail."""
+    timestamp = readings.first_duplicated_timestamp()
+    if timestamp is not None:
+        yield ValidationError(
+            f"More than one {fuel} reading at {timestamp}",
+            "duplicated_timestamp",
+            timestamp,
+        )
+    # This is obviously not terrible, but rest of system does not handle conversions
+    if len(readings.units) > 1:
+        units = ", ".join(sorted(readings.units))
+        yield ValidationError(
+            f"{fuel.capitalize()} readings are in more than one units: {units}",
+            "mixed_units",
+        )
+
+
+def _count_account_dict_readings(value) -> int:
+    return len(value.get("electricity", ())) + len(value.get("gas", ()))
+
+
+@instrumented("load_account", count_readings=_count_account_dict_readings)
+def _load_account_dict(value):
+    readings = {
+        "electricity_readings": ReadingSeries.from_dicts(value.get("electricity", [])),
+        "gas_readings": ReadingSeries.from_dicts(value.get("gas", [])),
+    }
+    Account._validate_readings(readings["electricity_readings"], "electricity")
+    Account._validate_readings(readings["gas_readings"], "gas")
+    return readings
+
+
+class NotFoundError(LookupError):
+    pass
+
+
+class MemberNotFoundError(NotFoundError):
+    pass
+
+
+class AccountNotFoundError(NotFoundError):
+    pass
+
+
 @dataclass
-class Member:
+class Member(_Lazy):
     name: str
     accounts: List[Account]
+    _accounts_by_name: Dict[str, Account] = field(
+        init=False, repr=False, compare=False
+    )
+
+    _LAZY_FIELDS = ("accounts", "_accounts_by_name")
+
+    def __post_init__(self):
+        # Reversed so that the first of any duplicate names wins, like a list scan
+        self._accounts_by_name = {
+            account.name: account for account in reversed(self.accounts)
+        }
 
     def get_account(self, name):
-        # TODO: This is suboptimal for large lists
-        return next(account for account in self.accounts if account.name == name)
+        try:
+            return self._accounts_by_name[name]
+        except KeyError:
+            raise AccountNotFoundError(
+                f"Member {self.name!r} has no account {name!r}"
+            ) from None
+
+    def add_account(self, account: Account):
+        if account.name in self._accounts_by_name:
+            raise ValueError(f"Member {self.name!r} already has {account.name!r}")
+        self.accounts.append(account)
+        self._accounts_by_name[account.name] = account
+
+    def remove_account(self, name) -> Account:
+        account = self.get_account(name)
+        _remove_identical(self.accounts, account)
+        del self._accounts_by_name[name]
+        return account
+
+    def _after_load(self):
+        self.__post_init__()
 
     @classmethod
-    def from_dict(cls, key, value):
+    def from_dict(cls, key, value, lazy=False):
+        """If lazy, the accounts are only created when first used (and then lazily)."""
+        if lazy:
+            return cls.from_loader(key, partial(_load_member_dict, value))
         return cls(
             name=key,
             accounts=[
@@ -85,32 +645,84 @@ class Member:
         )
 
 
+def _load_member_dict(value):
+    return {
+        "accounts": [
+            Account.from_dict(key=account_key, value=account_value, lazy=True)
+            for account_key, account_value in value.items()
+        ]
+    }
+
+
 # TODO: Need a better name than DataRoot :)
 @dataclass
 class DataRoot:
-    members: Member
+    """All of the members.
+
+    Use add_member/remove_member (and Member.add_account/remove_account) rather than
+    changing the lists directly, so that lookups by name stay up to date.
+    """
+
+    members: List[Member]
+    _members_by_name: Dict[str, Member] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._members_by_name = {
+            member.name: member for member in reversed(self.members)
+        }
 
     def get_member(self, name):
-        # TODO: This is suboptimal for large lists
-        return next(member for member in self.members if member.name == name)
+        try:
+            return self._members_by_name[name]
+        except KeyError:
+            raise MemberNotFoundError(f"No member {name!r}") from None
+
+    def add_member(self, member: Member):
+        if member.name in self._members_by_name:
+            raise ValueError(f"Member {member.name!r} already exists")
+        self.members.append(member)
+        self._members_by_name[member.name] = member
+
+    def remove_member(self, name) -> Member:
+        member = self.get_member(name)
+        _remove_identical(self.members, member)
+        del self._members_by_name[name]
+        return member
 
     @classmethod
-    def from_dict(cls, dict_):
+    def from_dict(cls, dict_, lazy=False):
+        """If lazy, each member is only built when first used - see Member.from_dict.
+
+        With lazy=True, invalid readings are only found (and raised) when they're
+        first used.
+        """
         return cls(
             members=[
-                Member.from_dict(key=member_key, value=member_value)
+                Member.from_dict(key=member_key, value=member_value, lazy=lazy)
                 for member_key, member_value in dict_.items()
             ]
         )
 
     @classmethod
-    def from_json(cls, json_str):
+    @instrumented("from_json")
+    def from_json(cls, json_str, lazy=False):
         dict_ = json.loads(json_str)
-        return cls.from_dict(dict_)
+        return cls.from_dict(dict_, lazy=lazy)
+
+
+def _remove_identical(list_, item):
+    """Unlike list.remove, don't remove a different (but equal) item."""
+    del list_[next(index for index, other in enumerate(list_) if other is item)]
+
+
+# The estimates have __slots__ (so no per-instance __dict__), as bulk runs can keep
+# millions of them.
 
 
 @dataclass
 class UsageEstimate:
+    __slots__ = ("billing_date", "time_period", "usage_estimate", "usage_units")
+
     billing_date: datetime
     time_period: timedelta
     usage_estimate: Decimal
@@ -119,6 +731,14 @@ class UsageEstimate:
 
 @dataclass
 class BillEstimate:
+    __slots__ = (
+        "billing_date",
+        "billing_period",
+        "usage_estimate",
+        "usage_units",
+        "price_estimate",
+    )
+
     billing_date: datetime
     billing_period: timedelta
     usage_estimate: Decimal
@@ -128,15 +748,72 @@ class BillEstimate:
 
 @dataclass
 class DualBillEstimate:
+    __slots__ = ("billing_date", "electricity_bill_estimate", "gas_bill_estimate")
+
     billing_date: datetime
     electricity_bill_estimate: Optional[BillEstimate]
     gas_bill_estimate: Optional[BillEstimate]
 
 
-@dataclass
+@dataclass(frozen=True)
+class TimeOfUseRate:
+    """A unit charge for the readings taken from start to end each day (e.g. peak).
+
+    end is exclusive, and may be before start to go past midnight.
+    """
+
+    start: time
+    end: time
+    unit_charge: Decimal
+
+    @classmethod
+    def from_dict(cls, dict_):
+        return cls(
+            start=time.fromisoformat(dict_["start"]),
+            end=time.fromisoformat(dict_["end"]),
+            unit_charge=Decimal(dict_["unit_charge"]),
+        )
+
+
+@dataclass(frozen=True)
+class Tier:
+    """A unit charge for the usage in the billing period, up to a limit."""
+
+    up_to: Decimal
+    unit_charge: Decimal
+
+    @classmethod
+    def from_dict(cls, dict_):
+        return cls(
+            up_to=Decimal(dict_["up_to"]),
+            unit_charge=Decimal(dict_["unit_charge"]),
+        )
+
+
+@dataclass(frozen=True)
 class Tariff:
+    """A standing charge per day, and a unit charge.
+
+    The unit charge can be overridden at times of the day (time_of_use), or for the
+    first units of the billing period (tiers, in increasing order of up_to), but
+    not both. See billing.tariffs.
+    """
+
     standing_charge: Decimal
     unit_charge: Decimal
+    time_of_use: Tuple[TimeOfUseRate, ...] = ()
+    tiers: Tuple[Tier, ...] = ()
+
+    def __post_init__(self):
+        if self.time_of_use and self.tiers:
+            raise ValueError("A tariff can't have both time of use rates and tiers")
+        limits = [tier.up_to for tier in self.tiers]
+        if limits != sorted(set(limits)):
+            raise ValueError("Tiers must be in increasing order of up_to")
+
+    @property
+    def is_flat(self) -> bool:
+        return not self.time_of_use and not self.tiers
 
     @classmethod
     def from_json(cls, json_str):
@@ -148,10 +825,14 @@ class Tariff:
         return cls(
             standing_charge=Decimal(dict_["standing_charge"]),
             unit_charge=Decimal(dict_["unit_charge"]),
+            time_of_use=tuple(
+                TimeOfUseRate.from_dict(rate) for rate in dict_.get("time_of_use", ())
+            ),
+            tiers=tuple(Tier.from_dict(tier) for tier in dict_.get("tiers", ())),
         )
 
 
-@dataclass
+@dataclass(frozen=True)
 class DualTariff:
     electricity_tariff: Tariff
     gas_tariff: Tariff
@@ -0,0 +1,297 @@
+"""Estimate bills in a pipeline of stages, connected by bounded queues.
+
+    stats = PipelineStats()
+    for result in iter_pipelined_dual_bill_estimates(members, ..., stats=stats):
+        ...
+    print(stats.snapshot())
+
+The stages are:
+
+    load      get each account's readings (e.g. parsing lazily loaded members)
+    estimate  estimate the usage of each fuel
+    price     price each fuel's usage estimate
+
+Each fuel of each account goes through the stages separately, and each stage has
+its own threads, so electricity and gas (and the next accounts) overlap. A slow
+stage only holds up the others once the queue in front of it is full, and the stats
+show which stage that is.
+
+The threads share the GIL, so this overlaps waiting (e.g. on shard files, or mapped
+files being paged in) more than arithmetic - billing.runner spreads the work over
+processes instead.
+"""
+
+import queue
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from time import perf_counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from billing.billing import BasePricingEngine, get_bill_estimate
+from billing.models import (BillEstimate, DualBillEstimate, DualTariff, Member,
+                            ReadingSeries, UsageEstimate)
+from billing.runner import AccountBillResult
+from billing.tariffs import resolve_tariff
+from billing.usage.base import BaseUsageEstimator
+
+_FUELS = ("electricity", "gas")
+_DONE = object()
+# How often blocked threads check whether the run was stopped early
+_POLL_SECONDS = 0.1
+
+
+class PipelineStats:
+    """Total up the items and busy time of each stage (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    def start(self, stage: str, workers: int):
+        with self._lock:
+            if self._started is None:
+                self._started = perf_counter()
+            self._finished = None
+            self._stages.setdefault(
+                stage, {"workers": 0, "items": 0, "busy_seconds": 0.0}
+            )["workers"] = workers
+
+    def record(self, stage: str, seconds: float, items: int = 1):
+        with self._lock:
+            totals = self._stages[stage]
+            totals["items"] += items
+            totals["busy_seconds"] += seconds
+
+    def finish(self):
+        with self._lock:
+            self._finished = perf_counter()
+
+    def snapshot(self) -> dict:
+        """Return a copy of the totals so far, as plain (JSON-able) data.
+
+        For each stage, utilisation is the fraction of the run its workers were
+        busy, and capacity is how many items a second it could handle if it never
+        waited. The limiting stage is the one with the highest utilisation.
+        """
+        with self._lock:
+            if self._started is None:
+                return {"seconds": 0.0, "stages": {}, "limiting_stage": None}
+            seconds = (self._finished or perf_counter()) - self._started
+            stages = {}
+            for stage, totals in self._stages.items():
+                busy_seconds = totals["busy_seconds"]
+                workers = totals["workers"]
+                stages[stage] = dict(
+                    totals,
+                    items_per_second=totals["items"] / seconds if seconds else 0.0,
+                    capacity=(
+                        totals["items"] * workers / busy_seconds
+                        if busy_seconds
+                        else None
+                    ),
+                    utilisation=(
+                        busy_seconds / (workers * seconds) if seconds else 0.0
+                    ),
+                )
+        return {
+            "seconds": seconds,
+            "stages": stages,
+            "limiting_stage": max(
+                stages, key=lambda stage: stages[stage]["utilisation"], default=None
+            ),
+        }
+
+
+@dataclass
+class _FuelItem:
+    """One fuel of one account, as it goes through the stages."""
+
+    index: int  # Of the account, in the order of members
+    member_name: str
+    account_name: str
+    fuel: str
+    readings: Optional[ReadingSeries] = None
+    usage_estimate: Optional[UsageEstimate] = None
+    bill_estimate: Optional[BillEstimate] = None
+    error: Optional[str] = None
+
+
+def iter_pipelined_dual_bill_estimates(
+    members: Iterable[Member],
+    dual_tariff: DualTariff,
+    estimator: BaseUsageEstimator,
+    billing_date: datetime,
+    pricing_engine: Optional[BasePricingEngine] = None,
+    workers: int = 2,
+    queue_size: int = 64,
+    stats: Optional[PipelineStats] = None,
+) -> Iterator[AccountBillResult]:
+    """Yield a result for every account of every member, in order.
+
+    Like billing.runner.iter_dual_bill_estimates, except that the estimate and
+    price stages each have workers threads, with up to queue_size fuels waiting in
+    front of them. An account which fails to estimate is yielded with its error.
+    """
+    stats = stats or PipelineStats()
+    stop = threading.Event()
+    failures: List[BaseException] = []
+    loaded = queue.Queue(queue_size)
+    estimated = queue.Queue(queue_size)
+    priced = queue.Queue(queue_size)
+
+    def estimate(item: _FuelItem):
+        if item.readings:
+            item.usage_estimate = estimator.estimate_usage(item.readings, billing_date)
+
+    def price(item: _FuelItem):
+        if item.usage_estimate is not None:
+            tariff = getattr(dual_tariff, f"{item.fuel}_tariff")
+            item.bill_estimate = get_bill_estimate(
+                item.usage_estimate,
+                resolve_tariff(tariff, item.readings),
+                pricing_engine,
+            )
+
+    stats.start("load", 1)
+    threading.Thread(
+        target=_load, args=(members, loaded, stats, stop, failures), daemon=True
+    ).start()
+    _start_stage("estimate", estimate, workers, loaded, estimated, stats, stop)
+    _start_stage("price", price, workers, estimated, priced, stats, stop)
+
+    try:
+        yield from _collect(priced, billing_date, stop)
+        if failures:
+            raise failures[0]
+    finally:
+        stop.set()
+        stats.finish()
+
+
+def _load(
+    members: Iterable[Member],
+    outbox: queue.Queue,
+    stats: PipelineStats,
+    stop: threading.Event,
+    failures: List[BaseException],
+):
+    index = 0
+    # Includes getting each member, e.g. parsing it from billing.streaming
+    start = perf_counter()
+    try:
+        for member in members:
+            for account in member.accounts:
+                items = [
+                    _FuelItem(index, member.name, account.name, fuel) for fuel in _FUELS
+                ]
+                for item in items:
+                    try:
+                        item.readings = getattr(account, f"{item.fuel}_readings")
+                    except Exception as e:
+                        item.error = f"{type(e).__name__}: {e}"
+                stats.record("load", perf_counter() - start, len(items))
+                for item in items:
+                    _put(outbox, item, stop)
+                index += 1
+                start = perf_counter()
+    except Exception as e:
+        # e.g. the members' file is invalid - the caller raises it
+        failures.append(e)
+    _put(outbox, _DONE, stop)
+
+
+def _start_stage(
+    name: str,
+    process: Callable[[_FuelItem], None],
+    workers: int,
+    inbox: queue.Queue,
+    outbox: queue.Queue,
+    stats: PipelineStats,
+    stop: threading.Event,
+):
+    running = [workers]
+    lock = threading.Lock()
+
+    def work():
+        while True:
+            item = _get(inbox, stop)
+            if item is _DONE:
+                break
+            start = perf_counter()
+            if item.error is None:
+                try:
+                    process(item)
+                except Exception as e:
+                    item.error = f"{type(e).__name__}: {e}"
+            stats.record(name, perf_counter() - start)
+            _put(outbox, item, stop)
+
+        # Let the other workers see it, and the last one tells the next stage
+        _put(inbox, _DONE, stop)
+        with lock:
+            running[0] -= 1
+            if running[0]:
+                return
+        _put(outbox, _DONE, stop)
+
+    stats.start(name, workers)
+    for _ in range(workers):
+        threading.Thread(target=work, daemon=True).start()
+
+
+def _collect(
+    inbox: queue.Queue, billing_date: datetime, stop: threading.Event
+) -> Iterator[AccountBillResult]:
+    """Put each account's fuels back together, and back in order."""
+    fuels_by_index: Dict[int, Dict[str, _FuelItem]] = {}
+    next_index = 0
+    while True:
+        item = _get(inbox, stop)
+        if item is _DONE:
+            return
+        fuels = fuels_by_index.setdefault(item.index, {})
+        fuels[item.fuel] = item
+        while len(fuels_by_index.get(next_index, ())) == len(_FUELS):
+            yield _to_result(fuels_by_index.pop(next_index), billing_date)
+            next_index += 1
+
+
+def _to_result(
+    fuels: Dict[str, _FuelItem], billing_date: datetime
+) -> AccountBillResult:
+    items = [fuels[fuel] for fuel in _FUELS]
+    member_name, account_name = items[0].member_name, items[0].account_name
+    # Like estimating the fuels one after the other, the first error wins
+    error = next((item.error for item in items if item.error is not None), None)
+    if error is not None:
+        return AccountBillResult(member_name, account_name, None, error)
+    return AccountBillResult(
+        member_name,
+        account_name,
+        DualBillEstimate(
+            billing_date=billing_date,
+            electricity_bill_estimate=fuels["electricity"].bill_estimate,
+            gas_bill_estimate=fuels["gas"].bill_estimate,
+        ),
+    )
+
+
+def _get(inbox: queue.Queue, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            return inbox.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            pass
+    return _DONE
+
+
+def _put(outbox: queue.Queue, item, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            outbox.put(item, timeout=_POLL_SECONDS)
+            return
+        except queue.Full:
+            pass
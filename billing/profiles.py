@@ -0,0 +1,83 @@
+"""Usage over any range of time, and rolled up by day, week or month.
+
+    usage_by_period(account.electricity_readings, "day")
+    account.electricity_readings.usage_between(start, end)
+
+The readings are interpolated at each boundary (see ReadingSeries.interpolate), so
+each period is a binary search however many readings there are - rolling up years
+of half-hourly readings by month only looks at the readings either side of each
+month boundary.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from datetime import tzinfo as tzinfo_
+from decimal import Decimal
+from typing import Iterator, List, Optional
+
+from billing.models import ReadingSeries, from_epoch_seconds
+
+PERIODS = ("day", "week", "month")
+
+
+@dataclass(frozen=True)
+class PeriodUsage:
+    start: datetime
+    end: datetime
+    usage: Decimal
+
+
+def usage_by_period(
+    readings: ReadingSeries,
+    period: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[PeriodUsage]:
+    """Split start to end (default: the first to the last reading) by period.
+
+    Periods start at midnight in the readings' timezone, weeks on Mondays. The first
+    and last periods are cut short to start and end.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Period must be one of {', '.join(PERIODS)}")
+    if not readings:
+        return []
+    if start is None:
+        start = from_epoch_seconds(readings.timestamps[0], readings.tzinfo)
+    if end is None:
+        end = from_epoch_seconds(readings.timestamps[-1], readings.tzinfo)
+
+    boundaries = [start]
+    boundaries.extend(_period_starts(start, end, period, readings.tzinfo))
+    boundaries.append(end)
+    cumulatives = [readings.cumulative_at(boundary) for boundary in boundaries]
+    return [
+        PeriodUsage(start=period_start, end=period_end, usage=after - before)
+        for period_start, period_end, before, after in zip(
+            boundaries, boundaries[1:], cumulatives, cumulatives[1:]
+        )
+    ]
+
+
+def _period_starts(
+    start: datetime, end: datetime, period: str, tzinfo: Optional[tzinfo_]
+) -> Iterator[datetime]:
+    """Yield the start of each period after start, and before end."""
+    day = _local_date(start, tzinfo)
+    while True:
+        if period == "day":
+            day += timedelta(days=1)
+        elif period == "week":
+            day += timedelta(days=7 - day.weekday())
+        else:
+            day = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+        period_start = datetime(day.year, day.month, day.day, tzinfo=tzinfo)
+        if period_start >= end:
+            return
+        yield period_start
+
+
+def _local_date(timestamp: datetime, tzinfo: Optional[tzinfo_]) -> date:
+    if tzinfo is not None and timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(tzinfo)
+    return timestamp.date()
@@ -0,0 +1,240 @@
+"""Profile a run, to see which functions the time goes to.
+
+    with profile() as profiler:
+        list(iter_dual_bill_estimates(...))
+    print(profiler.format_top(20))
+    with open("profile.folded", "w") as file:
+        profiler.write_collapsed(file)
+
+or for a whole script:
+
+    $ python3 -m billing.profiling -o profile.folded bulk.py data.json ...
+
+The collapsed stacks ("outer;inner weight" per line) can be turned into a flame
+graph by e.g. flamegraph.pl or speedscope. Frames are labelled module:function,
+e.g. billing.usage.linear:per_second_increase.
+
+There are two modes:
+
+    sample         look at the stacks every interval seconds (low overhead,
+                   weights are samples)
+    deterministic  record every call, including of builtins such as
+                   datetime.fromisoformat or sorted (slower, weights are
+                   microseconds)
+
+Only the thread which starts profiling (and threads it then starts, e.g. see
+billing.pipeline) are profiled - not other processes, e.g. billing.runner's
+workers.
+"""
+
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from time import perf_counter_ns
+from typing import IO, Dict, Iterator, List, Tuple
+
+MODES = ("sample", "deterministic")
+_DEFAULT_INTERVAL = 0.001
+
+
+@dataclass(frozen=True)
+class FunctionStats:
+    name: str
+    self_weight: int  # While it was the innermost frame
+    total_weight: int  # While it was anywhere on the stack
+
+
+class Profiler:
+    """Records the weight of each stack between start and stop. Do not reuse."""
+
+    def __init__(self, mode: str = "sample", interval: float = _DEFAULT_INTERVAL):
+        if mode not in MODES:
+            raise ValueError(f"Mode must be one of {', '.join(MODES)}")
+        self.mode = mode
+        self.interval = interval
+        self.stacks: Dict[Tuple[str, ...], int] = Counter()
+        self._labels = {}  # code -> label
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sampler = None
+        self._ignored_thread_ids = set()
+        self._local = threading.local()
+
+    @property
+    def unit(self) -> str:
+        return "samples" if self.mode == "sample" else "us"
+
+    def start(self):
+        if self.mode == "sample":
+            # Threads which were already running, apart from this one
+            self._ignored_thread_ids = {
+                thread.ident for thread in threading.enumerate()
+            } - {threading.get_ident()}
+            self._sampler = threading.Thread(target=self._sample, daemon=True)
+            self._sampler.start()
+        else:
+            threading.setprofile(self._on_event)
+            self._seed_stack(sys._getframe(0))
+            sys.setprofile(self._on_event)
+
+    def stop(self):
+        if self.mode == "sample":
+            self._stopped.set()
+            self._sampler.join()
+        else:
+            sys.setprofile(None)
+            threading.setprofile(None)
+            with self._lock:
+                # Weights were recorded in nanoseconds
+                for stack, weight in self.stacks.items():
+                    self.stacks[stack] = weight // 1000
+
+    def top(self, n: int = 20) -> List[FunctionStats]:
+        """Return the n functions with the most weight of their own."""
+        self_weights = Counter()
+        total_weights = Counter()
+        for stack, weight in self.stacks.items():
+            self_weights[stack[-1]] += weight
+            for name in set(stack):
+                total_weights[name] += weight
+        return [
+            FunctionStats(name, self_weight, total_weights[name])
+            for name, self_weight in self_weights.most_common(n)
+        ]
+
+    def format_top(self, n: int = 20) -> str:
+        total = sum(self.stacks.values()) or 1
+        lines = [f"{'self':>7} {'total':>7}  function ({total} {self.unit} in all)"]
+        lines.extend(
+            f"{stats.self_weight / total:7.1%} {stats.total_weight / total:7.1%}  "
+            f"{stats.name}"
+            for stats in self.top(n)
+        )
+        return "\n".join(lines)
+
+    def write_collapsed(self, file: IO[str]):
+        for stack, weight in sorted(self.stacks.items()):
+            if weight:
+                file.write(f"{';'.join(stack)} {weight}\n")
+
+    def _sample(self):
+        ignored_thread_ids = self._ignored_thread_ids | {threading.get_ident()}
+        while not self._stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in ignored_thread_ids:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code, frame.f_globals))
+                    frame = frame.f_back
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def _seed_stack(self, frame):
+        """Start with the frames already running, so that their returns match up."""
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code, frame.f_globals))
+            frame = frame.f_back
+        self._local.stack = stack[::-1]
+        self._local.last = perf_counter_ns()
+
+    def _on_event(self, frame, event, arg):
+        now = perf_counter_ns()
+        local = self._local
+        stack = getattr(local, "stack", None)
+        if stack is None:
+            # A thread started while profiling
+            stack = local.stack = []
+        elif stack:
+            with self._lock:
+                self.stacks[tuple(stack)] += now - local.last
+
+        if event == "call":
+            stack.append(self._label(frame.f_code, frame.f_globals))
+        elif event == "c_call":
+            stack.append(self._builtin_label(arg))
+        elif stack:
+            # return, c_return or c_exception
+            stack.pop()
+        # Not counting the time taken here
+        local.last = perf_counter_ns()
+
+    def _label(self, code, globals_) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            label = self._labels[code] = f"{globals_.get('__name__', '?')}:{name}"
+        return label
+
+    @staticmethod
+    def _builtin_label(function) -> str:
+        # Not cached, as e.g. each call of a list's append is a new bound method
+        module = getattr(function, "__module__", None)
+        if module is None:
+            # e.g. a method of a builtin type, like datetime.fromisoformat
+            owner = getattr(function, "__self__", None)
+            owner = owner if isinstance(owner, type) else type(owner)
+            module = owner.__module__
+        return f"{module}:{getattr(function, '__qualname__', repr(function))}"
+
+
+@contextmanager
+def profile(
+    mode: str = "sample", interval: float = _DEFAULT_INTERVAL
+) -> Iterator[Profiler]:
+    """Profile the block (see Profiler)."""
+    profiler = Profiler(mode, interval)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+
+
+def main(argv=None):
+    import argparse
+    import runpy
+
+    parser = argparse.ArgumentParser(
+        description="Profile a Python script, e.g. bulk.py or example.py."
+    )
+    parser.add_argument(
+        "-o", "--output", help="write the collapsed stacks to this file"
+    )
+    parser.add_argument("--mode", choices=MODES, default="sample")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=_DEFAULT_INTERVAL,
+        help=f"seconds between samples (default: {_DEFAULT_INTERVAL})",
+    )
+    parser.add_argument(
+        "--top", type=int, default=20, help="functions to summarise (default: 20)"
+    )
+    parser.add_argument("script")
+    parser.add_argument("arguments", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+
+    sys.argv = [args.script] + args.arguments
+    exit_code = 0
+    with profile(args.mode, args.interval) as profiler:
+        try:
+            runpy.run_path(args.script, run_name="__main__")
+        except SystemExit as e:
+            exit_code = e.code
+    write_profile(profiler, args.output, args.top)
+    return exit_code
+
+
+def write_profile(profiler: Profiler, output, top: int):
+    """Write the collapsed stacks to the output path (if any), and the top to stderr."""
+    if output:
+        with open(output, "w") as file:
+            profiler.write_collapsed(file)
+    print(profiler.format_top(top), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""Share tariffs by id, with versions which take effect from a date.
+
+    registry = TariffRegistry.from_json(Path("tariffs.json").read_text())
+    registry.get("standard-electricity", billing_date)
+    get_bill_estimate(usage_estimate, "standard-electricity", registry=registry)
+
+The JSON has a list of versions for each tariff id, e.g.
+
+    {"standard-electricity": [
+        {"standing_charge": "23.23", "unit_charge": "12.123"},
+        {"effective_from": "2019-04-01", "standing_charge": "24", "unit_charge": "13"}
+    ]}
+
+Equal tariffs are interned, so only one copy of each is kept however many ids (or
+callers) use it.
+"""
+
+import json
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from billing.models import (DualTariff, NotFoundError, Tariff,
+                            from_epoch_seconds, to_epoch_seconds)
+
+# For each version: when it's effective from (in epoch seconds), and the tariff
+_Versions = Tuple[List[int], List[Tariff]]
+_ALWAYS = to_epoch_seconds(datetime.min)
+
+
+class TariffNotFoundError(NotFoundError):
+    pass
+
+
+class TariffRegistry:
+    def __init__(self):
+        self._interned: Dict[Tariff, Tariff] = {}
+        self._versions: Dict[str, _Versions] = {}
+
+    def intern(self, tariff: Tariff) -> Tariff:
+        """Return the registry's copy of an equal tariff, or keep this one."""
+        return self._interned.setdefault(tariff, tariff)
+
+    def add(
+        self,
+        tariff_id: str,
+        tariff: Tariff,
+        effective_from: Optional[datetime] = None,
+    ) -> Tariff:
+        """Add a version of the tariff, effective from the date (default: always).
+
+        Like readings, a naive date is taken as UTC. Returns the interned tariff.
+        """
+        tariff = self.intern(tariff)
+        starts, tariffs = self._versions.setdefault(tariff_id, ([], []))
+        start = _ALWAYS if effective_from is None else to_epoch_seconds(effective_from)
+        index = bisect_right(starts, start)
+        if index and starts[index - 1] == start:
+            raise ValueError(
+                f"Tariff {tariff_id!r} already has a version from {effective_from}"
+            )
+        starts.insert(index, start)
+        tariffs.insert(index, tariff)
+        return tariff
+
+    def get(self, tariff_id: str, at: datetime) -> Tariff:
+        """Return the version of the tariff in effect at the date."""
+        starts, tariffs = self._get_versions(tariff_id)
+        index = bisect_right(starts, to_epoch_seconds(at)) - 1
+        if index < 0:
+            raise TariffNotFoundError(f"No tariff {tariff_id!r} in effect at {at}")
+        return tariffs[index]
+
+    def periods(
+        self, tariff_id: str, start: datetime, end: datetime
+    ) -> List[Tuple[datetime, datetime, Tariff]]:
+        """Split start to end into the parts where each version is in effect.
+
+        Returns (start, end, tariff) for each part, in order. The parts' dates are in
+        start's timezone (or naive, if it is), whatever the versions were added with.
+        """
+        starts, tariffs = self._get_versions(tariff_id)
+        first = bisect_right(starts, to_epoch_seconds(start)) - 1
+        if first < 0:
+            raise TariffNotFoundError(f"No tariff {tariff_id!r} in effect at {start}")
+        last = bisect_right(starts, to_epoch_seconds(end) - 1)
+        # When the versions after the first one take effect, before end
+        boundaries = [
+            from_epoch_seconds(boundary, start.tzinfo)
+            for boundary in starts[first + 1 : last]
+        ]
+        return list(zip([start] + boundaries, boundaries + [end], tariffs[first:]))
+
+    def get_dual_tariff(
+        self, electricity_tariff_id: str, gas_tariff_id: str, at: datetime
+    ) -> DualTariff:
+        return DualTariff(
+            electricity_tariff=self.get(electricity_tariff_id, at),
+            gas_tariff=self.get(gas_tariff_id, at),
+        )
+
+    def _get_versions(self, tariff_id: str) -> _Versions:
+        try:
+            return self._versions[tariff_id]
+        except KeyError:
+            raise TariffNotFoundError(f"No tariff {tariff_id!r}") from None
+
+    def __contains__(self, tariff_id: str) -> bool:
+        return tariff_id in self._versions
+
+    @classmethod
+    def from_json(cls, json_str):
+        dict_ = json.loads(json_str)
+        return cls.from_dict(dict_)
+
+    @classmethod
+    def from_dict(cls, dict_):
+        registry = cls()
+        for tariff_id, versions in dict_.items():
+            for version in versions:
+                effective_from = version.get("effective_from")
+                if effective_from is not None:
+                    effective_from = datetime.fromisoformat(effective_from)
+                registry.add(tariff_id, Tariff.from_dict(version), effective_from)
+        return registry
+
+
+# Used by get_bill_estimate for tariff ids, unless it's given another registry
+TARIFF_REGISTRY = TariffRegistry()
@@ -0,0 +1,125 @@
+"""Estimate the bills of every account, spread over a pool of processes."""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+from billing.billing import BasePricingEngine
+from billing.models import DualBillEstimate, DualTariff, Member
+from billing.shortcuts import get_dual_bill_estimate_for_account
+from billing.usage.base import BaseUsageEstimator
+
+_DEFAULT_CHUNK_SIZE = 64
+
+
+@dataclass
+class AccountBillResult:
+    """The estimate for one account, or why it couldn't be estimated."""
+
+    member_name: str
+    account_name: str
+    dual_bill_estimate: Optional[DualBillEstimate]
+    error: Optional[str] = None
+
+
+def iter_dual_bill_estimates(
+    members: Iterable[Member],
+    dual_tariff: DualTariff,
+    estimator: BaseUsageEstimator,
+    billing_date: datetime,
+    processes: Optional[int] = None,
+    chunk_size: int = _DEFAULT_CHUNK_SIZE,
+    pricing_engine: Optional[BasePricingEngine] = None,
+) -> Iterator[AccountBillResult]:
+    """Yield a result for every account of every member, in order.
+
+    Members are sent to the worker processes chunk_size at a time, with only a
+    couple of chunks per process in flight, so members can come straight from
+    billing.streaming.iter_members without being loaded all at once. Lazily loaded
+    members (see DataRoot.from_dict) are parsed in the workers.
+
+    processes defaults to the number of CPUs, and 1 runs everything in this process.
+    An account which fails to estimate is yielded with its error rather than
+    stopping the run.
+    """
+    chunks = _chunked(members, chunk_size)
+    if processes == 1:
+        _init_worker(dual_tariff, estimator, billing_date, pricing_engine)
+        for chunk in chunks:
+            yield from _estimate_members(chunk)
+        return
+
+    processes = processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_worker,
+        initargs=(dual_tariff, estimator, billing_date, pricing_engine),
+    ) as executor:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(executor.submit(_estimate_members, chunk))
+            if len(in_flight) >= 2 * processes:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+def _chunked(members: Iterable[Member], chunk_size: int) -> Iterator[List[Member]]:
+    members = iter(members)
+    while True:
+        chunk = list(islice(members, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Set once per worker process by _init_worker, so that the tariff etc. are only
+# unpickled once rather than once per chunk.
+_worker_arguments = None
+
+
+def _init_worker(
+    dual_tariff: DualTariff,
+    estimator: BaseUsageEstimator,
+    billing_date: datetime,
+    pricing_engine: Optional[BasePricingEngine],
+):
+    global _worker_arguments
+    _worker_arguments = (dual_tariff, estimator, billing_date, pricing_engine)
+
+
+def _estimate_members(members: List[Member]) -> List[AccountBillResult]:
+    dual_tariff, estimator, billing_date, pricing_engine = _worker_arguments
+    results = []
+    for member in members:
+        for account in member.accounts:
+            try:
+                dual_bill_estimate = get_dual_bill_estimate_for_account(
+                    account,
+                    dual_tariff,
+                    estimator,
+                    billing_date,
+                    pricing_engine=pricing_engine,
+                )
+            except Exception as e:
+                results.append(
+                    AccountBillResult(
+                        member_name=member.name,
+                        account_name=account.name,
+                        dual_bill_estimate=None,
+                        error=f"{type(e).__name__}: {e}",
+                    )
+                )
+            else:
+                results.append(
+                    AccountBillResult(
+                        member_name=member.name,
+                        account_name=account.name,
+                        dual_bill_estimate=dual_bill_estimate,
+                    )
+                )
+    return results
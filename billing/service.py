@@ -0,0 +1,196 @@
+"""Serve estimates to many concurrent asyncio callers.
+
+    async with BillingService(data_root, dual_tariff, estimator) as service:
+        dual_bill = await service.estimate("member-1", "account-1", billing_date)
+
+Concurrent requests for the same (member, account, billing date) share one
+estimate. The rest are queued, and the queue is worked through in small batches on
+a worker thread, so thousands of requests don't need thousands of threads. When the
+queue is full, estimate() waits for room (backpressure).
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+from billing.billing import BasePricingEngine
+from billing.cache import EstimateCache
+from billing.models import DataRoot, DualBillEstimate, DualTariff
+from billing.shortcuts import get_dual_bill_estimate_for_member_account
+from billing.usage.base import BaseUsageEstimator
+
+_RequestKey = Tuple[str, str, datetime]  # member name, account name, billing date
+
+
+@dataclass
+class _Request:
+    future: asyncio.Future
+    queued: asyncio.Task  # Putting the request on the queue
+    waiters: int = 0
+
+
+class BillingService:
+    def __init__(
+        self,
+        data_root: DataRoot,
+        dual_tariff: DualTariff,
+        estimator: BaseUsageEstimator,
+        max_batch_size: int = 64,
+        max_batch_delay: float = 0.002,
+        max_queue_size: int = 1024,
+        executor: Optional[Executor] = None,
+        cache: Optional[EstimateCache] = None,
+        pricing_engine: Optional[BasePricingEngine] = None,
+    ):
+        """max_batch_delay is how long (in seconds) to wait for a batch to fill up.
+
+        executor defaults to the event loop's default (thread pool) executor.
+        """
+        self.data_root = data_root
+        self.dual_tariff = dual_tariff
+        self.estimator = estimator
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self.max_queue_size = max_queue_size
+        self.executor = executor
+        self.cache = cache
+        self.pricing_engine = pricing_engine
+
+        self.requests = 0
+        self.coalesced = 0
+        self.batches = 0
+
+        self._in_flight: Dict[_RequestKey, _Request] = {}
+        self._queue = None
+        self._batcher = None
+        self._closing = False
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        # Created here, as the queue belongs to the running event loop
+        self._queue = asyncio.Queue(self.max_queue_size)
+        self._batcher = asyncio.get_running_loop().create_task(self._run_batches())
+
+    async def close(self):
+        """Finish the requests which are already queued, then stop.
+
+        Requests still waiting for room in the queue fail with RuntimeError, as do
+        any made from now on.
+        """
+        self._closing = True
+        await self._queue.put(None)
+        await self._batcher
+
+        for request in list(self._in_flight.values()):
+            request.queued.cancel()
+            if not request.future.done():
+                request.future.set_exception(
+                    RuntimeError("BillingService closed before estimating")
+                )
+
+    async def estimate(
+        self, member_name: str, account_name: str, billing_date: datetime
+    ) -> DualBillEstimate:
+        if self._batcher is None or self._batcher.done() or self._closing:
+            raise RuntimeError("BillingService is not running")
+
+        self.requests += 1
+        key = (member_name, account_name, billing_date)
+        request = self._in_flight.get(key)
+        if request is not None and not request.future.done():
+            self.coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            # Queued by a task, so that if the caller waiting for room gives up, the
+            # others who coalesced onto it keep their place
+            queued = loop.create_task(self._queue.put((key, future)))
+            request = self._in_flight[key] = _Request(future, queued)
+            future.add_done_callback(partial(self._forget, key, request))
+
+        request.waiters += 1
+        try:
+            # Neither is cancelled if this caller gives up, so the others carry on.
+            # The future is also done if the service closes while waiting for room.
+            await asyncio.wait(
+                (request.queued, request.future), return_when=asyncio.FIRST_COMPLETED
+            )
+            return await asyncio.shield(request.future)
+        except asyncio.CancelledError:
+            request.waiters -= 1
+            if not request.waiters:
+                # Nobody else wants it, so don't queue (or estimate) it - and forget
+                # it now, so that new callers don't join a cancelled request
+                if self._in_flight.get(key) is request:
+                    del self._in_flight[key]
+                request.queued.cancel()
+                request.future.cancel()
+            raise
+
+    def _forget(self, key: _RequestKey, request: _Request, _future):
+        # Only if it hasn't already been replaced by a newer request
+        if self._in_flight.get(key) is request:
+            del self._in_flight[key]
+
+    async def _run_batches(self):
+        stopping = False
+        while not stopping:
+            batch = [await self._queue.get()]
+            if self.max_batch_delay:
+                await asyncio.sleep(self.max_batch_delay)
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            if None in batch:
+                stopping = True
+                batch.remove(None)
+            if batch:
+                await self._run_batch(batch)
+
+    async def _run_batch(self, batch: List[Tuple[_RequestKey, asyncio.Future]]):
+        self.batches += 1
+        keys = [key for key, _ in batch]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._estimate_batch, keys
+            )
+        except Exception as e:
+            results = [(None, e)] * len(batch)
+
+        for (_, future), (dual_bill_estimate, error) in zip(batch, results):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(dual_bill_estimate)
+
+    def _estimate_batch(self, keys: List[_RequestKey]):
+        """Runs on the executor, returning (estimate, exception) for each key."""
+        results = []
+        for member_name, account_name, billing_date in keys:
+            try:
+                dual_bill_estimate = get_dual_bill_estimate_for_member_account(
+                    data_root=self.data_root,
+                    member_name=member_name,
+                    account_name=account_name,
+                    dual_tariff=self.dual_tariff,
+                    estimator=self.estimator,
+                    billing_date=billing_date,
+                    cache=self.cache,
+                    pricing_engine=self.pricing_engine,
+                )
+            except Exception as e:
+                results.append((None, e))
+            else:
+                results.append((dual_bill_estimate, None))
+        return results
@@ -0,0 +1,168 @@
+"""Member data split over a directory of shard files, e.g. one per region.
+
+    data_root = ShardedDataRoot("members/")
+    get_dual_bill_estimate_for_member_account(data_root, "member-1", ...)
+    get_dual_bill_estimates(data_root, ...)  # Every member, a shard at a time
+
+Every (non-hidden) file in the directory is a shard: a JSON file in the
+DataRoot.from_json layout, or a binary copy of one (see billing.binary). Only an
+index of which shard has each member is kept in memory, along with the
+max_loaded_shards most recently used shards, so the whole directory can be much
+bigger than memory.
+
+The index is saved in the directory (as INDEX_FILE_NAME), and only the shards which
+have changed since are read again to update it.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import suppress
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+from billing.binary import is_binary_file, open_data_root
+from billing.instrumentation import instrumented
+from billing.models import DataRoot, Member, MemberNotFoundError
+from billing.streaming import iter_members, load_data_root
+
+INDEX_FILE_NAME = ".member-index.json"
+_INDEX_VERSION = 1
+
+
+class ShardedDataRoot:
+    """Looks up members like DataRoot, loading their shard when first used.
+
+    Loaded shards are kept in a (thread-safe) LRU cache of max_loaded_shards.
+    """
+
+    def __init__(self, directory: os.PathLike, max_loaded_shards: int = 4):
+        self.directory = Path(directory)
+        self.max_loaded_shards = max_loaded_shards
+        self._shard_by_member = _read_index(self.directory)
+        self._loaded_shards = OrderedDict()  # shard name -> DataRoot
+        self._lock = threading.Lock()
+
+    @property
+    def member_names(self) -> List[str]:
+        return list(self._shard_by_member)
+
+    @property
+    def members(self) -> Iterable[Member]:
+        """Every member, like DataRoot.members, read a shard at a time.
+
+        Each iteration reads the shards again (see iter_members), so that bulk code
+        written for a DataRoot (e.g. billing.batch, billing.validation) can go over
+        the whole directory without it all being in memory.
+        """
+        return _Members(self)
+
+    def get_member(self, name) -> Member:
+        try:
+            shard = self._shard_by_member[name]
+        except KeyError:
+            raise MemberNotFoundError(f"No member {name!r}") from None
+        return self._get_shard(shard).get_member(name)
+
+    def iter_members(self, lazy: bool = True) -> Iterator[Member]:
+        """Yield every member, a shard at a time, without using the cache.
+
+        Memory is bounded by the largest member (see billing.streaming). If lazy,
+        readings are only parsed when first used, e.g. by the worker processes of
+        billing.runner.
+        """
+        for shard in dict.fromkeys(self._shard_by_member.values()):
+            for member in _iter_shard_members(self.directory / shard, lazy):
+                # Skip any member which is also in an earlier shard
+                if self._shard_by_member[member.name] == shard:
+                    yield member
+
+    def _get_shard(self, shard: str) -> DataRoot:
+        with self._lock:
+            data_root = self._loaded_shards.get(shard)
+            if data_root is not None:
+                self._loaded_shards.move_to_end(shard)
+                return data_root
+
+        # Not under the lock, so that loading one shard doesn't block the others
+        data_root = _load_shard(self.directory / shard)
+        with self._lock:
+            self._loaded_shards[shard] = data_root
+            self._loaded_shards.move_to_end(shard)
+            while len(self._loaded_shards) > self.max_loaded_shards:
+                self._loaded_shards.popitem(last=False)
+        return data_root
+
+    def __contains__(self, member_name) -> bool:
+        return member_name in self._shard_by_member
+
+    def __len__(self) -> int:
+        return len(self._shard_by_member)
+
+
+class _Members:
+    def __init__(self, data_root: ShardedDataRoot):
+        self._data_root = data_root
+
+    def __iter__(self) -> Iterator[Member]:
+        return self._data_root.iter_members()
+
+    def __len__(self) -> int:
+        return len(self._data_root)
+
+
+@instrumented("load_shard")
+def _load_shard(path: Path) -> DataRoot:
+    if is_binary_file(path):
+        return open_data_root(path)
+    return load_data_root(path)
+
+
+def _iter_shard_members(path: Path, lazy: bool) -> Iterator[Member]:
+    if is_binary_file(path):
+        return iter(open_data_root(path).members)
+    return iter_members(path, lazy=lazy)
+
+
+def _read_index(directory: Path) -> Dict[str, str]:
+    """Return the shard of each member, updating the saved index if it's out of date.
+
+    If a member is in more than one shard, the first (by file name) wins.
+    """
+    index_path = directory / INDEX_FILE_NAME
+    saved = {}
+    with suppress(OSError, ValueError):
+        index = json.loads(index_path.read_text())
+        if index.get("version") == _INDEX_VERSION:
+            saved = index["shards"]
+
+    shards = {}
+    for path in sorted(directory.iterdir()):
+        if path.name.startswith(".") or not path.is_file():
+            continue
+        stat = path.stat()
+        shard = saved.get(path.name)
+        current = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        if shard is None or not shard.items() >= current.items():
+            shard = dict(
+                current,
+                members=[
+                    member.name for member in _iter_shard_members(path, lazy=True)
+                ],
+            )
+        shards[path.name] = shard
+
+    if shards != saved:
+        with suppress(OSError):
+            temporary_path = index_path.with_name(f"{index_path.name}.{os.getpid()}")
+            temporary_path.write_text(
+                json.dumps({"version": _INDEX_VERSION, "shards": shards})
+            )
+            os.replace(temporary_path, index_path)
+
+    shard_by_member = {}
+    for name, shard in shards.items():
+        for member_name in shard["members"]:
+            shard_by_member.setdefault(member_name, name)
+    return shard_by_member
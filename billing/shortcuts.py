@@ -1,9 +1,18 @@
 from datetime import datetime
+from typing import TYPE_CHECKING, Hashable, List, Optional, Sequence
 
-from billing.billing import get_bill_estimate
-from billing.models import DataRoot, DualBillEstimate, DualTariff
+from billing.billing import (BasePricingEngine, get_bill_estimate,
+                             get_bill_estimates)
+from billing.instrumentation import instrumented
+from billing.models import (Account, DataRoot, DualBillEstimate, DualTariff,
+                            ReadingSeries, Tariff)
+from billing.tariffs import resolve_tariff
 from billing.usage.base import BaseUsageEstimator
 
+if TYPE_CHECKING:
+    # Not imported otherwise, to start up quicker
+    from billing.cache import EstimateCache
+
 
 def get_dual_bill_estimate_for_member_account(
     data_root: DataRoot,
@@ -12,15 +21,82 @@ def get_dual_bill_estimate_for_member_account(
     dual_tariff: DualTariff,
     estimator: BaseUsageEstimator,
     billing_date: datetime,
+    cache: Optional["EstimateCache"] = None,
+    pricing_engine: Optional[BasePricingEngine] = None,
 ) -> DualBillEstimate:
     account = data_root.get_member(member_name).get_account(account_name)
+    return get_dual_bill_estimate_for_account(
+        account, dual_tariff, estimator, billing_date, cache, pricing_engine
+    )
+
+
+def _count_readings(account: Account, *_, **__) -> int:
+    return len(account.electricity_readings) + len(account.gas_readings)
+
+
+@instrumented("dual_bill_estimate", count_readings=_count_readings)
+def get_dual_bill_estimate_for_account(
+    account: Account,
+    dual_tariff: DualTariff,
+    estimator: BaseUsageEstimator,
+    billing_date: datetime,
+    cache: Optional["EstimateCache"] = None,
+    pricing_engine: Optional[BasePricingEngine] = None,
+) -> DualBillEstimate:
+    if cache is None:
+        return _get_dual_bill_estimate(
+            account, dual_tariff, estimator, billing_date, pricing_engine
+        )
+
+    key = (
+        "dual_bill_estimate",
+        _fingerprint(
+            estimator, account.electricity_readings, dual_tariff.electricity_tariff
+        ),
+        _fingerprint(estimator, account.gas_readings, dual_tariff.gas_tariff),
+        dual_tariff,
+        billing_date,
+        pricing_engine,
+    )
+    return cache.get_or_compute(
+        key,
+        lambda: _get_dual_bill_estimate(
+            account, dual_tariff, estimator, billing_date, pricing_engine
+        ),
+    )
+
+
+def _fingerprint(
+    estimator: BaseUsageEstimator, readings: ReadingSeries, tariff: Optional[Tariff]
+) -> Hashable:
+    if tariff is not None and tariff.time_of_use:
+        # The price is averaged over every reading (see resolve_tariff), so the whole
+        # history matters even if the estimator only uses some of it
+        return (
+            estimator.fingerprint(readings),
+            BaseUsageEstimator.fingerprint(estimator, readings),
+        )
+    return estimator.fingerprint(readings)
+
+
+def _get_dual_bill_estimate(
+    account: Account,
+    dual_tariff: DualTariff,
+    estimator: BaseUsageEstimator,
+    billing_date: datetime,
+    pricing_engine: Optional[BasePricingEngine],
+) -> DualBillEstimate:
     electricity_bill_estimate = None
     if account.electricity_readings:
         electricity_usage_estimate = estimator.estimate_usage(
             account.electricity_readings, billing_date
         )
         electricity_bill_estimate = get_bill_estimate(
-            electricity_usage_estimate, dual_tariff.electricity_tariff
+            electricity_usage_estimate,
+            resolve_tariff(
+                dual_tariff.electricity_tariff, account.electricity_readings
+            ),
+            pricing_engine,
         )
 
     gas_bill_estimate = None
@@ -29,7 +105,9 @@ def get_dual_bill_estimate_for_member_account(
             account.gas_readings, billing_date
         )
         gas_bill_estimate = get_bill_estimate(
-            gas_usage_estimate, dual_tariff.gas_tariff
+            gas_usage_estimate,
+            resolve_tariff(dual_tariff.gas_tariff, account.gas_readings),
+            pricing_engine,
         )
 
     return DualBillEstimate(
@@ -37,3 +115,41 @@ def get_dual_bill_estimate_for_member_account(
         electricity_bill_estimate=electricity_bill_estimate,
         gas_bill_estimate=gas_bill_estimate,
     )
+
+
+def get_dual_bill_estimates_for_account(
+    account: Account,
+    dual_tariff: DualTariff,
+    estimator: BaseUsageEstimator,
+    billing_dates: Sequence[datetime],
+    pricing_engine: Optional[BasePricingEngine] = None,
+) -> List[DualBillEstimate]:
+    """Estimate for many billing dates (e.g. a forecast), fitting each fuel once."""
+    electricity_bill_estimates = [None] * len(billing_dates)
+    if account.electricity_readings:
+        electricity_bill_estimates = get_bill_estimates(
+            estimator.estimate_usages(account.electricity_readings, billing_dates),
+            resolve_tariff(
+                dual_tariff.electricity_tariff, account.electricity_readings
+            ),
+            pricing_engine,
+        )
+
+    gas_bill_estimates = [None] * len(billing_dates)
+    if account.gas_readings:
+        gas_bill_estimates = get_bill_estimates(
+            estimator.estimate_usages(account.gas_readings, billing_dates),
+            resolve_tariff(dual_tariff.gas_tariff, account.gas_readings),
+            pricing_engine,
+        )
+
+    return [
+        DualBillEstimate(
+            billing_date=billing_date,
+            electricity_bill_estimate=electricity_bill_estimate,
+            gas_bill_estimate=gas_bill_estimate,
+        )
+        for billing_date, electricity_bill_estimate, gas_bill_estimate in zip(
+            billing_dates, electricity_bill_estimates, gas_bill_estimates
+        )
+    ]
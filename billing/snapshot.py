@@ -0,0 +1,96 @@
+"""Keep parsed files between runs, for short-lived processes.
+
+    data_root = load_snapshot("example-data.json", DataRoot.from_json)
+
+The first run parses the file as usual, and pickles the result into the cache
+directory. Later runs unpickle it instead, while the file is unchanged: its
+modification time and size are checked first, and only if they differ are its
+contents hashed (so e.g. copying the same file over it keeps the snapshot).
+
+Snapshots are pickles, so the cache directory must not be writable by anyone else.
+"""
+
+import os
+import pickle
+import zlib
+from contextlib import suppress
+from pathlib import Path
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Change when a snapshotted class changes in a way that old pickles can't handle
+_VERSION = 2
+_UNCHANGED_KEYS = ("version", "path", "parser", "mtime_ns", "size")
+_SAME_CONTENT_KEYS = ("version", "path", "parser", "digest")
+_NOT_LOADED = object()
+
+
+def default_cache_dir() -> Path:
+    """$BILLING_CACHE_DIR, or billing in the user's cache directory."""
+    if os.environ.get("BILLING_CACHE_DIR"):
+        return Path(os.environ["BILLING_CACHE_DIR"])
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "billing"
+
+
+def load_snapshot(
+    path: os.PathLike,
+    parse: Callable[[str], T],
+    cache_dir: Optional[os.PathLike] = None,
+) -> T:
+    """Return parse(the file's text), from the snapshot if the file is unchanged.
+
+    Snapshots which can't be read (or written) are ignored, so at worst the file is
+    parsed as if there was no cache.
+    """
+    path = Path(path).resolve()
+    parser = f"{parse.__module__}.{parse.__qualname__}"
+    snapshot_path = Path(cache_dir or default_cache_dir()) / (
+        f"{path.name}-{zlib.crc32(f'{path}:{parser}'.encode()):08x}.pickle"
+    )
+    stat = path.stat()
+    source = {
+        "version": _VERSION,
+        "path": str(path),
+        "parser": parser,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+    content = None
+    value = _NOT_LOADED
+    with suppress(Exception):
+        with open(snapshot_path, "rb") as file:
+            header = pickle.load(file)
+            if _matches(header, source, _UNCHANGED_KEYS):
+                return pickle.load(file)
+            content = path.read_bytes()
+            source["digest"] = _digest(content)
+            if _matches(header, source, _SAME_CONTENT_KEYS):
+                value = pickle.load(file)
+
+    if "digest" not in source:
+        content = path.read_bytes()
+        source["digest"] = _digest(content)
+    if value is _NOT_LOADED:
+        value = parse(content.decode())
+
+    with suppress(Exception):
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        # Written then renamed, so other processes never read half a snapshot
+        temporary_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}")
+        with open(temporary_path, "wb") as file:
+            pickle.dump(source, file, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(value, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, snapshot_path)
+    return value
+
+
+def _digest(content: bytes) -> bytes:
+    import hashlib  # Only here, as it's slow to import (and usually not needed)
+
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+def _matches(header: dict, source: dict, keys) -> bool:
+    return all(header.get(key) == source[key] for key in keys)
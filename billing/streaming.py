@@ -0,0 +1,159 @@
+"""Load members and accounts incrementally from JSON.
+
+DataRoot.from_json needs the whole document, and every object in it, in memory at
+once. These functions instead read the same layout a chunk at a time and yield each
+account as soon as it has been parsed, so memory is bounded by the largest account.
+"""
+
+import io
+import json
+import os
+from contextlib import contextmanager
+from json import JSONDecodeError
+from typing import IO, Iterator, Tuple, Union
+
+from billing.models import Account, DataRoot, Member
+
+Source = Union[str, os.PathLike, IO]
+
+_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = " \t\n\r"
+
+
+def iter_accounts(
+    source: Source, chunk_size: int = _CHUNK_SIZE, lazy: bool = False
+) -> Iterator[Tuple[str, Account]]:
+    """Yield (member name, account) pairs in file order.
+
+    If lazy, the readings are only parsed when first used - see Account.from_dict.
+    """
+    for member_name, accounts in _iter_member_accounts(source, chunk_size, lazy):
+        for account in accounts:
+            yield member_name, account
+
+
+def iter_members(
+    source: Source, chunk_size: int = _CHUNK_SIZE, lazy: bool = False
+) -> Iterator[Member]:
+    """Yield members in file order, i.e. memory is bounded by the largest member."""
+    for member_name, accounts in _iter_member_accounts(source, chunk_size, lazy):
+        yield Member(name=member_name, accounts=list(accounts))
+
+
+def load_data_root(source: Source, chunk_size: int = _CHUNK_SIZE) -> DataRoot:
+    """Like DataRoot.from_json, without holding the parsed JSON document."""
+    return DataRoot(members=list(iter_members(source, chunk_size)))
+
+
+def _iter_member_accounts(
+    source: Source, chunk_size: int, lazy: bool
+) -> Iterator[Tuple[str, Iterator[Account]]]:
+    """Yield each member name with its accounts, which must be consumed in turn."""
+    with _open(source) as file:
+        tokens = _Tokenizer(file, chunk_size)
+        for member_name in tokens.object_keys():
+            yield member_name, (
+                Account.from_dict(key=account_name, value=tokens.value(), lazy=lazy)
+                for account_name in tokens.object_keys()
+            )
+
+
+@contextmanager
+def _open(source: Source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8") as file:
+            yield file
+    elif isinstance(source.read(0), bytes):
+        wrapper = io.TextIOWrapper(source, encoding="utf-8")
+        try:
+            yield wrapper
+        finally:
+            # Don't close the caller's file
+            wrapper.detach()
+    else:
+        yield source
+
+
+class _Tokenizer:
+    """Just enough of a JSON tokenizer to walk down nested objects."""
+
+    def __init__(self, file: IO[str], chunk_size: int):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def object_keys(self) -> Iterator[str]:
+        """Yield each key of an object - the caller must consume its value."""
+        self._expect("{")
+        if self._next_char() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise self._error("Expecting property name enclosed in double quotes")
+            self._expect(":")
+            yield key
+
+            char = self._next_char()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                self._pos -= 1
+                raise self._error("Expecting ',' delimiter")
+
+    def value(self):
+        self._next_char()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except JSONDecodeError:
+                # Probably cut off by the end of the buffer: read as much again
+                if not self._fill(max(self._chunk_size, len(self._buffer))):
+                    raise
+                continue
+
+            # A number at the end of the buffer might continue in the next chunk
+            if end == len(self._buffer) and self._fill(self._chunk_size):
+                continue
+
+            self._pos = end
+            return value
+
+    def _expect(self, char: str):
+        if self._next_char() != char:
+            raise self._error(f"Expecting {char!r}")
+        self._pos += 1
+
+    def _next_char(self) -> str:
+        """Skip whitespace and return the next character, without consuming it."""
+        while True:
+            buffer = self._buffer
+            while self._pos < len(buffer) and buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(buffer):
+                return buffer[self._pos]
+            if not self._fill(self._chunk_size):
+                raise self._error("Unexpected end of data")
+
+    def _fill(self, size: int) -> bool:
+        """Read more data, dropping whatever has been consumed already."""
+        if self._eof:
+            return False
+
+        chunk = self._file.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _error(self, message: str) -> JSONDecodeError:
+        return JSONDecodeError(message, self._buffer, self._pos)
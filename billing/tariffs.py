@@ -0,0 +1,163 @@
+"""Compile tariffs into lookup tables, so that pricing is a single pass.
+
+    compiled = compile_tariff(tariff)
+    compiled.price_readings(account.electricity_readings)  # What was actually used
+    compiled.unit_price(Decimal(250))  # The price of 250 units, through the tiers
+
+Time of use rates become a table of the unit charge for each slot of the day (e.g.
+every half an hour), and tiers become the price at the start of each tier, so
+neither is worked out again per reading. Compiled tariffs are cached, as tariffs
+can't be changed.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, time
+from decimal import Decimal
+from functools import lru_cache
+from math import gcd
+from typing import Optional, Tuple
+
+from billing.models import ReadingSeries, Tariff
+
+_SECONDS_IN_DAY = 24 * 60 * 60
+
+
+@dataclass(frozen=True)
+class CompiledTariff:
+    tariff: Tariff
+    slot_seconds: int
+    unit_charge_by_slot: Tuple[Decimal, ...]  # For each slot_seconds of the day
+    tier_starts: Tuple[Decimal, ...]  # The usage at which each tier starts
+    tier_start_prices: Tuple[Decimal, ...]  # The price of the usage before it
+    tier_unit_charges: Tuple[Decimal, ...]
+
+    def unit_price(self, usage: Decimal) -> Decimal:
+        """Return the price of the usage in one billing period, through the tiers.
+
+        This doesn't include the standing charge, or any time of use rates (see
+        for_readings).
+        """
+        tier = max(bisect_right(self.tier_starts, usage) - 1, 0)
+        return (
+            self.tier_start_prices[tier]
+            + (usage - self.tier_starts[tier]) * self.tier_unit_charges[tier]
+        )
+
+    def price_readings(
+        self,
+        readings: ReadingSeries,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Decimal:
+        """Return the price of the usage between the readings from start to end.
+
+        This doesn't include the standing charge. The usage between two readings is
+        charged at the rate of when the first was taken, so the readings need to be
+        at least as frequent as the time of use rates change (e.g. half-hourly).
+        """
+        readings = readings.between(start, end)
+        if not self.tariff.time_of_use:
+            if not readings:
+                return Decimal(0)
+            return self.unit_price(
+                Decimal(readings.cumulatives[-1] - readings.cumulatives[0])
+            )
+
+        return sum(
+            (
+                charge * usage
+                for charge, usage in zip(
+                    self.unit_charge_by_slot,
+                    readings.usage_by_slot(self.slot_seconds),
+                )
+                if usage
+            ),
+            Decimal(0),
+        )
+
+    def average_unit_charge(self, readings: ReadingSeries) -> Decimal:
+        """Return the unit charge averaged over all of the readings' usage.
+
+        Without any usage, each time of day counts the same.
+        """
+        usage_by_slot = readings.usage_by_slot(self.slot_seconds)
+        total_usage = sum(usage_by_slot)
+        if not total_usage:
+            return sum(self.unit_charge_by_slot) / len(self.unit_charge_by_slot)
+        price = sum(
+            (
+                charge * usage
+                for charge, usage in zip(self.unit_charge_by_slot, usage_by_slot)
+                if usage
+            ),
+            Decimal(0),
+        )
+        return price / total_usage
+
+    def for_readings(self, readings: ReadingSeries) -> Tariff:
+        """Return an equivalent tariff without time of use rates, for estimating.
+
+        Its unit charge is averaged over when the readings' usage happened, so that
+        (like the usage estimate) it assumes usage carries on as before.
+        """
+        if not self.tariff.time_of_use:
+            return self.tariff
+        return Tariff(
+            standing_charge=self.tariff.standing_charge,
+            unit_charge=self.average_unit_charge(readings),
+        )
+
+
+@lru_cache(maxsize=256)
+def compile_tariff(tariff: Tariff) -> CompiledTariff:
+    slot_seconds = _SECONDS_IN_DAY
+    for rate in tariff.time_of_use:
+        for boundary in (rate.start, rate.end):
+            slot_seconds = gcd(slot_seconds, _seconds_of_day(boundary))
+
+    unit_charge_by_slot = [None] * (_SECONDS_IN_DAY // slot_seconds)
+    for rate in tariff.time_of_use:
+        start = _seconds_of_day(rate.start) // slot_seconds
+        end = _seconds_of_day(rate.end) // slot_seconds
+        if end <= start:
+            end += len(unit_charge_by_slot)
+        for slot in range(start, end):
+            slot %= len(unit_charge_by_slot)
+            if unit_charge_by_slot[slot] is not None:
+                raise ValueError("Time of use rates overlap")
+            unit_charge_by_slot[slot] = rate.unit_charge
+
+    tier_starts = [Decimal(0)] + [tier.up_to for tier in tariff.tiers]
+    tier_unit_charges = [tier.unit_charge for tier in tariff.tiers]
+    tier_unit_charges.append(tariff.unit_charge)
+    tier_start_prices = [Decimal(0)]
+    for tier_start, next_tier_start, unit_charge in zip(
+        tier_starts, tier_starts[1:], tier_unit_charges
+    ):
+        tier_start_prices.append(
+            tier_start_prices[-1] + (next_tier_start - tier_start) * unit_charge
+        )
+
+    return CompiledTariff(
+        tariff=tariff,
+        slot_seconds=slot_seconds,
+        unit_charge_by_slot=tuple(
+            tariff.unit_charge if unit_charge is None else unit_charge
+            for unit_charge in unit_charge_by_slot
+        ),
+        tier_starts=tuple(tier_starts),
+        tier_start_prices=tuple(tier_start_prices),
+        tier_unit_charges=tuple(tier_unit_charges),
+    )
+
+
+def resolve_tariff(tariff: Optional[Tariff], readings: ReadingSeries):
+    """Return the tariff to estimate the readings' bill with (see for_readings)."""
+    if tariff is None or not tariff.time_of_use:
+        return tariff
+    return compile_tariff(tariff).for_readings(readings)
+
+
+def _seconds_of_day(time_: time) -> int:
+    return time_.hour * 60 * 60 + time_.minute * 60 + time_.second
@@ -1 +1,25 @@
-from .linear import LinearExtrapolationUsageEstimator, UsageEstimatorError
+# The estimators are imported when first used, so that e.g. a process which only
+# uses LinearExtrapolationUsageEstimator starts up without importing the others
+_MODULES = {
+    "LeastSquaresUsageEstimator": "least_squares",
+    "LinearExtrapolationUsageEstimator": "linear",
+    "SeasonalUsageEstimator": "seasonal",
+    "UsageEstimatorError": "base",
+}
+
+__all__ = sorted(_MODULES)
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULES))
@@ -1,19 +1,107 @@
 """Main Business Logic to calculate estimated bill."""
 
-from datetime import datetime
-from typing import List
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Hashable, Iterable, List, Union
 
-from billing.models import Reading, UsageEstimate
+from billing.models import Reading, ReadingSeries, UsageEstimate
+
+Readings = Union[ReadingSeries, List[Reading]]
 
 
 class BaseUsageEstimator:
-    """Do not use directly."""
+    """Do not use directly.
+
+    Readings may be given as a ReadingSeries (preferred, as it is already sorted)
+    or as any list of readings.
+    """
 
     def estimate_usage(
-        self, readings: List[Reading], billing_date: datetime
+        self, readings: Readings, billing_date: datetime
     ) -> UsageEstimate:
         raise NotImplementedError()
 
+    def fit(self, readings: Readings) -> "BaseUsageModel":
+        """Do the work that doesn't depend on the billing date, once.
+
+        Estimators should override this (and have estimate_usage use it). By default
+        the model just calls estimate_usage for each billing date.
+        """
+        return _EstimatorUsageModel(self, ReadingSeries.coerce(readings))
+
+    def estimate_usages(
+        self, readings: Readings, billing_dates: Iterable[datetime]
+    ) -> List[UsageEstimate]:
+        """Estimate for many billing dates, fitting the readings only once."""
+        return self.fit(readings).estimate_usages(billing_dates)
+
+    def fingerprint(self, readings: Readings) -> Hashable:
+        """Identify everything the estimate depends on, apart from the billing date.
+
+        Used as a cache key. By default this covers every reading, so estimators
+        which only use some of them (or have settings) should override it.
+        """
+        import hashlib  # Only here, as it's slow to import (and often not needed)
+
+        readings = ReadingSeries.coerce(readings)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(readings.timestamps)
+        digest.update(readings.cumulatives)
+        if readings.utc_offsets is not None:
+            digest.update(array("q", readings.utc_offsets))
+        return type(self), readings.units, readings.tzinfo, digest.digest()
+
+
+class BaseUsageModel:
+    """An estimator fitted to one account's readings. Do not use directly.
+
+    Fitting does the work that doesn't depend on the billing date, so a model can
+    be kept and used for many billing dates.
+    """
+
+    def estimate_usage(self, billing_date: datetime) -> UsageEstimate:
+        raise NotImplementedError()
+
+    def estimate_usages(self, billing_dates: Iterable[datetime]) -> List[UsageEstimate]:
+        return [self.estimate_usage(billing_date) for billing_date in billing_dates]
+
+
+class _EstimatorUsageModel(BaseUsageModel):
+    def __init__(self, estimator: BaseUsageEstimator, readings: ReadingSeries):
+        self.estimator = estimator
+        self.readings = readings
+
+    def estimate_usage(self, billing_date: datetime) -> UsageEstimate:
+        return self.estimator.estimate_usage(self.readings, billing_date)
+
+
+@dataclass(frozen=True)
+class ConstantRateUsageModel(BaseUsageModel):
+    """Usage goes up at the same rate throughout the billing period."""
+
+    period_start: datetime
+    per_second_increase: Decimal
+    usage_units: str
+
+    def estimate_usage(self, billing_date: datetime) -> UsageEstimate:
+        time_period = billing_period_from(self.period_start, billing_date)
+        return UsageEstimate(
+            billing_date=billing_date,
+            time_period=time_period,
+            usage_estimate=self.per_second_increase
+            * int(time_period.total_seconds()),
+            usage_units=self.usage_units,
+        )
+
+
+def billing_period_from(period_start: datetime, billing_date: datetime) -> timedelta:
+    time_period = billing_date - period_start
+    if time_period < timedelta(seconds=0):
+        raise UsageEstimatorError("Billing date must be after the first reading.")
+    return time_period
+
 
 class UsageEstimatorError(Exception):
     pass
@@ -0,0 +1,100 @@
+"""Fit a straight line through the whole reading history."""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import repeat
+from math import fsum
+from operator import mul, sub, truediv
+from typing import Hashable, Optional
+
+from billing.instrumentation import instrumented
+from billing.models import ReadingSeries, UsageEstimate
+from billing.usage.base import (BaseUsageEstimator, ConstantRateUsageModel,
+                                Readings, UsageEstimatorError)
+from billing.usage.linear import latest_two_readings, usage_units
+
+
+@dataclass(frozen=True)
+class LeastSquaresUsageEstimator(BaseUsageEstimator):
+    """Use the line of best fit through every reading (cumulative against time).
+
+    |         *
+    |       */
+    |     */
+    |    /*
+    |  */
+    |________
+
+    Unlike LinearExtrapolationUsageEstimator, one bad reading barely moves the
+    estimate. With a half_life, older readings count for less (a reading half_life
+    older than the latest counts half as much), so the estimate follows changes in
+    usage.
+
+    The billing period starts at the second latest reading, as it does for
+    LinearExtrapolationUsageEstimator.
+    """
+
+    half_life: Optional[timedelta] = None
+
+    @instrumented(
+        "fit_usage", count_readings=lambda self, readings, *_, **__: len(readings)
+    )
+    def fit(self, readings: Readings) -> ConstantRateUsageModel:
+        readings = ReadingSeries.coerce(readings)
+        initial, _ = latest_two_readings(readings)
+        return ConstantRateUsageModel(
+            period_start=initial.timestamp,
+            per_second_increase=self._fit_slope(readings),
+            usage_units=usage_units(readings),
+        )
+
+    def _fit_slope(self, readings: ReadingSeries) -> Decimal:
+        """Weighted least squares over the columns, without any Reading objects.
+
+        Without a half_life this is exact integer arithmetic.
+        """
+        # Relative to the latest reading, to keep the numbers small
+        times = list(map(sub, readings.timestamps, repeat(readings.timestamps[-1])))
+        cumulatives = list(
+            map(sub, readings.cumulatives, repeat(readings.cumulatives[-1]))
+        )
+
+        if self.half_life is None:
+            total = sum
+            weights = None
+            count = len(times)
+        else:
+            total = fsum
+            half_life = self.half_life.total_seconds()
+            # The latest reading weighs 1, halving every half_life before it
+            half_lives = map(truediv, times, repeat(half_life))
+            weights = list(map(pow, repeat(2.0), half_lives))
+            count = fsum(weights)
+            cumulatives = list(map(mul, weights, cumulatives))
+
+        weighted_times = times if weights is None else list(map(mul, weights, times))
+        sum_times = total(weighted_times)
+        variance = count * total(map(mul, weighted_times, times)) - sum_times ** 2
+        if variance == 0:
+            raise UsageEstimatorError("Two readings taken at the exact same second")
+        covariance = count * total(map(mul, times, cumulatives)) - sum_times * total(
+            cumulatives
+        )
+
+        if covariance < 0:
+            raise UsageEstimatorError("Reading decreased")
+        if weights is None:
+            return Decimal(covariance) / variance
+        return Decimal(covariance / variance)
+
+    @instrumented(
+        "estimate_usage", count_readings=lambda self, readings, *_, **__: len(readings)
+    )
+    def estimate_usage(
+        self, readings: Readings, billing_date: datetime
+    ) -> UsageEstimate:
+        return self.fit(readings).estimate_usage(billing_date)
+
+    def fingerprint(self, readings: Readings) -> Hashable:
+        return (self,) + super().fingerprint(readings)
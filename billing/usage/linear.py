@@ -2,11 +2,14 @@
 
 from datetime import datetime, timedelta
 from decimal import Decimal
-from operator import attrgetter
-from typing import List, Tuple
+from typing import Hashable, Tuple
 
-from billing.models import Reading, UsageEstimate
-from billing.usage.base import BaseUsageEstimator, UsageEstimatorError
+from billing.instrumentation import instrumented
+from billing.models import (Reading, ReadingSeries, UsageEstimate,
+                            from_epoch_seconds)
+from billing.usage.base import (BaseUsageEstimator, ConstantRateUsageModel,
+                                Readings, UsageEstimatorError,
+                                billing_period_from)
 
 
 class LinearExtrapolationUsageEstimator(BaseUsageEstimator):
@@ -24,37 +27,66 @@ class LinearExtrapolationUsageEstimator(BaseUsageEstimator):
     It might not make much sense for very short time periods, like on the same day!
     """
 
+    @instrumented(
+        "estimate_usage", count_readings=lambda self, readings, *_, **__: len(readings)
+    )
     def estimate_usage(
-        self, readings: List[Reading], billing_date: datetime
+        self, readings: Readings, billing_date: datetime
     ) -> UsageEstimate:
-        return UsageEstimate(
-            billing_date=billing_date,
-            time_period=billing_period(readings, billing_date),
-            usage_estimate=estimated_usage(readings, billing_date),
+        return self.fit(readings).estimate_usage(billing_date)
+
+    @instrumented(
+        "fit_usage", count_readings=lambda self, readings, *_, **__: len(readings)
+    )
+    def fit(self, readings: Readings) -> ConstantRateUsageModel:
+        readings = ReadingSeries.coerce(readings)
+        initial, _ = latest_two_readings(readings)
+        return ConstantRateUsageModel(
+            period_start=initial.timestamp,
+            per_second_increase=per_second_increase(readings),
             usage_units=usage_units(readings),
         )
 
+    def fingerprint(self, readings: Readings) -> Hashable:
+        """Only the latest two readings matter (and the units of them all)."""
+        readings = ReadingSeries.coerce(readings)
+        return (
+            type(self),
+            readings.units,
+            readings.tzinfo,
+            tuple(readings.timestamps[-2:]),
+            tuple(readings.cumulatives[-2:]),
+        )
 
-def estimated_usage(readings: List[Reading], billing_date: datetime):
-    return per_second_increase(readings) * int(
-        billing_period(readings, billing_date).total_seconds()
-    )
 
+def estimated_usage(readings: Readings, billing_date: datetime) -> Decimal:
+    """Return the usage over the billing period, carrying on the latest readings.
+
+    This is along the same line as LinearExtrapolationUsageEstimator's estimate, and
+    raises the same errors, but it's worked out exactly from the readings (see
+    ReadingSeries.usage_between) rather than from a rounded per second rate. So the
+    two can differ in the last significant digit, e.g. 400 rather than
+    399.9999999999999999999999999.
+    """
+    readings = ReadingSeries.coerce(readings)
+    per_second_increase(readings)  # For its errors
+    usage_units(readings)
+    period_start = billing_date - billing_period(readings, billing_date)
+    return readings.usage_between(period_start, billing_date, extrapolate=True)
 
-def per_second_increase(readings: List[Reading]) -> Decimal:
-    return Decimal(usage_difference(readings)) / time_difference_in_seconds(readings)
 
+def per_second_increase(readings: Readings) -> Decimal:
+    return Decimal(usage_difference(readings)) / time_difference_in_seconds(readings)
 
-def billing_period(readings: List[Reading], billing_date: datetime):
-    initial, _ = latest_two_readings(readings)
-    time_period = billing_date - initial.timestamp
-    if time_period < timedelta(seconds=0):
-        raise UsageEstimatorError("Billing date must be after the first reading.")
 
-    return time_period
+def billing_period(readings: Readings, billing_date: datetime) -> timedelta:
+    """Return the time from the second latest reading to the billing date."""
+    readings = _at_least_two_readings(readings)
+    period_start = from_epoch_seconds(readings.timestamps[-2], readings.tzinfo)
+    return billing_period_from(period_start, billing_date)
 
 
-def usage_difference(readings: List[Reading]) -> int:
+def usage_difference(readings: Readings) -> int:
     initial, final = latest_two_readings(readings)
     diff = final.cumulative - initial.cumulative
     if diff < 0:
@@ -63,7 +95,7 @@ def usage_difference(readings: List[Reading]) -> int:
     return diff
 
 
-def time_difference_in_seconds(readings: List[Reading]) -> int:
+def time_difference_in_seconds(readings: Readings) -> int:
     """Return the difference in time to the nearest second."""
     initial, final = latest_two_readings(readings)
     seconds = (final.timestamp - initial.timestamp).total_seconds()
@@ -73,15 +105,21 @@ def time_difference_in_seconds(readings: List[Reading]) -> int:
     return int(seconds)
 
 
-def latest_two_readings(readings: List[Reading]) -> Tuple[Reading, Reading]:
+def latest_two_readings(readings: Readings) -> Tuple[Reading, Reading]:
+    return _at_least_two_readings(readings).latest_two()
+
+
+def _at_least_two_readings(readings: Readings) -> ReadingSeries:
+    readings = ReadingSeries.coerce(readings)
     if len(readings) < 2:
         raise UsageEstimatorError("Need at least two readings")
-    return sorted(readings, key=attrgetter("timestamp"))[-2:]
+    return readings
 
 
-def usage_units(readings):
-    units = set(reading.units for reading in readings)
+def usage_units(readings: Readings) -> str:
+    units = ReadingSeries.coerce(readings).units
     if len(units) > 1:
-        raise UsageEstimate("All readings must have the same units")
+        raise UsageEstimatorError("All readings must have the same units")
 
-    return units.pop()
+    (unit,) = units
+    return unit
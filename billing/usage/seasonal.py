@@ -0,0 +1,129 @@
+"""Estimate with a profile of how usage changes through the year."""
+
+from dataclasses import dataclass
+from datetime import datetime, tzinfo
+from decimal import Decimal
+from fractions import Fraction
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from billing.instrumentation import instrumented
+from billing.models import (ReadingSeries, UsageEstimate, fraction_to_decimal,
+                            from_epoch_seconds, to_epoch_seconds)
+from billing.usage.base import (BaseUsageEstimator, BaseUsageModel, Readings,
+                                UsageEstimatorError, billing_period_from)
+from billing.usage.linear import latest_two_readings, usage_units
+
+
+@dataclass(frozen=True)
+class SeasonalUsageEstimator(BaseUsageEstimator):
+    """Use the average rate of usage of each calendar month, from every reading.
+
+    e.g. a billing period over the winter is estimated from the previous winters'
+    (usually higher) usage, like a degree-day profile. Months without any readings
+    use the average rate over the whole history.
+
+    The usage between readings is taken to be evenly spread, so only the readings
+    either side of each month boundary are looked at - fitting is quick even on
+    years of half-hourly readings.
+
+    The billing period starts at the second latest reading, as it does for
+    LinearExtrapolationUsageEstimator.
+    """
+
+    @instrumented(
+        "fit_usage", count_readings=lambda self, readings, *_, **__: len(readings)
+    )
+    def fit(self, readings: Readings) -> "SeasonalUsageModel":
+        readings = ReadingSeries.coerce(readings)
+        initial, _ = latest_two_readings(readings)
+        units = usage_units(readings)
+
+        timestamps = readings.timestamps
+        cumulatives = readings.cumulatives
+        if timestamps[-1] == timestamps[0]:
+            raise UsageEstimatorError("Two readings taken at the exact same second")
+        if cumulatives[-1] < cumulatives[0]:
+            raise UsageEstimatorError("Reading decreased")
+
+        usage = [Fraction(0)] * 12
+        seconds = [0] * 12
+        months = _months(timestamps[0], timestamps[-1], readings.tzinfo)
+        for month, start, end in months:
+            usage[month - 1] += readings.interpolate(end) - readings.interpolate(start)
+            seconds[month - 1] += end - start
+
+        average_rate = fraction_to_decimal(
+            Fraction(cumulatives[-1] - cumulatives[0], timestamps[-1] - timestamps[0])
+        )
+        return SeasonalUsageModel(
+            period_start=initial.timestamp,
+            per_second_increase_by_month=tuple(
+                fraction_to_decimal(month_usage / month_seconds)
+                if month_seconds
+                else average_rate
+                for month_usage, month_seconds in zip(usage, seconds)
+            ),
+            usage_units=units,
+        )
+
+    @instrumented(
+        "estimate_usage", count_readings=lambda self, readings, *_, **__: len(readings)
+    )
+    def estimate_usage(
+        self, readings: Readings, billing_date: datetime
+    ) -> UsageEstimate:
+        return self.fit(readings).estimate_usage(billing_date)
+
+
+@dataclass(frozen=True)
+class SeasonalUsageModel(BaseUsageModel):
+    period_start: datetime
+    per_second_increase_by_month: Tuple[Decimal, ...]  # January first
+    usage_units: str
+
+    def estimate_usage(self, billing_date: datetime) -> UsageEstimate:
+        (estimate,) = self.estimate_usages([billing_date])
+        return estimate
+
+    def estimate_usages(self, billing_dates: Iterable[datetime]) -> List[UsageEstimate]:
+        """Each billing date carries on adding up usage from the one before it."""
+        billing_dates = list(billing_dates)
+        estimates = [None] * len(billing_dates)
+        start = to_epoch_seconds(self.period_start)
+        usage = Decimal(0)
+        for index in sorted(range(len(billing_dates)), key=billing_dates.__getitem__):
+            billing_date = billing_dates[index]
+            time_period = billing_period_from(self.period_start, billing_date)
+            end = to_epoch_seconds(billing_date)
+            for month, month_start, month_end in _months(
+                start, end, self.period_start.tzinfo
+            ):
+                usage += self.per_second_increase_by_month[month - 1] * (
+                    month_end - month_start
+                )
+            start = max(start, end)
+            estimates[index] = UsageEstimate(
+                billing_date=billing_date,
+                time_period=time_period,
+                usage_estimate=usage,
+                usage_units=self.usage_units,
+            )
+        return estimates
+
+
+def _months(
+    start: int, end: int, tzinfo_: Optional[tzinfo]
+) -> Iterator[Tuple[int, int, int]]:
+    """Split the epoch seconds from start to end by calendar month.
+
+    Yields (month, start, end) for each part.
+    """
+    timestamp = from_epoch_seconds(start, tzinfo_)
+    year, month = timestamp.year, timestamp.month
+    while start < end:
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        month_end = min(
+            to_epoch_seconds(datetime(next_year, next_month, 1, tzinfo=tzinfo_)), end
+        )
+        yield month, start, month_end
+        start, year, month = month_end, next_year, next_month
@@ -0,0 +1,100 @@
+"""Check every account's readings up front, and report all of the problems.
+
+    report = validate_data_root(DataRoot.from_json(json_str, lazy=True))
+    for problem in report.problems:
+        print(problem.member_name, problem.account_name, problem.message)
+
+Account.validate stops at the first problem, whereas this carries on through every
+account. It also finds readings which decrease, which are otherwise only found when
+estimating (as "Reading decreased"). Each check is a single pass over the reading
+columns (see ReadingSeries.first_duplicated_timestamp).
+
+Lazy accounts are validated as they load, so for an account which fails to load only
+that first problem is reported.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from billing.models import (Account, DataRoot, ReadingSeries, ValidationError,
+                            find_reading_problems)
+
+_FUELS = (("electricity", "electricity_readings"), ("gas", "gas_readings"))
+
+
+@dataclass(frozen=True)
+class ValidationProblem:
+    member_name: str
+    account_name: str
+    fuel: Optional[str]  # None if the account couldn't be loaded
+    check: str  # e.g. "duplicated_timestamp", "mixed_units" or "reading_decreased"
+    message: str
+    timestamp: Optional[datetime] = None
+
+
+@dataclass
+class ValidationReport:
+    accounts: int = 0
+    readings: int = 0
+    problems: List[ValidationProblem] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.problems
+
+    @property
+    def invalid_accounts(self) -> List[Tuple[str, str]]:
+        """(member name, account name) of each account with a problem, in order."""
+        return list(
+            dict.fromkeys(
+                (problem.member_name, problem.account_name)
+                for problem in self.problems
+            )
+        )
+
+
+def validate_data_root(data_root: DataRoot) -> ValidationReport:
+    return validate_accounts(
+        (member.name, account)
+        for member in data_root.members
+        for account in member.accounts
+    )
+
+
+def validate_accounts(accounts: Iterable[Tuple[str, Account]]) -> ValidationReport:
+    """Check (member name, account) pairs, e.g. from billing.streaming.iter_accounts."""
+    report = ValidationReport()
+    for member_name, account in accounts:
+        report.accounts += 1
+        try:
+            series = [
+                (fuel, getattr(account, attribute)) for fuel, attribute in _FUELS
+            ]
+        except ValidationError as e:
+            report.problems.append(
+                ValidationProblem(
+                    member_name, account.name, None, e.check, str(e), e.timestamp
+                )
+            )
+            continue
+        for fuel, readings in series:
+            report.readings += len(readings)
+            report.problems.extend(
+                ValidationProblem(
+                    member_name, account.name, fuel, e.check, str(e), e.timestamp
+                )
+                for e in _find_problems(readings, fuel)
+            )
+    return report
+
+
+def _find_problems(readings: ReadingSeries, fuel: str) -> Iterator[ValidationError]:
+    yield from find_reading_problems(readings, fuel)
+    decrease = readings.first_decrease()
+    if decrease is not None:
+        yield ValidationError(
+            f"{fuel.capitalize()} reading decreased at {decrease.timestamp}",
+            "reading_decreased",
+            decrease.timestamp,
+        )
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Estimate the bill of every account, using all of the CPUs.
+
+    $ python3 bulk.py example-data.json example-tariff.json 2019-04-01 > bills.csv
+
+Writes one CSV row per account (or see --format). Accounts which can't be estimated
+have their error in the last column, and are counted on stderr.
+"""
+import argparse
+import sys
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+
+from billing.binary import is_binary_file, open_data_root
+from billing.export import WRITERS
+from billing.models import DualTariff
+from billing.pipeline import PipelineStats, iter_pipelined_dual_bill_estimates
+from billing.profiling import MODES, profile, write_profile
+from billing.runner import iter_dual_bill_estimates
+from billing.sharding import ShardedDataRoot
+from billing.streaming import iter_members
+from billing.usage import LinearExtrapolationUsageEstimator
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    dual_tariff = DualTariff.from_json(Path(args.tariff).read_text())
+
+    if Path(args.data).is_dir():
+        members = ShardedDataRoot(args.data).iter_members()
+    elif is_binary_file(args.data):
+        members = open_data_root(args.data).members
+    else:
+        # Lazy, so that the readings are parsed by the worker processes
+        members = iter_members(args.data, lazy=True)
+
+    arguments = dict(
+        members=members,
+        dual_tariff=dual_tariff,
+        estimator=LinearExtrapolationUsageEstimator(),
+        billing_date=args.billing_date,
+    )
+    stats = PipelineStats()
+    if args.pipeline:
+        results = iter_pipelined_dual_bill_estimates(stats=stats, **arguments)
+    else:
+        # Worker processes aren't profiled, so estimate in this one
+        processes = 1 if args.profile else args.processes
+        results = iter_dual_bill_estimates(
+            processes=processes, chunk_size=args.chunk_size, **arguments
+        )
+    output = sys.stdout.buffer if args.format == "columnar" else sys.stdout
+    with profile(args.profile_mode) if args.profile else nullcontext() as profiler:
+        summary = WRITERS[args.format](results, output)
+
+    if args.pipeline:
+        _print_stats(stats)
+    if args.profile:
+        write_profile(profiler, args.profile, top=20)
+
+    if summary.errors:
+        print(f"Unable to estimate {summary.errors} account(s)", file=sys.stderr)
+    return 1 if summary.errors else 0
+
+
+def _print_stats(stats: PipelineStats):
+    snapshot = stats.snapshot()
+    for stage, totals in snapshot["stages"].items():
+        print(
+            f"{stage:<10}{totals['items_per_second']:10.0f} fuels/s"
+            f"{totals['utilisation']:8.0%} busy",
+            file=sys.stderr,
+        )
+    print(f"Limited by {snapshot['limiting_stage']}", file=sys.stderr)
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "data",
+        help="member data JSON (like example-data.json), binary copy, or a "
+        "directory of them (see billing/sharding.py)",
+    )
+    parser.add_argument("tariff", help="tariff JSON, like example-tariff.json")
+    parser.add_argument(
+        "billing_date", type=datetime.fromisoformat, help="e.g. 2019-04-01"
+    )
+    parser.add_argument(
+        "--processes", type=int, help="number of worker processes (default: CPUs)"
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="estimate in a pipeline of threads instead of processes, and print "
+        "each stage's throughput to stderr",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="profile the run (in this process), writing collapsed stacks for a "
+        "flame graph to PATH and the top functions to stderr",
+    )
+    parser.add_argument(
+        "--profile-mode",
+        choices=MODES,
+        default="sample",
+        help="see billing/profiling.py (default: sample)",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=64, help="members per task (default: 64)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(WRITERS),
+        default="csv",
+        help="output format (default: csv)",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
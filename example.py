@@ -22,7 +22,7 @@ def main():
         billing_date=datetime(2019, 4, 1),
     )
 
-    print(_format_dual_bill(dual_bill_estimate))
+    print(format_dual_bill(dual_bill_estimate))
 
 
 def _read_json(filename):
@@ -31,7 +31,7 @@ def _read_json(filename):
 
 
 # TODO: Testing this is not unimportant!
-def _format_dual_bill(dual_bill: DualBillEstimate) -> str:
+def format_dual_bill(dual_bill: DualBillEstimate) -> str:
     """We round to the nearest kWh and pence."""
     if not dual_bill.electricity_bill_estimate and not dual_bill.gas_bill_estimate:
         return "Unable to estimate any bills."
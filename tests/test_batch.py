@@ -0,0 +1,234 @@
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from billing.batch import get_dual_bill_estimates
+from billing.models import (Account, DataRoot, DualTariff, Member, Reading,
+                            Tariff, Tier)
+from billing.shortcuts import get_dual_bill_estimate_for_member_account
+from billing.usage import LinearExtrapolationUsageEstimator
+
+PENCE = Decimal("0.01")
+
+
+@pytest.fixture
+def dual_tariff():
+    return DualTariff(
+        electricity_tariff=Tariff(
+            standing_charge=Decimal("23.23"), unit_charge=Decimal("12.123")
+        ),
+        gas_tariff=Tariff(
+            standing_charge=Decimal("21.21"), unit_charge=Decimal("4.915")
+        ),
+    )
+
+
+def _random_readings(rng, units):
+    timestamp = datetime(2019, 1, 1) + timedelta(seconds=rng.randrange(10 ** 6))
+    cumulative = rng.randrange(10 ** 5)
+    readings = []
+    for _ in range(rng.randrange(5)):
+        readings.append(
+            Reading(cumulative=cumulative, timestamp=timestamp, units=units)
+        )
+        timestamp += timedelta(seconds=rng.randrange(1, 10 ** 7))
+        cumulative += rng.randrange(10 ** 4)
+    return readings
+
+
+def _single_account_estimate(data_root, account_id, dual_tariff, billing_date):
+    return get_dual_bill_estimate_for_member_account(
+        data_root=data_root,
+        member_name=account_id[0],
+        account_name=account_id[1],
+        dual_tariff=dual_tariff,
+        estimator=LinearExtrapolationUsageEstimator(),
+        billing_date=billing_date,
+    )
+
+
+def _assert_same_to_the_penny(batch_estimate, single_estimate):
+    if single_estimate is None:
+        assert batch_estimate is None
+        return
+    assert batch_estimate.billing_period == single_estimate.billing_period
+    assert batch_estimate.usage_units == single_estimate.usage_units
+    assert batch_estimate.price_estimate == single_estimate.price_estimate.quantize(
+        PENCE
+    )
+    assert f"{batch_estimate.usage_estimate:.0f}" == (
+        f"{single_estimate.usage_estimate:.0f}"
+    )
+
+
+def test_get_dual_bill_estimates_matches_single_account_for_example_data():
+    example_dir = Path(__file__).resolve().parent.parent
+    data_root = DataRoot.from_json((example_dir / "example-data.json").read_text())
+    dual_tariff = DualTariff.from_json(
+        (example_dir / "example-tariff.json").read_text()
+    )
+    billing_date = datetime(2019, 4, 1)
+
+    result = get_dual_bill_estimates(data_root, dual_tariff, billing_date)
+
+    [(account_id, dual_bill)] = list(result.dual_bill_estimates())
+    assert account_id == ("member-1", "account-1")
+    assert dual_bill.electricity_bill_estimate.price_estimate == Decimal("65232.80")
+    assert dual_bill.gas_bill_estimate.price_estimate == Decimal("76004.95")
+
+
+def test_get_dual_bill_estimates_matches_single_account_for_random_data(dual_tariff):
+    rng = random.Random(1234)
+    data_root = DataRoot(
+        members=[
+            Member(
+                name=f"member-{i}",
+                accounts=[
+                    Account(
+                        name="account",
+                        electricity_readings=_random_readings(rng, "kwh"),
+                        gas_readings=_random_readings(rng, "m3"),
+                    )
+                ],
+            )
+            for i in range(200)
+        ]
+    )
+    billing_date = datetime(2019, 9, 1)
+
+    result = get_dual_bill_estimates(data_root, dual_tariff, billing_date)
+
+    assert len(result) == 200
+    for index, (account_id, dual_bill) in enumerate(result.dual_bill_estimates()):
+        account = data_root.get_member(account_id[0]).get_account(account_id[1])
+        if index in result.electricity.errors or index in result.gas.errors:
+            continue
+        single = _single_account_estimate(
+            data_root, account_id, dual_tariff, billing_date
+        )
+        _assert_same_to_the_penny(
+            dual_bill.electricity_bill_estimate, single.electricity_bill_estimate
+        )
+        _assert_same_to_the_penny(dual_bill.gas_bill_estimate, single.gas_bill_estimate)
+        assert bool(account.gas_readings) == bool(dual_bill.gas_bill_estimate)
+
+
+def test_get_dual_bill_estimates_records_errors_per_account(dual_tariff):
+    data_root = DataRoot(
+        members=[
+            Member(
+                name="member",
+                accounts=[
+                    Account(
+                        name="decreased",
+                        electricity_readings=[
+                            Reading(
+                                cumulative=2, timestamp=datetime(2019, 1, 1), units=""
+                            ),
+                            Reading(
+                                cumulative=1, timestamp=datetime(2019, 1, 2), units=""
+                            ),
+                        ],
+                        gas_readings=[],
+                    ),
+                    Account(
+                        name="single",
+                        electricity_readings=[
+                            Reading(
+                                cumulative=2, timestamp=datetime(2019, 1, 1), units=""
+                            )
+                        ],
+                        gas_readings=[],
+                    ),
+                ],
+            )
+        ]
+    )
+
+    result = get_dual_bill_estimates(
+        data_root,
+        dual_tariff,
+        datetime(2019, 2, 1),
+        account_ids=[("member", "single"), ("member", "decreased")],
+    )
+
+    assert result.electricity.errors == {
+        0: "Need at least two readings",
+        1: "Reading decreased",
+    }
+    assert result.gas.errors == {}
+    assert result.get_dual_bill_estimate(0).electricity_bill_estimate is None
+    assert result.get_dual_bill_estimate(1).gas_bill_estimate is None
+
+
+@pytest.mark.parametrize(
+    "usage, seconds, period, unit_charge, expected",
+    [
+        # Exactly half a penny, so rounded half-even
+        (1, 1, 1, "0.125", Decimal("0.12")),
+        (1, 1, 1, "0.135", Decimal("0.14")),
+        # Exactly 796.005, but the single account path's per second rate (45 / 7)
+        # is rounded to 28 digits, giving 796.0050...01
+        (45, 7, 133, "0.931", Decimal("796.01")),
+    ],
+)
+def test_get_dual_bill_estimates_rounds_half_pennies_like_single_account(
+    usage, seconds, period, unit_charge, expected
+):
+    start = datetime(2019, 1, 1)
+    data_root = DataRoot(
+        members=[
+            Member(
+                name="member",
+                accounts=[
+                    Account(
+                        name="account",
+                        electricity_readings=[
+                            Reading(cumulative=0, timestamp=start, units=""),
+                            Reading(
+                                cumulative=usage,
+                                timestamp=start + timedelta(seconds=seconds),
+                                units="",
+                            ),
+                        ],
+                        gas_readings=[],
+                    )
+                ],
+            )
+        ]
+    )
+    dual_tariff = DualTariff(
+        electricity_tariff=Tariff(
+            standing_charge=Decimal("0.68"), unit_charge=Decimal(unit_charge)
+        ),
+        gas_tariff=None,
+    )
+    billing_date = start + timedelta(seconds=period)
+
+    result = get_dual_bill_estimates(data_root, dual_tariff, billing_date)
+
+    batch = result.get_dual_bill_estimate(0).electricity_bill_estimate
+    single = _single_account_estimate(
+        data_root, ("member", "account"), dual_tariff, billing_date
+    ).electricity_bill_estimate
+    assert batch.price_estimate == expected
+    _assert_same_to_the_penny(batch, single)
+
+
+def test_get_dual_bill_estimates_rejects_tariffs_which_are_not_flat_up_front():
+    data_root = DataRoot(
+        members=[Member(name="member", accounts=[Account("account", [], [])])]
+    )
+    tariff = Tariff(
+        standing_charge=Decimal("1"),
+        unit_charge=Decimal("1"),
+        tiers=(Tier(up_to=Decimal("1"), unit_charge=Decimal("2")),),
+    )
+
+    with pytest.raises(ValueError, match="flat"):
+        get_dual_bill_estimates(
+            data_root, DualTariff(tariff, None), datetime(2019, 1, 1)
+        )
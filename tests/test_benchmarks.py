@@ -0,0 +1,38 @@
+from benchmarks.generate import generate_data
+from benchmarks.run import BenchmarkResult, compare_to_baseline, run_benchmarks
+from billing.models import DataRoot
+
+
+def test_generate_data_is_valid_and_repeatable():
+    data = generate_data(members=2, accounts=3, readings=4)
+    data_root = DataRoot.from_dict(data)
+    assert len(data_root.members) == 2
+    for member in data_root.members:
+        assert len(member.accounts) == 3
+        for account in member.accounts:
+            account.validate()
+            assert len(account.electricity_readings) == 4
+    assert generate_data(members=2, accounts=3, readings=4) == data
+
+
+def test_run_benchmarks():
+    results = run_benchmarks(members=2, accounts=1, readings=5, repeat=1)
+    assert len(results) == 5
+    for result in results:
+        assert result.throughput > 0
+        assert result.p50_ms <= result.p95_ms <= result.p99_ms
+
+
+def test_compare_to_baseline():
+    result = BenchmarkResult(
+        name="a",
+        unit="bills",
+        throughput=79,
+        p50_ms=1,
+        p95_ms=1,
+        p99_ms=1,
+        peak_memory_kib=1,
+    )
+    assert compare_to_baseline([result], {"a": {"throughput": 100}}, 0.2) == ["a"]
+    assert compare_to_baseline([result], {"a": {"throughput": 98}}, 0.2) == []
+    assert compare_to_baseline([result], {}, 0.2) == []
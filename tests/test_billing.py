@@ -44,3 +44,4 @@ def test_get_bill_estimate_with_half_day_not_counting_for_standing_charge():
         usage_units="units",
         price_estimate=Decimal(5 * 5 + 2 * 7),  # 5 days not 5.5 days!
     )
+
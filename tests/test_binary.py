@@ -0,0 +1,110 @@
+import json
+import pickle
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from billing.binary import (BinaryFormatError, convert_json_to_binary,
+                            open_data_root)
+from billing.models import DataRoot, Reading
+
+SAMPLE_PATH = (Path(__file__) / ".." / "data" / "sample-usage.json").resolve()
+EXAMPLE_PATH = (Path(__file__) / ".." / ".." / "example-data.json").resolve()
+
+
+@pytest.mark.parametrize("path", [SAMPLE_PATH, EXAMPLE_PATH])
+def test_open_data_root_matches_from_json(tmp_path, path):
+    binary_path = tmp_path / "data.bin"
+
+    convert_json_to_binary(path, binary_path)
+    result = open_data_root(binary_path)
+
+    assert result == DataRoot.from_json(path.read_text())
+
+
+def test_open_data_root_keeps_each_readings_utc_offset(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(
+        json.dumps(
+            {
+                "member": {
+                    "account": {
+                        "electricity": [
+                            {
+                                "cumulative": cumulative,
+                                "timestamp": timestamp,
+                                "units": "kwh",
+                            }
+                            for cumulative, timestamp in [
+                                (0, "2019-03-30T23:00:00+00:00"),
+                                (1, "2019-03-31T23:00:00+01:00"),
+                                (2, "2019-04-01T23:00:00+01:00"),
+                            ]
+                        ]
+                    }
+                }
+            }
+        )
+    )
+    binary_path = tmp_path / "data.bin"
+
+    convert_json_to_binary(path, binary_path)
+    readings = (
+        open_data_root(binary_path)
+        .get_member("member")
+        .get_account("account")
+        .electricity_readings
+    )
+
+    assert list(readings.utc_offsets) == [0, 3600, 3600]
+    assert readings.usage_by_slot(60 * 60) == (0,) * 23 + (2,)
+
+
+def test_open_data_root_loads_members_lazily(tmp_path):
+    binary_path = tmp_path / "data.bin"
+    convert_json_to_binary(EXAMPLE_PATH, binary_path)
+
+    member = open_data_root(binary_path).get_member("member-1")
+    assert not member.is_loaded
+
+    readings = member.get_account("account-1").electricity_readings
+    assert isinstance(readings.timestamps, memoryview)
+    assert readings.between(end=readings[1].timestamp) == [readings[0]]
+
+
+def test_members_can_be_pickled(tmp_path):
+    binary_path = tmp_path / "data.bin"
+    convert_json_to_binary(EXAMPLE_PATH, binary_path)
+    member = open_data_root(binary_path).get_member("member-1")
+
+    assert pickle.loads(pickle.dumps(member)) == member
+    # Now loaded, so the readings are memoryviews onto the file
+    assert pickle.loads(pickle.dumps(member)) == member
+
+
+def test_open_data_root_with_other_file_raises(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"x" * 100)
+
+    with pytest.raises(BinaryFormatError):
+        open_data_root(path)
+
+
+def test_readings_can_be_added_to_mapped_series(tmp_path):
+    binary_path = tmp_path / "data.bin"
+    convert_json_to_binary(EXAMPLE_PATH, binary_path)
+    account = open_data_root(binary_path).get_member("member-1").get_account(
+        "account-1"
+    )
+    latest = account.electricity_readings[-1]
+
+    account.add_electricity_reading(
+        Reading(
+            cumulative=latest.cumulative + 1,
+            timestamp=latest.timestamp + timedelta(days=1),
+            units=latest.units,
+        )
+    )
+
+    assert account.electricity_readings[-2] == latest
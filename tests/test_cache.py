@@ -0,0 +1,114 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from billing.cache import CachedUsageEstimator, EstimateCache
+from billing.models import Account, DualTariff, Reading, ReadingSeries, Tariff
+from billing.shortcuts import get_dual_bill_estimate_for_account
+from billing.usage import LinearExtrapolationUsageEstimator
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEstimateCache:
+    def test_get_or_compute_counts_hits_and_misses(self):
+        cache = EstimateCache()
+
+        assert cache.get_or_compute("key", lambda: 1) == 1
+        assert cache.get_or_compute("key", lambda: 2) == 1
+
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = EstimateCache(maxsize=2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+        cache.get_or_compute("a", lambda: 1)
+
+        cache.get_or_compute("c", lambda: 3)
+
+        assert cache.get_or_compute("a", lambda: None) == 1
+        assert cache.get_or_compute("b", lambda: None) is None
+
+    def test_entries_expire(self):
+        clock = _FakeClock()
+        cache = EstimateCache(ttl=10, clock=clock)
+        cache.get_or_compute("key", lambda: 1)
+
+        clock.now = 11
+
+        assert cache.get_or_compute("key", lambda: 2) == 2
+
+    def test_errors_are_not_cached(self):
+        cache = EstimateCache()
+
+        def fail():
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            cache.get_or_compute("key", fail)
+        assert len(cache) == 0
+
+
+class TestCaching:
+    @pytest.fixture
+    def readings(self):
+        return ReadingSeries(
+            [
+                Reading(cumulative=0, timestamp=datetime(2019, 1, 1), units="kwh"),
+                Reading(cumulative=10, timestamp=datetime(2019, 1, 2), units="kwh"),
+            ]
+        )
+
+    def test_cached_usage_estimator_misses_after_new_reading(self, readings):
+        cache = EstimateCache()
+        estimator = CachedUsageEstimator(LinearExtrapolationUsageEstimator(), cache)
+        billing_date = datetime(2019, 1, 5)
+
+        first = estimator.estimate_usage(readings, billing_date)
+        assert estimator.estimate_usage(readings, billing_date) is first
+        new_readings = ReadingSeries(
+            list(readings)
+            + [Reading(cumulative=30, timestamp=datetime(2019, 1, 3), units="kwh")]
+        )
+        second = estimator.estimate_usage(new_readings, billing_date)
+
+        assert second.usage_estimate > first.usage_estimate
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_dual_bill_estimate_misses_after_tariff_change(self, readings):
+        cache = EstimateCache()
+        account = Account(name="", electricity_readings=readings, gas_readings=[])
+        estimator = LinearExtrapolationUsageEstimator()
+        billing_date = datetime(2019, 1, 5)
+
+        def estimate(unit_charge):
+            tariff = Tariff(standing_charge=Decimal("1"), unit_charge=unit_charge)
+            return get_dual_bill_estimate_for_account(
+                account,
+                DualTariff(electricity_tariff=tariff, gas_tariff=None),
+                estimator,
+                billing_date,
+                cache=cache,
+            )
+
+        first = estimate(Decimal("1"))
+        assert estimate(Decimal("1")) is first
+        assert estimate(Decimal("2")) is not first
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_cached_usage_estimator_caches_fit(self, readings):
+        cache = EstimateCache()
+        estimator = CachedUsageEstimator(LinearExtrapolationUsageEstimator(), cache)
+        billing_dates = [datetime(2019, 1, 5), datetime(2019, 2, 5)]
+
+        first = estimator.estimate_usages(readings, billing_dates)
+        assert estimator.estimate_usages(readings, billing_dates) == first
+        assert (cache.hits, cache.misses) == (1, 1)
@@ -0,0 +1,97 @@
+import io
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from billing.export import (COLUMNS, read_columnar, write_columnar, write_csv,
+                            write_ndjson)
+from billing.models import BillEstimate, DualBillEstimate
+from billing.runner import AccountBillResult
+
+
+@pytest.fixture
+def results():
+    bill = BillEstimate(
+        billing_date=datetime(2019, 4, 1),
+        billing_period=timedelta(days=30),
+        usage_estimate=Decimal("5268.5"),
+        usage_units="kwh",
+        price_estimate=Decimal("65232.805"),
+    )
+    return [
+        AccountBillResult(
+            member_name="member-1",
+            account_name="account-1",
+            dual_bill_estimate=DualBillEstimate(
+                billing_date=datetime(2019, 4, 1),
+                electricity_bill_estimate=bill,
+                gas_bill_estimate=None,
+            ),
+        ),
+        AccountBillResult(
+            member_name="member-1",
+            account_name="account-2",
+            dual_bill_estimate=None,
+            error="UsageEstimatorError: Reading decreased",
+        ),
+    ]
+
+
+def test_write_csv(results):
+    file = io.StringIO(newline="")
+    summary = write_csv(iter(results), file)
+
+    assert (summary.rows, summary.errors) == (2, 1)
+    assert file.getvalue().splitlines() == [
+        ",".join(COLUMNS),
+        "member-1,account-1,5268,kwh,65232.80,,,,",
+        "member-1,account-2,,,,,,,UsageEstimatorError: Reading decreased",
+    ]
+
+
+def test_write_ndjson(results):
+    file = io.StringIO()
+    summary = write_ndjson(iter(results), file)
+
+    assert (summary.rows, summary.errors) == (2, 1)
+    rows = [json.loads(line) for line in file.getvalue().splitlines()]
+    assert rows[0] == {
+        "member": "member-1",
+        "account": "account-1",
+        "electricity_usage": "5268",
+        "electricity_units": "kwh",
+        "electricity_price": "65232.80",
+        "gas_usage": None,
+        "gas_units": None,
+        "gas_price": None,
+        "error": None,
+    }
+    assert rows[1]["error"] == "UsageEstimatorError: Reading decreased"
+
+
+def test_write_columnar_in_batches(results):
+    file = io.BytesIO()
+    summary = write_columnar(iter(results * 3), file, batch_size=4)
+    assert (summary.rows, summary.errors) == (6, 3)
+
+    file.seek(0)
+    batches = list(read_columnar(file))
+    assert [len(batch["member"]) for batch in batches] == [4, 2]
+    assert batches[1] == {
+        "member": ["member-1", "member-1"],
+        "account": ["account-1", "account-2"],
+        "electricity_units": ["kwh", None],
+        "gas_units": [None, None],
+        "error": [None, "UsageEstimatorError: Reading decreased"],
+        "electricity_usage": [5268, None],
+        "electricity_price_pence": [6523280, None],
+        "gas_usage": [None, None],
+        "gas_price_pence": [None, None],
+    }
+
+
+def test_read_columnar_checks_the_file():
+    with pytest.raises(ValueError):
+        list(read_columnar(io.BytesIO(b"member,account\n")))
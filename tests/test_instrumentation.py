@@ -0,0 +1,116 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from billing.instrumentation import (MetricsRecorder, get_sink, instrument,
+                                     instrumented)
+from billing.models import Account, DataRoot, DualTariff, Reading, Tariff
+from billing.shortcuts import get_dual_bill_estimate_for_account
+from billing.usage import (LinearExtrapolationUsageEstimator,
+                           UsageEstimatorError)
+
+
+def _account():
+    return Account(
+        name="account-1",
+        electricity_readings=[
+            Reading(cumulative=0, timestamp=datetime(2019, 1, 1), units="kwh"),
+            Reading(cumulative=10, timestamp=datetime(2019, 1, 2), units="kwh"),
+        ],
+        gas_readings=[],
+    )
+
+
+def _dual_tariff():
+    tariff = Tariff(standing_charge=Decimal("1"), unit_charge=Decimal("1"))
+    return DualTariff(electricity_tariff=tariff, gas_tariff=tariff)
+
+
+def test_disabled_by_default():
+    assert get_sink() is None
+
+
+def test_records_stages():
+    with instrument() as recorder:
+        get_dual_bill_estimate_for_account(
+            _account(),
+            _dual_tariff(),
+            LinearExtrapolationUsageEstimator(),
+            datetime(2019, 1, 3),
+        )
+    assert get_sink() is None
+
+    stages = recorder.snapshot()["stages"]
+    assert set(stages) == {
+        "dual_bill_estimate",
+        "estimate_usage",
+        "fit_usage",
+        "bill_estimate",
+    }
+    assert stages["estimate_usage"]["calls"] == 1
+    assert stages["estimate_usage"]["readings"] == 2
+    assert stages["dual_bill_estimate"]["readings"] == 2
+    assert stages["dual_bill_estimate"]["seconds"] > 0
+
+
+def test_records_loading_and_validation():
+    with instrument() as recorder:
+        data_root = DataRoot.from_json(
+            '{"member-1": {"account-1": {"electricity": ['
+            '{"cumulative": 1, "timestamp": "2019-01-01T00:00:00", "units": "kwh"}'
+            "]}}}"
+        )
+        data_root.members[0].accounts[0].validate()
+
+    stages = recorder.snapshot()["stages"]
+    assert stages["from_json"]["calls"] == 1
+    assert stages["load_account"]["readings"] == 1
+    assert stages["validate"]["readings"] == 1
+
+
+def test_counts_errors_by_message():
+    account = Account(
+        name="account-1",
+        electricity_readings=[
+            Reading(cumulative=0, timestamp=datetime(2019, 1, 1), units="kwh"),
+            Reading(cumulative=10, timestamp=datetime(2019, 1, 2), units="m³"),
+        ],
+        gas_readings=[],
+    )
+    estimator = LinearExtrapolationUsageEstimator()
+    with instrument() as recorder:
+        for _ in range(2):
+            with pytest.raises(UsageEstimatorError):
+                estimator.estimate_usage(
+                    account.electricity_readings, datetime(2019, 1, 3)
+                )
+
+    snapshot = recorder.snapshot()
+    assert snapshot["stages"]["estimate_usage"]["errors"] == 2
+    assert list(snapshot["errors"].values()) == [2]
+    assert next(iter(snapshot["errors"])).startswith("UsageEstimatorError: ")
+
+
+def test_custom_sink():
+    records = []
+
+    class ListSink(MetricsRecorder):
+        def record(self, stage, seconds, readings, error):
+            records.append((stage, readings, error))
+
+    @instrumented("double", count_readings=lambda x: x)
+    def double(x):
+        return x * 2
+
+    with instrument(ListSink()):
+        assert double(3) == 6
+    assert double(4) == 8
+    assert records == [("double", 3, None)]
+
+
+def test_nested_instrument_restores_the_outer_sink():
+    with instrument() as outer:
+        with instrument():
+            pass
+        assert get_sink() is outer
@@ -1,9 +1,181 @@
-from datetime import datetime
+import pickle
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
 from pathlib import Path
 
 import pytest
 
-from billing.models import Account, DataRoot, Member, Reading
+from billing.models import (Account, AccountNotFoundError, DataRoot, Member,
+                            MemberNotFoundError, Reading, ReadingSeries,
+                            UsageEstimate, ValidationError)
+
+
+class TestReadingSeries:
+    @pytest.fixture
+    def readings(self):
+        return [
+            Reading(cumulative=300, timestamp=datetime(2019, 3, 1), units="kwh"),
+            Reading(cumulative=100, timestamp=datetime(2019, 1, 1), units="kwh"),
+            Reading(cumulative=200, timestamp=datetime(2019, 2, 1), units="kwh"),
+        ]
+
+    def test_readings_are_sorted_by_timestamp(self, readings):
+        series = ReadingSeries(readings)
+
+        assert [reading.cumulative for reading in series] == [100, 200, 300]
+
+    def test_latest_two(self, readings):
+        series = ReadingSeries(readings)
+
+        assert series.latest_two() == (readings[2], readings[0])
+
+    def test_between_includes_start_and_excludes_end(self, readings):
+        series = ReadingSeries(readings)
+
+        assert series.between(datetime(2019, 2, 1), datetime(2019, 3, 1)) == [
+            readings[2]
+        ]
+        assert series.between(start=datetime(2019, 1, 15)) == [readings[2], readings[0]]
+        assert series.between(end=datetime(2019, 1, 15)) == [readings[1]]
+
+    def test_cumulative_at_interpolates_between_readings(self, readings):
+        series = ReadingSeries(readings)
+
+        assert series.cumulative_at(datetime(2019, 2, 1)) == 200
+        assert series.cumulative_at(datetime(2019, 2, 15)) == 250
+        assert series.usage_between(
+            datetime(2019, 1, 16, 12), datetime(2019, 2, 15)
+        ) == Decimal(100)
+
+    def test_cumulative_at_outside_of_readings(self, readings):
+        series = ReadingSeries(readings)
+
+        with pytest.raises(ValueError, match="outside of the readings"):
+            series.cumulative_at(datetime(2019, 3, 2))
+        assert series.cumulative_at(datetime(2019, 3, 29), extrapolate=True) == 400
+        assert series.cumulative_at(datetime(2018, 12, 1), extrapolate=True) == 0
+
+    def test_coerce_does_not_copy_a_series(self, readings):
+        series = ReadingSeries(readings)
+
+        assert ReadingSeries.coerce(series) is series
+
+    def test_stored_as_columns(self, readings):
+        series = ReadingSeries(readings)
+
+        assert list(series.timestamps) == [1546300800, 1548979200, 1551398400]
+        assert list(series.cumulatives) == [100, 200, 300]
+        assert series[0] == readings[1]
+        assert series[-1] == readings[0]
+
+    def test_from_dicts_matches_readings(self, readings):
+        dicts = [
+            {
+                "cumulative": reading.cumulative,
+                "timestamp": reading.timestamp.isoformat(),
+                "units": reading.units,
+            }
+            for reading in readings
+        ]
+
+        assert ReadingSeries.from_dicts(dicts) == ReadingSeries(readings)
+
+    def test_mixed_units_are_kept_per_reading(self):
+        readings = [
+            Reading(cumulative=1, timestamp=datetime(2019, 1, 1), units="kwh"),
+            Reading(cumulative=2, timestamp=datetime(2019, 1, 2), units="wh"),
+        ]
+
+        series = ReadingSeries(readings)
+
+        assert series.units == {"kwh", "wh"}
+        assert list(series) == readings
+
+    def test_timezone_aware_timestamps_round_trip(self):
+        tz = timezone(timedelta(hours=1))
+        reading = Reading(
+            cumulative=1, timestamp=datetime(2019, 1, 1, tzinfo=tz), units=""
+        )
+
+        assert ReadingSeries([reading])[0].timestamp.utcoffset() == timedelta(hours=1)
+        assert ReadingSeries([reading])[0] == reading
+
+    def test_mixing_timezone_aware_and_naive_timestamps_raises(self):
+        dicts = [
+            {"cumulative": 1, "timestamp": "2019-01-01T00:00:00+01:00", "units": ""},
+            {"cumulative": 2, "timestamp": "2019-01-02T00:00:00", "units": ""},
+        ]
+
+        with pytest.raises(ValidationError) as error:
+            ReadingSeries.from_dicts(dicts)
+        assert error.value.check == "mixed_timezones"
+        with pytest.raises(ValidationError):
+            ReadingSeries(Reading.from_dict(dict_) for dict_ in dicts)
+        with pytest.raises(ValidationError):
+            ReadingSeries.from_dicts(reversed(dicts))
+
+    def test_timezone_is_the_first_readings(self):
+        dicts = [
+            {"cumulative": 1, "timestamp": "2019-01-02T00:00:00+01:00", "units": ""},
+            {"cumulative": 2, "timestamp": "2019-01-01T00:00:00+02:00", "units": ""},
+        ]
+
+        for series in [
+            ReadingSeries.from_dicts(dicts),
+            ReadingSeries(Reading.from_dict(dict_) for dict_ in dicts),
+        ]:
+            assert series.tzinfo == timezone(timedelta(hours=1))
+
+    def test_add_keeps_readings_sorted(self, readings):
+        series = ReadingSeries(readings[:2])
+
+        series.add(readings[2])
+        series.add(
+            Reading(cumulative=400, timestamp=datetime(2019, 4, 1), units="kwh")
+        )
+
+        assert [reading.cumulative for reading in series] == [100, 200, 300, 400]
+        assert series.latest_two()[1].cumulative == 400
+
+    def test_add_to_empty_series(self, readings):
+        series = ReadingSeries()
+
+        series.add(readings[0])
+
+        assert series == [readings[0]]
+        assert series.units == {"kwh"}
+
+    def test_add_with_duplicate_timestamp_raises(self, readings):
+        series = ReadingSeries(readings)
+
+        with pytest.raises(ValueError, match="already a reading"):
+            series.add(
+                Reading(cumulative=1, timestamp=datetime(2019, 2, 1), units="kwh")
+            )
+        assert len(series) == 3
+
+    def test_add_with_different_units_raises(self, readings):
+        series = ReadingSeries(readings)
+
+        with pytest.raises(ValueError, match="'wh'"):
+            series.add(
+                Reading(cumulative=1, timestamp=datetime(2019, 5, 1), units="wh")
+            )
+
+    def test_account_add_reading_changes_estimate(self, readings):
+        account = Account(name="", electricity_readings=readings, gas_readings=[])
+
+        account.add_electricity_reading(
+            Reading(cumulative=400, timestamp=datetime(2019, 4, 1), units="kwh")
+        )
+
+        assert account.electricity_readings.latest_two()[1].cumulative == 400
+
+    def test_account_builds_series_from_lists(self, readings):
+        account = Account(name="", electricity_readings=readings, gas_readings=[])
+
+        assert isinstance(account.electricity_readings, ReadingSeries)
+        assert account.electricity_readings.units == {"kwh"}
 
 
 class TestAccount:
@@ -17,7 +189,7 @@ class TestAccount:
             gas_readings=[],
         )
 
-        with pytest.raises(AssertionError):
+        with pytest.raises(ValidationError):
             account.validate()
 
     def test_validate_with_more_than_one_units_raises(self):
@@ -30,7 +202,7 @@ class TestAccount:
             gas_readings=[],
         )
 
-        with pytest.raises(AssertionError):
+        with pytest.raises(ValidationError):
             account.validate()
 
 
@@ -72,3 +244,112 @@ class TestRoot:
             ]
         )
         assert result == expected
+
+    def test_get_member_with_unknown_name_raises(self):
+        data_root = DataRoot(members=[Member(name="member", accounts=[])])
+
+        with pytest.raises(MemberNotFoundError, match="'unknown'"):
+            data_root.get_member("unknown")
+
+    def test_add_and_remove_member_update_lookup(self):
+        data_root = DataRoot(members=[])
+        member = Member(name="member", accounts=[])
+
+        data_root.add_member(member)
+        assert data_root.get_member("member") is member
+
+        assert data_root.remove_member("member") is member
+        assert data_root.members == []
+        with pytest.raises(MemberNotFoundError):
+            data_root.get_member("member")
+
+    def test_add_member_with_existing_name_raises(self):
+        data_root = DataRoot(members=[Member(name="member", accounts=[])])
+
+        with pytest.raises(ValueError):
+            data_root.add_member(Member(name="member", accounts=[]))
+
+
+class TestMember:
+    def test_get_account_with_unknown_name_raises(self):
+        member = Member(name="member", accounts=[])
+
+        with pytest.raises(AccountNotFoundError, match="'unknown'"):
+            member.get_account("unknown")
+
+    def test_add_and_remove_account_update_lookup(self):
+        member = Member(name="member", accounts=[])
+        account = Account(name="account", electricity_readings=[], gas_readings=[])
+
+        member.add_account(account)
+        assert member.get_account("account") is account
+
+        assert member.remove_account("account") is account
+        assert member.accounts == []
+        with pytest.raises(AccountNotFoundError):
+            member.get_account("account")
+
+
+class TestLazyLoading:
+    @pytest.fixture
+    def dict_(self):
+        return {
+            "member-1": {
+                "account-1": {
+                    "electricity": [
+                        {
+                            "cumulative": 1,
+                            "timestamp": "2019-01-01T00:00:00",
+                            "units": "kwh",
+                        }
+                    ]
+                }
+            },
+            "member-2": {
+                "account-2": {
+                    "gas": [{"cumulative": 1, "timestamp": "bad", "units": "m3"}]
+                }
+            },
+        }
+
+    def test_members_and_accounts_load_on_first_use(self, dict_):
+        data_root = DataRoot.from_dict(dict_, lazy=True)
+        member = data_root.get_member("member-1")
+        assert not member.is_loaded
+
+        account = member.get_account("account-1")
+        assert member.is_loaded
+        assert not account.is_loaded
+
+        assert len(account.electricity_readings) == 1
+        assert account.is_loaded
+
+    def test_invalid_readings_only_raise_when_used(self, dict_):
+        data_root = DataRoot.from_dict(dict_, lazy=True)
+        account = data_root.get_member("member-2").get_account("account-2")
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                account.gas_readings
+
+    def test_lazy_equals_eager(self):
+        input_json = (
+            (Path(__file__) / ".." / "data" / "sample-usage.json").resolve().read_text()
+        )
+
+        assert DataRoot.from_json(input_json, lazy=True) == DataRoot.from_json(
+            input_json
+        )
+
+
+def test_estimates_have_no_instance_dict():
+    estimate = UsageEstimate(
+        billing_date=datetime(2019, 1, 1),
+        time_period=timedelta(days=1),
+        usage_estimate=Decimal("1"),
+        usage_units="kwh",
+    )
+    assert not hasattr(estimate, "__dict__")
+    assert pickle.loads(pickle.dumps(estimate)) == estimate
+    with pytest.raises(AttributeError):
+        estimate.extra = 1
@@ -0,0 +1,106 @@
+import io
+from datetime import datetime
+from decimal import Decimal
+from json import JSONDecodeError
+from pathlib import Path
+
+import pytest
+
+from billing.models import Account, DualTariff, Member, Reading, Tariff
+from billing.pipeline import PipelineStats, iter_pipelined_dual_bill_estimates
+from billing.runner import iter_dual_bill_estimates
+from billing.streaming import iter_members
+from billing.usage import LinearExtrapolationUsageEstimator
+
+EXAMPLE_TARIFF_PATH = (Path(__file__) / ".." / ".." / "example-tariff.json").resolve()
+
+
+def _account(name, final_cumulative):
+    readings = [
+        Reading(cumulative=0, timestamp=datetime(2019, 1, 1), units="kwh"),
+        Reading(
+            cumulative=final_cumulative, timestamp=datetime(2019, 1, 2), units="kwh"
+        ),
+    ]
+    return Account(name=name, electricity_readings=readings, gas_readings=readings)
+
+
+@pytest.fixture
+def members():
+    return [
+        Member(
+            name=f"member-{i}",
+            accounts=[_account("account-1", i), _account("account-2", -1)],
+        )
+        for i in range(20)
+    ]
+
+
+@pytest.fixture
+def dual_tariff():
+    tariff = Tariff(standing_charge=Decimal("1"), unit_charge=Decimal("1"))
+    return DualTariff(electricity_tariff=tariff, gas_tariff=tariff)
+
+
+@pytest.mark.parametrize("workers, queue_size", [(1, 1), (3, 4)])
+def test_matches_runner(members, dual_tariff, workers, queue_size):
+    arguments = dict(
+        dual_tariff=dual_tariff,
+        estimator=LinearExtrapolationUsageEstimator(),
+        billing_date=datetime(2019, 1, 3),
+    )
+
+    results = list(
+        iter_pipelined_dual_bill_estimates(
+            iter(members), workers=workers, queue_size=queue_size, **arguments
+        )
+    )
+
+    assert results == list(iter_dual_bill_estimates(members, processes=1, **arguments))
+    assert results[1].error == "UsageEstimatorError: Reading decreased"
+
+
+def test_stats_count_each_fuel_through_each_stage(members, dual_tariff):
+    stats = PipelineStats()
+
+    list(
+        iter_pipelined_dual_bill_estimates(
+            members,
+            dual_tariff,
+            LinearExtrapolationUsageEstimator(),
+            datetime(2019, 1, 3),
+            stats=stats,
+        )
+    )
+
+    snapshot = stats.snapshot()
+    assert list(snapshot["stages"]) == ["load", "estimate", "price"]
+    assert {stage["items"] for stage in snapshot["stages"].values()} == {80}
+    assert snapshot["limiting_stage"] in snapshot["stages"]
+
+
+def test_stopping_early_stops_the_stages(members, dual_tariff):
+    results = iter_pipelined_dual_bill_estimates(
+        iter(members * 100),
+        dual_tariff,
+        LinearExtrapolationUsageEstimator(),
+        datetime(2019, 1, 3),
+        queue_size=1,
+    )
+
+    assert next(results).member_name == "member-0"
+    results.close()
+
+
+def test_invalid_members_raise():
+    file = io.StringIO('{"member-1": {"account-1": {}}, "member-2": [}')
+    results = iter_pipelined_dual_bill_estimates(
+        iter_members(file),
+        DualTariff.from_json(EXAMPLE_TARIFF_PATH.read_text()),
+        LinearExtrapolationUsageEstimator(),
+        datetime(2019, 1, 3),
+    )
+
+    assert next(results).account_name == "account-1"
+    with pytest.raises(JSONDecodeError):
+        next(results)
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from billing.models import Reading, ReadingSeries
+from billing.profiles import PeriodUsage, usage_by_period
+
+
+@pytest.fixture
+def readings():
+    # 24 units a day, taken every 6 hours from 2019-01-01 to 2019-02-10
+    start = datetime(2019, 1, 1)
+    return ReadingSeries(
+        Reading(
+            cumulative=index * 6,
+            timestamp=start + index * timedelta(hours=6),
+            units="kwh",
+        )
+        for index in range(4 * 40 + 1)
+    )
+
+
+def test_usage_by_day(readings):
+    days = usage_by_period(readings, "day", end=datetime(2019, 1, 3, 12))
+
+    assert days == [
+        PeriodUsage(datetime(2019, 1, 1), datetime(2019, 1, 2), Decimal(24)),
+        PeriodUsage(datetime(2019, 1, 2), datetime(2019, 1, 3), Decimal(24)),
+        PeriodUsage(datetime(2019, 1, 3), datetime(2019, 1, 3, 12), Decimal(12)),
+    ]
+
+
+def test_usage_by_week_starts_on_mondays(readings):
+    weeks = usage_by_period(readings, "week")
+
+    assert [(week.start.day, week.usage) for week in weeks] == [
+        (1, 6 * 24),  # Tuesday to Sunday
+        (7, 7 * 24),
+        (14, 7 * 24),
+        (21, 7 * 24),
+        (28, 7 * 24),
+        (4, 6 * 24),
+    ]
+
+
+def test_usage_by_month_interpolates_boundaries(readings):
+    months = usage_by_period(readings, "month", start=datetime(2019, 1, 15, 3))
+
+    assert months == [
+        PeriodUsage(datetime(2019, 1, 15, 3), datetime(2019, 2, 1), Decimal(405)),
+        PeriodUsage(datetime(2019, 2, 1), datetime(2019, 2, 10), Decimal(9 * 24)),
+    ]
+
+
+def test_usage_by_day_in_readings_timezone():
+    utc_plus_one = timezone(timedelta(hours=1))
+    readings = ReadingSeries(
+        [
+            Reading(
+                cumulative=cumulative,
+                timestamp=datetime(2019, 1, day, tzinfo=utc_plus_one),
+                units="kwh",
+            )
+            for day, cumulative in [(1, 0), (3, 48)]
+        ]
+    )
+
+    days = usage_by_period(readings, "day")
+
+    assert [(day.start, day.usage) for day in days] == [
+        (datetime(2019, 1, 1, tzinfo=utc_plus_one), 24),
+        (datetime(2019, 1, 2, tzinfo=utc_plus_one), 24),
+    ]
+
+
+def test_usage_by_period_with_unknown_period_raises(readings):
+    with pytest.raises(ValueError, match="Period must be one of"):
+        usage_by_period(readings, "year")
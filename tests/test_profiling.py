@@ -0,0 +1,60 @@
+import io
+from time import perf_counter
+
+import pytest
+
+from billing.models import ReadingSeries
+from billing.profiling import Profiler, profile
+
+_DICTS = [
+    {
+        "cumulative": i,
+        "timestamp": f"2019-01-01T00:{i // 60:02}:{i % 60:02}",
+        "units": "kwh",
+    }
+    for i in range(600)
+]
+
+
+def _parse_for(seconds):
+    end = perf_counter() + seconds
+    while perf_counter() < end:
+        ReadingSeries.from_dicts(_DICTS)
+
+
+def test_sample_mode_finds_billing_functions():
+    with profile("sample", interval=0.001) as profiler:
+        _parse_for(0.2)
+
+    assert profiler.unit == "samples"
+    assert any(
+        "billing.models:ReadingSeries.from_dicts" in stack
+        for stack in profiler.stacks
+    )
+
+
+def test_deterministic_mode_includes_builtins():
+    with profile("deterministic") as profiler:
+        ReadingSeries.from_dicts(_DICTS)
+
+    top = {stats.name: stats for stats in profiler.top(50)}
+    assert "datetime:datetime.fromisoformat" in top
+    from_dicts = top["billing.models:ReadingSeries.from_dicts"]
+    assert from_dicts.total_weight >= top["datetime:datetime.fromisoformat"].self_weight
+    assert "datetime:datetime.fromisoformat" in profiler.format_top(50)
+
+
+def test_write_collapsed():
+    profiler = Profiler()
+    profiler.stacks[("a:main", "b:inner")] = 3
+    profiler.stacks[("a:main",)] = 1
+
+    file = io.StringIO()
+    profiler.write_collapsed(file)
+
+    assert file.getvalue() == "a:main 1\na:main;b:inner 3\n"
+
+
+def test_unknown_mode_raises():
+    with pytest.raises(ValueError, match="Mode must be one of"):
+        Profiler("tracing")
@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from billing.billing import get_bill_estimate, get_bill_estimates
+from billing.models import Tariff, UsageEstimate
+from billing.registry import TariffNotFoundError, TariffRegistry
+
+_OLD = Tariff(standing_charge=Decimal("10"), unit_charge=Decimal("1"))
+_NEW = Tariff(standing_charge=Decimal("20"), unit_charge=Decimal("2"))
+
+
+@pytest.fixture
+def registry():
+    return TariffRegistry.from_dict(
+        {
+            "standard": [
+                {"standing_charge": "10", "unit_charge": "1"},
+                {
+                    "effective_from": "2019-04-01",
+                    "standing_charge": "20",
+                    "unit_charge": "2",
+                },
+            ],
+            "fixed": [{"standing_charge": "10", "unit_charge": "1"}],
+        }
+    )
+
+
+def _usage_estimate(start, billing_date, usage):
+    return UsageEstimate(
+        billing_date=billing_date,
+        time_period=billing_date - start,
+        usage_estimate=Decimal(usage),
+        usage_units="kwh",
+    )
+
+
+def test_equal_tariffs_are_interned(registry):
+    assert registry.get("standard", datetime(2019, 1, 1)) is registry.get(
+        "fixed", datetime(2019, 1, 1)
+    )
+    assert registry.intern(Tariff(Decimal("20"), Decimal("2"))) is registry.get(
+        "standard", datetime(2019, 4, 1)
+    )
+
+
+@pytest.mark.parametrize(
+    "at, expected",
+    [
+        (datetime(2000, 1, 1), _OLD),
+        (datetime(2019, 3, 31, 23, 59), _OLD),
+        (datetime(2019, 4, 1), _NEW),
+        (datetime(2030, 1, 1), _NEW),
+    ],
+)
+def test_get_finds_the_version_in_effect(registry, at, expected):
+    assert registry.get("standard", at) == expected
+
+
+def test_not_found():
+    registry = TariffRegistry()
+    registry.add("later", _NEW, effective_from=datetime(2019, 4, 1))
+    with pytest.raises(TariffNotFoundError):
+        registry.get("missing", datetime(2019, 4, 1))
+    with pytest.raises(TariffNotFoundError):
+        registry.get("later", datetime(2019, 3, 1))
+
+
+def test_add_rejects_a_second_version_from_the_same_date(registry):
+    with pytest.raises(ValueError):
+        registry.add("standard", _OLD, effective_from=datetime(2019, 4, 1))
+
+
+def test_periods(registry):
+    assert registry.periods(
+        "standard", datetime(2019, 3, 1), datetime(2019, 5, 1)
+    ) == [
+        (datetime(2019, 3, 1), datetime(2019, 4, 1), _OLD),
+        (datetime(2019, 4, 1), datetime(2019, 5, 1), _NEW),
+    ]
+    assert registry.periods(
+        "standard", datetime(2019, 3, 1), datetime(2019, 4, 1)
+    ) == [(datetime(2019, 3, 1), datetime(2019, 4, 1), _OLD)]
+
+
+def test_get_bill_estimate_by_tariff_id_matches_the_tariff(registry):
+    usage_estimate = _usage_estimate(datetime(2019, 1, 1), datetime(2019, 2, 1), 310)
+    assert get_bill_estimate(
+        usage_estimate, "standard", registry=registry
+    ) == get_bill_estimate(usage_estimate, _OLD)
+
+
+def test_get_bill_estimate_over_a_tariff_change(registry):
+    # 10 days at the old tariff and 20 at the new one, using 10 a day
+    usage_estimate = _usage_estimate(
+        datetime(2019, 3, 22), datetime(2019, 4, 21), 300
+    )
+    bill = get_bill_estimate(usage_estimate, "standard", registry=registry)
+    assert bill.usage_estimate == Decimal(300)
+    assert bill.price_estimate == 10 * 10 + 100 * 1 + 20 * 20 + 200 * 2
+
+
+def test_get_bill_estimate_over_a_tariff_change_counts_whole_days(registry):
+    # 1.5 days either side of the change: 3 days of standing charge in total
+    usage_estimate = _usage_estimate(
+        datetime(2019, 3, 30, 12), datetime(2019, 4, 2, 12), 0
+    )
+    bill = get_bill_estimate(usage_estimate, "standard", registry=registry)
+    assert bill.price_estimate == 10 + 20 * 2
+
+
+def test_get_bill_estimate_over_a_tariff_change_with_a_timezone(registry):
+    # The versions were added with naive dates, which are taken as UTC
+    usage_estimate = _usage_estimate(
+        datetime(2019, 3, 22, 1, tzinfo=timezone(timedelta(hours=1))),
+        datetime(2019, 4, 21, 1, tzinfo=timezone(timedelta(hours=1))),
+        300,
+    )
+    bill = get_bill_estimate(usage_estimate, "standard", registry=registry)
+    assert bill.price_estimate == 10 * 10 + 100 * 1 + 20 * 20 + 200 * 2
+    [_, (change, _, _)] = registry.periods(
+        "standard",
+        usage_estimate.billing_date - usage_estimate.time_period,
+        usage_estimate.billing_date,
+    )
+    assert change == datetime(2019, 4, 1, 1, tzinfo=timezone(timedelta(hours=1)))
+
+
+def test_get_bill_estimates_by_tariff_id(registry):
+    usage_estimates = [
+        _usage_estimate(datetime(2019, 1, 1), datetime(2019, 2, 1), 310),
+        _usage_estimate(datetime(2019, 5, 1), datetime(2019, 6, 1), 310),
+    ]
+    assert [
+        bill.price_estimate
+        for bill in get_bill_estimates(usage_estimates, "standard", registry=registry)
+    ] == [31 * 10 + 310, 31 * 20 + 310 * 2]
@@ -0,0 +1,63 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from billing.models import Account, DualTariff, Member, Reading, Tariff
+from billing.runner import iter_dual_bill_estimates
+from billing.usage import LinearExtrapolationUsageEstimator
+
+
+def _account(name, final_cumulative):
+    return Account(
+        name=name,
+        electricity_readings=[
+            Reading(cumulative=0, timestamp=datetime(2019, 1, 1), units="kwh"),
+            Reading(
+                cumulative=final_cumulative,
+                timestamp=datetime(2019, 1, 2),
+                units="kwh",
+            ),
+        ],
+        gas_readings=[],
+    )
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_iter_dual_bill_estimates_keeps_order_and_reports_errors(processes):
+    members = [
+        Member(
+            name=f"member-{i}",
+            accounts=[_account("account-1", i), _account("account-2", -1)],
+        )
+        for i in range(10)
+    ]
+    dual_tariff = DualTariff(
+        electricity_tariff=Tariff(
+            standing_charge=Decimal("1"), unit_charge=Decimal("1")
+        ),
+        gas_tariff=None,
+    )
+
+    results = list(
+        iter_dual_bill_estimates(
+            members=iter(members),
+            dual_tariff=dual_tariff,
+            estimator=LinearExtrapolationUsageEstimator(),
+            billing_date=datetime(2019, 1, 3),
+            processes=processes,
+            chunk_size=3,
+        )
+    )
+
+    assert [(r.member_name, r.account_name) for r in results] == [
+        (f"member-{i}", f"account-{j}") for i in range(10) for j in (1, 2)
+    ]
+    for i, result in enumerate(results[::2]):
+        assert result.error is None
+        bill = result.dual_bill_estimate.electricity_bill_estimate
+        # Two days of standing charge, plus two days at i units per day
+        assert bill.price_estimate.quantize(Decimal("0.01")) == 2 + 2 * i
+    for result in results[1::2]:
+        assert result.dual_bill_estimate is None
+        assert result.error == "UsageEstimatorError: Reading decreased"
@@ -0,0 +1,224 @@
+import asyncio
+import threading
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from billing.models import (Account, AccountNotFoundError, DataRoot,
+                            DualTariff, Member, Reading, Tariff)
+from billing.service import BillingService
+from billing.shortcuts import get_dual_bill_estimate_for_member_account
+from billing.usage import LinearExtrapolationUsageEstimator
+
+BILLING_DATE = datetime(2019, 1, 10)
+
+
+@pytest.fixture
+def data_root():
+    return DataRoot(
+        members=[
+            Member(
+                name=f"member-{i}",
+                accounts=[
+                    Account(
+                        name="account",
+                        electricity_readings=[
+                            Reading(
+                                cumulative=0, timestamp=datetime(2019, 1, 1), units=""
+                            ),
+                            Reading(
+                                cumulative=i, timestamp=datetime(2019, 1, 2), units=""
+                            ),
+                        ],
+                        gas_readings=[],
+                    )
+                ],
+            )
+            for i in range(20)
+        ]
+    )
+
+
+@pytest.fixture
+def dual_tariff():
+    return DualTariff(
+        electricity_tariff=Tariff(
+            standing_charge=Decimal("1"), unit_charge=Decimal("2")
+        ),
+        gas_tariff=None,
+    )
+
+
+def test_estimate_matches_shortcut_and_coalesces(data_root, dual_tariff):
+    estimator = LinearExtrapolationUsageEstimator()
+
+    async def run():
+        async with BillingService(
+            data_root, dual_tariff, estimator, max_batch_size=8, max_queue_size=4
+        ) as service:
+            results = await asyncio.gather(
+                *(
+                    service.estimate(f"member-{i % 10}", "account", BILLING_DATE)
+                    for i in range(40)
+                )
+            )
+        return service, results
+
+    service, results = asyncio.run(run())
+
+    for i, result in enumerate(results):
+        assert result == get_dual_bill_estimate_for_member_account(
+            data_root,
+            f"member-{i % 10}",
+            "account",
+            dual_tariff,
+            estimator,
+            BILLING_DATE,
+        )
+    assert service.requests == 40
+    assert service.coalesced == 30
+    assert 2 <= service.batches <= 10
+
+
+def test_estimate_raises_errors_per_request(data_root, dual_tariff):
+    async def run():
+        async with BillingService(
+            data_root, dual_tariff, LinearExtrapolationUsageEstimator()
+        ) as service:
+            return await asyncio.gather(
+                service.estimate("member-1", "unknown", BILLING_DATE),
+                service.estimate("member-1", "account", BILLING_DATE),
+                return_exceptions=True,
+            )
+
+    error, result = asyncio.run(run())
+
+    assert isinstance(error, AccountNotFoundError)
+    assert result.electricity_bill_estimate is not None
+
+
+def test_estimate_when_not_running_raises(data_root, dual_tariff):
+    service = BillingService(
+        data_root, dual_tariff, LinearExtrapolationUsageEstimator()
+    )
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.estimate("member-1", "account", BILLING_DATE))
+
+
+def test_cancelling_a_caller_waiting_for_room_leaves_the_others(data_root, dual_tariff):
+    estimating = threading.Event()
+    release = threading.Event()
+
+    class BlockingEstimator(LinearExtrapolationUsageEstimator):
+        def estimate_usage(self, readings, billing_date):
+            estimating.set()
+            release.wait(5)
+            return super().estimate_usage(readings, billing_date)
+
+    async def run():
+        async with BillingService(
+            data_root,
+            dual_tariff,
+            BlockingEstimator(),
+            max_batch_size=1,
+            max_batch_delay=0,
+            max_queue_size=1,
+        ) as service:
+            loop = asyncio.get_running_loop()
+            first = loop.create_task(
+                service.estimate("member-0", "account", BILLING_DATE)
+            )
+            await loop.run_in_executor(None, estimating.wait, 5)
+            # Fills the queue while the first is being estimated
+            second = loop.create_task(
+                service.estimate("member-1", "account", BILLING_DATE)
+            )
+            cancelled = loop.create_task(
+                service.estimate("member-2", "account", BILLING_DATE)
+            )
+            coalesced = loop.create_task(
+                service.estimate("member-2", "account", BILLING_DATE)
+            )
+            await asyncio.sleep(0.01)
+            cancelled.cancel()
+            await asyncio.sleep(0.01)
+            release.set()
+            return await asyncio.gather(
+                first, second, cancelled, coalesced, return_exceptions=True
+            )
+
+    *_, cancelled, coalesced = asyncio.run(run())
+
+    assert isinstance(cancelled, asyncio.CancelledError)
+    assert coalesced.electricity_bill_estimate is not None
+
+
+def test_new_caller_does_not_join_a_cancelled_request(data_root, dual_tariff):
+    async def run():
+        async with BillingService(
+            data_root,
+            dual_tariff,
+            LinearExtrapolationUsageEstimator(),
+            max_batch_delay=0.05,
+        ) as service:
+            cancelled = asyncio.get_running_loop().create_task(
+                service.estimate("member-1", "account", BILLING_DATE)
+            )
+            await asyncio.sleep(0.01)
+            cancelled.cancel()
+            await asyncio.sleep(0)
+            result = await service.estimate("member-1", "account", BILLING_DATE)
+        return cancelled, result
+
+    cancelled, result = asyncio.run(run())
+
+    assert cancelled.cancelled()
+    assert result.electricity_bill_estimate is not None
+
+
+def test_close_fails_requests_instead_of_leaving_them_waiting(data_root, dual_tariff):
+    estimating = threading.Event()
+    release = threading.Event()
+
+    class BlockingEstimator(LinearExtrapolationUsageEstimator):
+        def estimate_usage(self, readings, billing_date):
+            estimating.set()
+            release.wait(5)
+            return super().estimate_usage(readings, billing_date)
+
+    async def run():
+        service = BillingService(
+            data_root,
+            dual_tariff,
+            BlockingEstimator(),
+            max_batch_size=1,
+            max_batch_delay=0,
+            max_queue_size=1,
+        )
+        await service.start()
+        loop = asyncio.get_running_loop()
+        requests = [
+            loop.create_task(service.estimate(f"member-{i}", "account", BILLING_DATE))
+            for i in range(3)
+        ]
+        await loop.run_in_executor(None, estimating.wait, 5)
+        closing = loop.create_task(service.close())
+        await asyncio.sleep(0.01)
+        with pytest.raises(RuntimeError):
+            await service.estimate("member-4", "account", BILLING_DATE)
+        release.set()
+        await asyncio.wait_for(closing, 5)
+        return await asyncio.wait_for(
+            asyncio.gather(*requests, return_exceptions=True), 5
+        )
+
+    first, second, waiting_for_room = asyncio.run(run())
+
+    assert first.electricity_bill_estimate is not None
+    assert second.electricity_bill_estimate is not None
+    # Depending on whether it got into the queue before close() did
+    assert isinstance(waiting_for_room, RuntimeError) or (
+        waiting_for_room.electricity_bill_estimate is not None
+    )
@@ -0,0 +1,149 @@
+import gc
+import json
+import weakref
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from billing.batch import get_dual_bill_estimates
+from billing.binary import convert_json_to_binary
+from billing.instrumentation import instrument
+from billing.models import DataRoot, DualTariff, MemberNotFoundError, Tariff
+from billing.sharding import INDEX_FILE_NAME, ShardedDataRoot
+from billing.validation import validate_data_root
+
+SAMPLE_PATH = (Path(__file__) / ".." / "data" / "sample-usage.json").resolve()
+
+
+@pytest.fixture
+def member_data():
+    (member_value,) = json.loads(SAMPLE_PATH.read_text()).values()
+    return member_value
+
+
+@pytest.fixture
+def directory(tmp_path, member_data):
+    directory = tmp_path / "members"
+    directory.mkdir()
+    (directory / "a-north.json").write_text(
+        json.dumps({"member-1": member_data, "member-2": member_data})
+    )
+    (directory / "b-south.json").write_text(
+        json.dumps({"member-2": {}, "member-3": member_data})
+    )
+    (tmp_path / "west.json").write_text(json.dumps({"member-4": member_data}))
+    convert_json_to_binary(tmp_path / "west.json", directory / "c-west.bin")
+    return directory
+
+
+def test_get_member_across_shards(directory, member_data):
+    data_root = ShardedDataRoot(directory)
+    expected = DataRoot.from_dict({"member": member_data}).get_member("member")
+
+    for name in ["member-1", "member-3", "member-4"]:
+        member = data_root.get_member(name)
+        assert member.name == name
+        assert member.accounts == expected.accounts
+    # The first shard wins
+    assert data_root.get_member("member-2").accounts == expected.accounts
+    assert len(data_root) == 4
+
+
+def test_get_member_with_unknown_name_raises(directory):
+    with pytest.raises(MemberNotFoundError):
+        ShardedDataRoot(directory).get_member("member-5")
+
+
+def test_only_max_loaded_shards_are_kept(directory):
+    data_root = ShardedDataRoot(directory, max_loaded_shards=1)
+
+    with instrument() as recorder:
+        for name in ["member-1", "member-2", "member-3", "member-1"]:
+            data_root.get_member(name)
+
+    assert recorder.snapshot()["stages"]["load_shard"]["calls"] == 3
+
+
+def test_iter_members_yields_each_member_once(directory):
+    data_root = ShardedDataRoot(directory)
+
+    members = list(data_root.iter_members())
+
+    assert [member.name for member in members] == data_root.member_names
+    assert data_root.member_names == ["member-1", "member-2", "member-3", "member-4"]
+    assert members[1].accounts == data_root.get_member("member-2").accounts
+
+
+def test_members_can_be_iterated_more_than_once(directory):
+    data_root = ShardedDataRoot(directory)
+
+    assert [member.name for member in data_root.members] == data_root.member_names
+    assert [member.name for member in data_root.members] == data_root.member_names
+    assert len(data_root.members) == 4
+
+
+def test_batch_and_validation_go_across_shards(directory, member_data):
+    dual_tariff = DualTariff(
+        electricity_tariff=Tariff(
+            standing_charge=Decimal("10"), unit_charge=Decimal("0.5")
+        ),
+        gas_tariff=None,
+    )
+    data_root = ShardedDataRoot(directory)
+    expected_data_root = DataRoot.from_dict(
+        {name: member_data for name in data_root.member_names}
+    )
+
+    billing_date = datetime(2019, 4, 1)
+
+    batch = get_dual_bill_estimates(data_root, dual_tariff, billing_date)
+    expected = get_dual_bill_estimates(expected_data_root, dual_tariff, billing_date)
+    assert list(batch.dual_bill_estimates()) == list(expected.dual_bill_estimates())
+    report = validate_data_root(data_root)
+    assert report.accounts == 4
+    assert report.is_valid
+
+
+def test_batch_only_keeps_a_member_while_using_it(directory):
+    dual_tariff = DualTariff(
+        electricity_tariff=Tariff(
+            standing_charge=Decimal("10"), unit_charge=Decimal("0.5")
+        ),
+        gas_tariff=None,
+    )
+    data_root = ShardedDataRoot(directory)
+    yielded = []
+    alive_counts = []
+
+    def iter_members():
+        for member in data_root.members:
+            gc.collect()
+            alive_counts.append(sum(1 for ref in yielded if ref() is not None))
+            yielded.append(weakref.ref(member))
+            yield member
+
+    with instrument() as recorder:
+        result = get_dual_bill_estimates(
+            SimpleNamespace(members=iter_members()), dual_tariff, datetime(2019, 4, 1)
+        )
+
+    assert len(result) == 4
+    # At most the member before (which the caller may still be finishing with)
+    assert max(alive_counts) <= 1
+    # Read straight through the shards, rather than loading them into the cache
+    assert "load_shard" not in recorder.snapshot()["stages"]
+
+
+def test_index_is_saved_and_updated(directory):
+    ShardedDataRoot(directory)
+    assert (directory / INDEX_FILE_NAME).exists()
+
+    (directory / "b-south.json").write_text(json.dumps({"member-5": {}}))
+    data_root = ShardedDataRoot(directory)
+
+    assert "member-5" in data_root
+    assert "member-3" not in data_root
+    assert "member-1" in data_root
@@ -1,9 +1,15 @@
 from datetime import datetime, timedelta
 from decimal import Decimal
 
+import pytest
+
 from billing.models import (Account, BillEstimate, DataRoot, DualBillEstimate,
                             DualTariff, Member, Reading, Tariff, UsageEstimate)
-from billing.shortcuts import get_dual_bill_estimate_for_member_account
+from billing.shortcuts import (get_dual_bill_estimate_for_account,
+                               get_dual_bill_estimate_for_member_account,
+                               get_dual_bill_estimates_for_account)
+from billing.usage import (LinearExtrapolationUsageEstimator,
+                           SeasonalUsageEstimator)
 from billing.usage.base import BaseUsageEstimator
 
 
@@ -73,3 +79,33 @@ class _TestEstimator(BaseUsageEstimator):
 
     def estimate_usage(self, *args, **kwargs):
         return self.USAGE_ESTIMATE
+
+
+@pytest.mark.parametrize(
+    "estimator",
+    [_TestEstimator(), LinearExtrapolationUsageEstimator(), SeasonalUsageEstimator()],
+)
+def test_get_dual_bill_estimates_for_account_matches_single_estimates(estimator):
+    account = Account(
+        name="account",
+        electricity_readings=[
+            Reading(cumulative=0, timestamp=datetime(2019, 1, 1), units="kwh"),
+            Reading(cumulative=100, timestamp=datetime(2019, 2, 1), units="kwh"),
+            Reading(cumulative=250, timestamp=datetime(2019, 3, 1), units="kwh"),
+        ],
+        gas_readings=[
+            Reading(cumulative=10, timestamp=datetime(2019, 1, 2), units="m³"),
+            Reading(cumulative=90, timestamp=datetime(2019, 2, 20), units="m³"),
+        ],
+    )
+    tariff = Tariff(standing_charge=Decimal("10"), unit_charge=Decimal("0.5"))
+    dual_tariff = DualTariff(electricity_tariff=tariff, gas_tariff=tariff)
+    # Out of order, to check that the results stay in the same order
+    billing_dates = [datetime(2019, month, 1) for month in (6, 4, 12, 5)]
+
+    assert get_dual_bill_estimates_for_account(
+        account, dual_tariff, estimator, billing_dates
+    ) == [
+        get_dual_bill_estimate_for_account(account, dual_tariff, estimator, date)
+        for date in billing_dates
+    ]
@@ -0,0 +1,71 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from billing.models import DataRoot
+from billing.snapshot import load_snapshot
+
+SAMPLE_PATH = (Path(__file__) / ".." / "data" / "sample-usage.json").resolve()
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(SAMPLE_PATH.read_text())
+    return path
+
+
+@pytest.fixture
+def parsed():
+    return []
+
+
+@pytest.fixture
+def parse(parsed):
+    def parse(text):
+        parsed.append(text)
+        return DataRoot.from_json(text)
+
+    return parse
+
+
+def test_unchanged_file_is_not_parsed_again(tmp_path, data_path, parse, parsed):
+    first = load_snapshot(data_path, parse, tmp_path / "cache")
+    second = load_snapshot(data_path, parse, tmp_path / "cache")
+
+    assert len(parsed) == 1
+    assert second == first == DataRoot.from_json(SAMPLE_PATH.read_text())
+
+
+def test_touched_but_unchanged_file_is_not_parsed_again(
+    tmp_path, data_path, parse, parsed
+):
+    load_snapshot(data_path, parse, tmp_path / "cache")
+    stat = data_path.stat()
+    os.utime(data_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    load_snapshot(data_path, parse, tmp_path / "cache")
+
+    assert len(parsed) == 1
+
+
+def test_changed_file_is_parsed_again(tmp_path, data_path, parse, parsed):
+    load_snapshot(data_path, parse, tmp_path / "cache")
+    data_path.write_text('{"member": {}}')
+
+    data_root = load_snapshot(data_path, parse, tmp_path / "cache")
+
+    assert len(parsed) == 2
+    assert [member.name for member in data_root.members] == ["member"]
+
+
+def test_unreadable_snapshot_is_ignored(tmp_path, data_path, parse, parsed):
+    load_snapshot(data_path, parse, tmp_path / "cache")
+    for snapshot_path in (tmp_path / "cache").iterdir():
+        snapshot_path.write_bytes(b"not a pickle")
+
+    data_root = load_snapshot(data_path, parse, tmp_path / "cache")
+
+    assert len(parsed) == 2
+    assert data_root == DataRoot.from_json(SAMPLE_PATH.read_text())
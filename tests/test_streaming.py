@@ -0,0 +1,52 @@
+import io
+from json import JSONDecodeError
+from pathlib import Path
+
+import pytest
+
+from billing.models import DataRoot
+from billing.streaming import iter_accounts, iter_members, load_data_root
+
+SAMPLE_PATH = (Path(__file__) / ".." / "data" / "sample-usage.json").resolve()
+EXAMPLE_PATH = (Path(__file__) / ".." / ".." / "example-data.json").resolve()
+
+
+@pytest.mark.parametrize("path", [SAMPLE_PATH, EXAMPLE_PATH])
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_load_data_root_matches_from_json(path, chunk_size):
+    expected = DataRoot.from_json(path.read_text())
+
+    assert load_data_root(path, chunk_size=chunk_size) == expected
+
+
+def test_iter_accounts_from_binary_file_is_lazy():
+    file = io.BytesIO(b'{"m1": {"a1": {}, "a2": {}}, "m2": {"a3": {}}, "m3": {"a": [}}')
+
+    accounts = iter_accounts(file, chunk_size=4)
+
+    first_three = [next(accounts) for _ in range(3)]
+    assert [(member, account.name) for member, account in first_three] == [
+        ("m1", "a1"),
+        ("m1", "a2"),
+        ("m2", "a3"),
+    ]
+    assert not file.closed
+    with pytest.raises(JSONDecodeError):
+        next(accounts)
+
+
+def test_iter_members_groups_accounts():
+    file = io.StringIO('{"m1": {"a1": {}, "a2": {}}, "m2": {}, "m3": {"a3": {}}}')
+
+    members = list(iter_members(file))
+
+    assert [(member.name, len(member.accounts)) for member in members] == [
+        ("m1", 2),
+        ("m2", 0),
+        ("m3", 1),
+    ]
+
+
+def test_iter_accounts_with_missing_delimiter_raises():
+    with pytest.raises(JSONDecodeError, match="delimiter"):
+        list(iter_accounts(io.StringIO('{"m1": {"a1": {} "a2": {}}}')))
@@ -0,0 +1,295 @@
+from datetime import datetime, time, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from billing.batch import get_dual_bill_estimates
+from billing.billing import get_bill_estimate
+from billing.cache import EstimateCache
+from billing.models import (Account, DataRoot, DualTariff, Member, Reading,
+                            ReadingSeries, Tariff, Tier, TimeOfUseRate,
+                            UsageEstimate)
+from billing.shortcuts import get_dual_bill_estimate_for_account
+from billing.tariffs import compile_tariff, resolve_tariff
+from billing.usage import LinearExtrapolationUsageEstimator
+
+_ECONOMY_7 = Tariff(
+    standing_charge=Decimal("20"),
+    unit_charge=Decimal("15"),
+    time_of_use=(
+        TimeOfUseRate(start=time(0, 30), end=time(7, 30), unit_charge=Decimal("8")),
+    ),
+)
+_TIERED = Tariff(
+    standing_charge=Decimal("20"),
+    unit_charge=Decimal("15"),
+    tiers=(
+        Tier(up_to=Decimal("100"), unit_charge=Decimal("5")),
+        Tier(up_to=Decimal("300"), unit_charge=Decimal("10")),
+    ),
+)
+
+
+def _half_hourly_readings(start, days, tzinfo=None):
+    """1 unit every half an hour."""
+    start = start.replace(tzinfo=tzinfo)
+    return ReadingSeries(
+        Reading(
+            cumulative=index,
+            timestamp=start + index * timedelta(minutes=30),
+            units="kwh",
+        )
+        for index in range(days * 48 + 1)
+    )
+
+
+def test_from_dict():
+    assert (
+        Tariff.from_dict(
+            {
+                "standing_charge": "20",
+                "unit_charge": "15",
+                "time_of_use": [
+                    {"start": "00:30", "end": "07:30", "unit_charge": "8"}
+                ],
+            }
+        )
+        == _ECONOMY_7
+    )
+    assert (
+        Tariff.from_dict(
+            {
+                "standing_charge": "20",
+                "unit_charge": "15",
+                "tiers": [
+                    {"up_to": "100", "unit_charge": "5"},
+                    {"up_to": "300", "unit_charge": "10"},
+                ],
+            }
+        )
+        == _TIERED
+    )
+
+
+def test_compile_time_of_use():
+    compiled = compile_tariff(_ECONOMY_7)
+    assert compiled.slot_seconds == 30 * 60
+    assert compiled.unit_charge_by_slot == (Decimal("15"),) + (Decimal("8"),) * 14 + (
+        Decimal("15"),
+    ) * 33
+    assert compile_tariff(_ECONOMY_7) is compiled
+
+
+def test_compile_time_of_use_past_midnight():
+    tariff = Tariff(
+        standing_charge=Decimal("0"),
+        unit_charge=Decimal("1"),
+        time_of_use=(
+            TimeOfUseRate(start=time(22), end=time(6), unit_charge=Decimal("2")),
+        ),
+    )
+    compiled = compile_tariff(tariff)
+    assert compiled.slot_seconds == 2 * 60 * 60
+    assert compiled.unit_charge_by_slot == (Decimal("2"),) * 3 + (
+        Decimal("1"),
+    ) * 8 + (Decimal("2"),)
+
+
+def test_compile_rejects_overlapping_time_of_use_rates():
+    tariff = Tariff(
+        standing_charge=Decimal("0"),
+        unit_charge=Decimal("1"),
+        time_of_use=(
+            TimeOfUseRate(start=time(1), end=time(3), unit_charge=Decimal("2")),
+            TimeOfUseRate(start=time(2), end=time(4), unit_charge=Decimal("2")),
+        ),
+    )
+    with pytest.raises(ValueError, match="overlap"):
+        compile_tariff(tariff)
+
+
+def test_tariff_rejects_unordered_tiers_and_mixing_tiers_with_time_of_use():
+    tier = Tier(up_to=Decimal("1"), unit_charge=Decimal("1"))
+    with pytest.raises(ValueError):
+        Tariff(
+            standing_charge=Decimal("0"),
+            unit_charge=Decimal("1"),
+            tiers=(tier, tier),
+        )
+    with pytest.raises(ValueError):
+        Tariff(
+            standing_charge=Decimal("0"),
+            unit_charge=Decimal("1"),
+            time_of_use=_ECONOMY_7.time_of_use,
+            tiers=(tier,),
+        )
+
+
+@pytest.mark.parametrize("tzinfo", [None, timezone(timedelta(hours=1))])
+def test_price_readings_with_time_of_use(tzinfo):
+    readings = _half_hourly_readings(datetime(2019, 1, 1), days=2, tzinfo=tzinfo)
+
+    # 14 units a day off-peak, 34 at peak
+    assert compile_tariff(_ECONOMY_7).price_readings(readings) == 2 * (
+        14 * 8 + 34 * 15
+    )
+    # Up to the reading at 01:30
+    assert compile_tariff(_ECONOMY_7).price_readings(
+        readings,
+        start=datetime(2019, 1, 1, tzinfo=tzinfo),
+        end=datetime(2019, 1, 1, 2, tzinfo=tzinfo),
+    ) == 1 * 15 + 2 * 8
+
+
+@pytest.mark.parametrize(
+    "usage, expected",
+    [
+        (Decimal("0"), Decimal("0")),
+        (Decimal("50"), Decimal("250")),
+        (Decimal("100"), Decimal("500")),
+        (Decimal("250.5"), Decimal("2005")),
+        (Decimal("400"), Decimal("4000")),
+    ],
+)
+def test_unit_price_through_tiers(usage, expected):
+    assert compile_tariff(_TIERED).unit_price(usage) == expected
+
+
+def test_get_bill_estimate_with_tiers():
+    usage_estimate = UsageEstimate(
+        billing_date=datetime(2019, 1, 3),
+        time_period=timedelta(days=2),
+        usage_estimate=Decimal("400"),
+        usage_units="kwh",
+    )
+    bill = get_bill_estimate(usage_estimate, _TIERED)
+    assert bill.usage_estimate == Decimal("400")
+    assert bill.price_estimate == Decimal("4040")
+
+
+def test_get_bill_estimate_needs_time_of_use_tariffs_resolving():
+    usage_estimate = UsageEstimate(
+        billing_date=datetime(2019, 1, 3),
+        time_period=timedelta(days=2),
+        usage_estimate=Decimal("400"),
+        usage_units="kwh",
+    )
+    with pytest.raises(ValueError, match="Resolve"):
+        get_bill_estimate(usage_estimate, _ECONOMY_7)
+
+
+def test_resolve_tariff_averages_over_the_usage():
+    readings = _half_hourly_readings(datetime(2019, 1, 1), days=1)
+    tariff = resolve_tariff(_ECONOMY_7, readings)
+    assert tariff.is_flat
+    assert tariff.unit_charge == (14 * Decimal(8) + 34 * Decimal(15)) / 48
+    assert resolve_tariff(_TIERED, readings) is _TIERED
+
+
+def test_dual_bill_estimate_with_time_of_use():
+    readings = _half_hourly_readings(datetime(2019, 1, 1), days=1)
+    account = Account(name="account", electricity_readings=readings, gas_readings=[])
+    dual_tariff = DualTariff(electricity_tariff=_ECONOMY_7, gas_tariff=None)
+
+    dual_bill = get_dual_bill_estimate_for_account(
+        account,
+        dual_tariff,
+        LinearExtrapolationUsageEstimator(),
+        datetime(2019, 1, 3, 23, 30),
+    )
+    # Two days at 48 units a day, averaging (14 * 8 + 34 * 15) / 48 a unit
+    assert dual_bill.electricity_bill_estimate.price_estimate.quantize(
+        Decimal("0.01")
+    ) == Decimal(2 * 20 + 2 * (14 * 8 + 34 * 15))
+
+
+def test_cached_dual_bill_estimate_with_time_of_use_sees_back_dated_readings():
+    account = Account(
+        name="account",
+        electricity_readings=[
+            Reading(cumulative=0, timestamp=datetime(2019, 1, 1, 12), units="kwh"),
+            Reading(cumulative=10, timestamp=datetime(2019, 1, 2, 12), units="kwh"),
+            Reading(cumulative=20, timestamp=datetime(2019, 1, 3, 12), units="kwh"),
+        ],
+        gas_readings=[],
+    )
+    dual_tariff = DualTariff(electricity_tariff=_ECONOMY_7, gas_tariff=None)
+    cache = EstimateCache()
+
+    def price_estimate():
+        return get_dual_bill_estimate_for_account(
+            account,
+            dual_tariff,
+            LinearExtrapolationUsageEstimator(),
+            datetime(2019, 1, 4, 12),
+            cache,
+        ).electricity_bill_estimate.price_estimate.quantize(Decimal("0.01"))
+
+    # 20 units, all at peak
+    assert price_estimate() == 2 * 20 + 20 * 15
+    # The latest two readings are the same, but now a quarter of the usage was
+    # off-peak
+    account.add_electricity_reading(
+        Reading(cumulative=5, timestamp=datetime(2019, 1, 2, 3), units="kwh")
+    )
+    assert price_estimate() == 2 * 20 + (5 * 15 + 5 * 8 + 10 * 15)
+    assert cache.misses == 2
+
+
+def test_usage_by_slot_is_kept_until_a_reading_is_added():
+    readings = _half_hourly_readings(datetime(2019, 1, 1), days=1)
+    usage_by_slot = readings.usage_by_slot(30 * 60)
+    assert usage_by_slot == (1,) * 48
+    assert readings.usage_by_slot(30 * 60) is usage_by_slot
+    assert readings.usage_by_slot(60 * 60) == (2,) * 24
+
+    readings.add(Reading(cumulative=50, timestamp=datetime(2019, 1, 2, 1), units="kwh"))
+    assert readings.usage_by_slot(30 * 60) == (3,) + (1,) * 47
+
+
+def test_usage_by_slot_uses_each_readings_time_of_day_across_summer_time():
+    winter = timezone.utc
+    summer = timezone(timedelta(hours=1))
+    # Midnight to 1am local time, either side of the clocks going forward
+    readings = [
+        Reading(cumulative=0, timestamp=datetime(2019, 3, 30, tzinfo=winter), units=""),
+        Reading(
+            cumulative=1, timestamp=datetime(2019, 3, 30, 1, tzinfo=winter), units=""
+        ),
+        Reading(cumulative=1, timestamp=datetime(2019, 4, 1, tzinfo=summer), units=""),
+        Reading(
+            cumulative=3, timestamp=datetime(2019, 4, 1, 1, tzinfo=summer), units=""
+        ),
+    ]
+    added = ReadingSeries(readings[:2])
+    for reading in readings[2:]:
+        added.add(reading)
+
+    for series in [ReadingSeries(readings), added]:
+        assert series.usage_by_slot(60 * 60) == (3,) + (0,) * 23
+        assert compile_tariff(_ECONOMY_7).price_readings(series) == 3 * 15
+
+
+def test_batch_rejects_tariffs_which_are_not_flat():
+    data_root = DataRoot(
+        members=[
+            Member(
+                name="member",
+                accounts=[
+                    Account(
+                        name="account",
+                        electricity_readings=_half_hourly_readings(
+                            datetime(2019, 1, 1), days=1
+                        ),
+                        gas_readings=[],
+                    )
+                ],
+            )
+        ]
+    )
+    with pytest.raises(ValueError, match="flat"):
+        get_dual_bill_estimates(
+            data_root,
+            DualTariff(electricity_tariff=_TIERED, gas_tariff=None),
+            datetime(2019, 1, 3),
+        )
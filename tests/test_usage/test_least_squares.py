@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from billing.models import Reading, UsageEstimate
+from billing.usage.base import UsageEstimatorError
+from billing.usage.least_squares import LeastSquaresUsageEstimator
+
+
+class TestLeastSquaresUsageEstimator:
+    @pytest.fixture
+    def readings(self):
+        # 100 a day, apart from one bad reading on the 4th
+        return [
+            Reading(cumulative=1000, timestamp=datetime(2019, 1, 1), units="kwh"),
+            Reading(cumulative=1100, timestamp=datetime(2019, 1, 2), units="kwh"),
+            Reading(cumulative=1200, timestamp=datetime(2019, 1, 3), units="kwh"),
+            Reading(cumulative=1600, timestamp=datetime(2019, 1, 4), units="kwh"),
+            Reading(cumulative=1400, timestamp=datetime(2019, 1, 5), units="kwh"),
+        ]
+
+    def test_estimate_usage_fits_every_reading(self, readings):
+        billing_date = datetime(2019, 1, 6)
+
+        # A slope of 130 a day, where the latest two readings decreased
+        assert LeastSquaresUsageEstimator().estimate_usage(
+            readings, billing_date
+        ) == UsageEstimate(
+            billing_date=billing_date,
+            time_period=timedelta(days=2),
+            usage_estimate=Decimal("260.0000000000000000000000001"),
+            usage_units="kwh",
+        )
+
+    def test_half_life_favours_recent_readings(self, readings):
+        readings = readings[:2] + [
+            Reading(cumulative=1300, timestamp=datetime(2019, 1, 3), units="kwh"),
+            Reading(cumulative=1600, timestamp=datetime(2019, 1, 4), units="kwh"),
+            Reading(cumulative=1900, timestamp=datetime(2019, 1, 5), units="kwh"),
+        ]
+        billing_date = datetime(2019, 1, 6)
+
+        unweighted = LeastSquaresUsageEstimator().estimate_usage(
+            readings, billing_date
+        )
+        weighted = LeastSquaresUsageEstimator(
+            half_life=timedelta(hours=6)
+        ).estimate_usage(readings, billing_date)
+        assert unweighted.usage_estimate < weighted.usage_estimate
+        assert weighted.usage_estimate == pytest.approx(
+            Decimal(600), rel=Decimal("0.01")
+        )
+
+    def test_fit_is_reusable(self, readings):
+        estimator = LeastSquaresUsageEstimator()
+        model = estimator.fit(readings)
+        for day in (6, 10, 20):
+            billing_date = datetime(2019, 1, day)
+            assert model.estimate_usage(billing_date) == estimator.estimate_usage(
+                readings, billing_date
+            )
+
+    @pytest.mark.parametrize(
+        "readings, message",
+        [
+            (
+                [Reading(cumulative=1, timestamp=datetime(2019, 1, 1), units="")],
+                "at least two readings",
+            ),
+            (
+                [
+                    Reading(cumulative=2, timestamp=datetime(2019, 1, 1), units=""),
+                    Reading(cumulative=1, timestamp=datetime(2019, 1, 2), units=""),
+                ],
+                "Reading decreased",
+            ),
+        ],
+    )
+    def test_fit_errors(self, readings, message):
+        with pytest.raises(UsageEstimatorError, match=message):
+            LeastSquaresUsageEstimator().fit(readings)
+
+    def test_fingerprint_depends_on_half_life(self, readings):
+        assert LeastSquaresUsageEstimator().fingerprint(
+            readings
+        ) != LeastSquaresUsageEstimator(half_life=timedelta(days=1)).fingerprint(
+            readings
+        )
@@ -3,9 +3,10 @@ from decimal import Decimal
 
 import pytest
 
-from billing.models import Reading, UsageEstimate
+from billing.models import Reading, ReadingSeries, UsageEstimate
 from billing.usage.base import UsageEstimatorError
-from billing.usage.linear import LinearExtrapolationUsageEstimator
+from billing.usage.linear import (LinearExtrapolationUsageEstimator,
+                                  estimated_usage)
 
 
 class TestLinearExtrapolationUsageEstimator:
@@ -60,3 +61,70 @@ class TestLinearExtrapolationUsageEstimator:
             usage_estimate=Decimal("1000"),
             usage_units="",
         )
+
+    def test_estimate_usage_accepts_reading_series(self, estimator, readings):
+        billing_date = datetime(2019, 1, 5)
+
+        assert estimator.estimate_usage(
+            ReadingSeries(readings), billing_date
+        ) == estimator.estimate_usage(readings, billing_date)
+
+    def test_estimate_usages_matches_estimate_usage(self, estimator, readings):
+        billing_dates = [datetime(2019, 1, 5), datetime(2019, 1, 2)]
+
+        assert estimator.estimate_usages(readings, billing_dates) == [
+            estimator.estimate_usage(readings, billing_date)
+            for billing_date in billing_dates
+        ]
+
+
+@pytest.mark.parametrize(
+    "billing_date, expected", [(datetime(2019, 1, 5), 400), (datetime(2019, 1, 2), 100)]
+)
+def test_estimated_usage_is_exact(billing_date, expected):
+    readings = [
+        Reading(cumulative=1000, timestamp=datetime(2019, 1, 1), units=""),
+        Reading(cumulative=1200, timestamp=datetime(2019, 1, 3), units=""),
+    ]
+
+    estimate = LinearExtrapolationUsageEstimator().estimate_usage(
+        readings, billing_date
+    )
+
+    assert estimated_usage(readings, billing_date) == expected
+    # Along the same line as the estimator, which rounds its per second rate first
+    assert estimate.usage_estimate.quantize(Decimal("0.001")) == expected
+
+
+@pytest.mark.parametrize(
+    "readings, billing_date",
+    [
+        (
+            [Reading(cumulative=1000, timestamp=datetime(2019, 1, 1), units="")],
+            datetime(2019, 1, 5),
+        ),
+        (
+            [
+                Reading(cumulative=1000, timestamp=datetime(2019, 1, 1), units=""),
+                Reading(cumulative=900, timestamp=datetime(2019, 1, 3), units=""),
+            ],
+            datetime(2019, 1, 5),
+        ),
+        (
+            [
+                Reading(cumulative=1000, timestamp=datetime(2019, 1, 1), units=""),
+                Reading(cumulative=1200, timestamp=datetime(2019, 1, 3), units=""),
+            ],
+            datetime(2018, 1, 1),
+        ),
+    ],
+)
+def test_estimated_usage_raises_the_same_errors_as_estimate_usage(
+    readings, billing_date
+):
+    with pytest.raises(UsageEstimatorError) as expected:
+        LinearExtrapolationUsageEstimator().estimate_usage(readings, billing_date)
+    with pytest.raises(UsageEstimatorError) as result:
+        estimated_usage(readings, billing_date)
+
+    assert str(result.value) == str(expected.value)
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from billing.models import Reading, ReadingSeries
+from billing.usage.base import UsageEstimatorError
+from billing.usage.seasonal import SeasonalUsageEstimator
+
+
+def _readings(daily_usage_by_month, start=datetime(2018, 1, 1), end=None):
+    """One reading a day, using daily_usage_by_month[month - 1] each day."""
+    end = end or datetime(start.year + 1, 1, 1)
+    readings = []
+    cumulative = 0
+    timestamp = start
+    while timestamp <= end:
+        readings.append(Reading(cumulative=cumulative, timestamp=timestamp, units="m³"))
+        cumulative += daily_usage_by_month[timestamp.month - 1]
+        timestamp += timedelta(days=1)
+    return ReadingSeries(readings)
+
+
+class TestSeasonalUsageEstimator:
+    def test_uses_each_months_rate(self):
+        readings = _readings([300] * 2 + [100] * 8 + [300] * 2)
+        model = SeasonalUsageEstimator().fit(readings)
+
+        # From the second latest reading (31st December 2018)
+        estimate = model.estimate_usage(datetime(2019, 3, 3))
+        assert estimate.time_period == timedelta(days=62)
+        assert estimate.usage_units == "m³"
+        assert estimate.usage_estimate == 300 * 60 + 100 * 2
+
+    def test_months_without_readings_use_the_average(self):
+        readings = _readings([100] * 12, end=datetime(2018, 2, 1))
+        model = SeasonalUsageEstimator().fit(readings)
+
+        estimate = model.estimate_usage(datetime(2018, 6, 1))
+        assert estimate.usage_estimate == pytest.approx(
+            Decimal(100 * (estimate.time_period / timedelta(days=1)))
+        )
+
+    def test_estimate_usage_matches_fit(self):
+        readings = _readings(list(range(1, 13)))
+        estimator = SeasonalUsageEstimator()
+        billing_date = datetime(2019, 5, 17, 12)
+        assert estimator.estimate_usage(readings, billing_date) == estimator.fit(
+            readings
+        ).estimate_usage(billing_date)
+
+    def test_does_not_allow_historic_billing_dates(self):
+        model = SeasonalUsageEstimator().fit(_readings([100] * 12))
+        with pytest.raises(UsageEstimatorError, match="after the first reading"):
+            model.estimate_usage(datetime(2018, 6, 1))
+
+    def test_reading_decreased(self):
+        readings = [
+            Reading(cumulative=2, timestamp=datetime(2019, 1, 1), units=""),
+            Reading(cumulative=1, timestamp=datetime(2019, 1, 2), units=""),
+        ]
+        with pytest.raises(UsageEstimatorError, match="Reading decreased"):
+            SeasonalUsageEstimator().fit(readings)
@@ -0,0 +1,70 @@
+import json
+from datetime import datetime
+
+from billing.models import DataRoot
+from billing.validation import validate_data_root
+
+
+def _readings(*cumulatives_by_day, units="kwh"):
+    return [
+        {
+            "cumulative": cumulative,
+            "timestamp": datetime(2019, 1, day).isoformat(),
+            "units": units,
+        }
+        for day, cumulative in cumulatives_by_day
+    ]
+
+
+def test_validate_data_root_reports_every_invalid_account():
+    data = {
+        "member-1": {
+            "valid": {"electricity": _readings((1, 100), (2, 200))},
+            "duplicated": {"electricity": _readings((1, 100), (1, 150), (2, 200))},
+            "decreased": {
+                "electricity": _readings((1, 100), (2, 200)),
+                "gas": _readings((1, 100), (2, 50), (3, 150)),
+            },
+        },
+        "member-2": {
+            "mixed-units": {
+                "gas": _readings((1, 100)) + _readings((2, 200), units="m3")
+            },
+        },
+    }
+
+    report = validate_data_root(DataRoot.from_json(json.dumps(data), lazy=True))
+
+    assert not report.is_valid
+    assert report.accounts == 4
+    assert report.invalid_accounts == [
+        ("member-1", "duplicated"),
+        ("member-1", "decreased"),
+        ("member-2", "mixed-units"),
+    ]
+    assert [
+        (problem.fuel, problem.check, problem.timestamp) for problem in report.problems
+    ] == [
+        (None, "duplicated_timestamp", datetime(2019, 1, 1)),
+        ("gas", "reading_decreased", datetime(2019, 1, 2)),
+        (None, "mixed_units", None),
+    ]
+
+
+def test_validate_data_root_finds_every_problem_of_a_loaded_account():
+    data = {
+        "member": {
+            "account": {
+                "electricity": _readings((1, 300), (2, 200), (3, 100)),
+                "gas": _readings((1, 100), (2, 200), (3, 150)),
+            }
+        }
+    }
+
+    report = validate_data_root(DataRoot.from_json(json.dumps(data)))
+
+    assert report.readings == 6
+    assert [problem.message for problem in report.problems] == [
+        "Electricity reading decreased at 2019-01-02 00:00:00",
+        "Gas reading decreased at 2019-01-03 00:00:00",
+    ]